@@ -0,0 +1,62 @@
+//! Эталонные скоры для проверки scripts/scoring.py.
+//!
+//! Читает драфты `[{"allies": [...], "enemies": [...]}]` и печатает
+//! `{"drafts": [{"allies", "enemies", "scores": {герой: скор}}]}` — score_hero
+//! для каждого героя пула. Данные берутся из `data/` или из папки вторым аргументом
+//! (heroes/, roles.json, synergies.json).
+//!
+//!   python scripts/scoring.py --make-drafts 500 --out drafts.json
+//!   cargo run --release --example score_fixtures -- drafts.json > fixtures.json
+//!   python scripts/scoring.py --parity fixtures.json
+//!
+//! Закоммиченная фикстура scripts/tests/fixtures/parity (её проверяет pytest):
+//!
+//!   cargo run --release --example score_fixtures -- scripts/tests/fixtures/parity/drafts.json \
+//!       scripts/tests/fixtures/parity > scripts/tests/fixtures/parity/scores.json
+
+use dota2draft::loader::{load_heroes, load_roles, load_synergies};
+use dota2draft::model::GamePhase;
+use dota2draft::scoring::score_hero;
+use serde::Deserialize;
+use serde_json::{json, Map, Value};
+use std::fs;
+use std::path::PathBuf;
+
+#[derive(Deserialize)]
+struct Draft {
+    allies: Vec<String>,
+    enemies: Vec<String>,
+}
+
+fn main() -> Result<(), Box<dyn std::error::Error>> {
+    let drafts_path = std::env::args().nth(1).ok_or("usage: score_fixtures <drafts.json> [data dir]")?;
+    let data_dir = PathBuf::from(std::env::args().nth(2).unwrap_or_else(|| "data".to_string()));
+    let drafts: Vec<Draft> = serde_json::from_str(&fs::read_to_string(drafts_path)?)?;
+
+    let path = |name: &str| data_dir.join(name).to_string_lossy().into_owned();
+    let heroes = load_heroes(&path("heroes"))?;
+    let roles = load_roles(&path("roles.json"))?;
+    let synergies = load_synergies(&path("synergies.json"))?;
+
+    let mut out = Vec::with_capacity(drafts.len());
+    for draft in &drafts {
+        let mut enemy_phase = GamePhase { early: 0, mid: 0, late: 0 };
+        for name in &draft.enemies {
+            if let Some(h) = heroes.get(name) {
+                enemy_phase.early += h.game_phase.early;
+                enemy_phase.mid += h.game_phase.mid;
+                enemy_phase.late += h.game_phase.late;
+            }
+        }
+
+        let mut scores = Map::new();
+        for hero in heroes.values() {
+            let score = score_hero(hero, &draft.allies, &draft.enemies, &heroes, &roles, &synergies, &enemy_phase);
+            scores.insert(hero.name.clone(), json!(score));
+        }
+        out.push(json!({"allies": draft.allies, "enemies": draft.enemies, "scores": Value::Object(scores)}));
+    }
+
+    println!("{}", serde_json::to_string(&json!({ "drafts": out }))?);
+    Ok(())
+}
@@ -1,145 +1,409 @@
 #!/usr/bin/env python3
 """Audit heroes data vs rules.
 
-Outputs:
-- unique roles/tags with counts
-- roles/tags referenced by roles.json / synergies.json
-- dead rule keys (where at least one side tag/role never appears in heroes)
+Builds one index of the data (hero names and aliases, role/tag counts, every
+rule key split once) and runs the registered checks over it in a single
+pass: hero checks see each hero once, rule checks see each split rule key
+once. Checks are plain functions registered with @hero_check, @rule_check
+or @index_check that yield Finding(check, severity, subject, message).
+
+Severities: "error" (the engine would misread the data: dangling hero
+references, no positions, missing phases, malformed rule keys), "warning"
+(dead rule keys, partial positions) and "info" (tags/roles no rule uses).
+
+Reads the JSON sources (data/heroes/*.json, roles.json, synergies.json), not
+the compiled heroes.db: compile_db coerces and drops what it cannot encode
+(keys without "+", fractional weights, unknown positions), so the errors
+would never show there. `update_heroes_data.py` audits its in-memory updates
+this way before writing and holds back the heroes whose own data or file has
+errors; errors elsewhere only warn there. Exit status is 1 if there are errors (or warnings with --strict).
 
 Run:
-  python src/audit_data_rules.py
+  python scripts/audit_data_rules.py               # summary + findings
+  python scripts/audit_data_rules.py --json        # machine-readable report
+  python scripts/audit_data_rules.py --verbose     # also info findings, role/tag counts and referenced keys
 """
 
 from __future__ import annotations
 
+import argparse
 import json
+import sys
+import time
 from collections import Counter
-from pathlib import Path
-
-ROOT = Path(__file__).resolve().parent.parent
-HERO_DIR = ROOT / "data" / "heroes"
-ROLES_FILE = ROOT / "data" / "roles.json"
-SYNERGIES_FILE = ROOT / "data" / "synergies.json"
-
-
-def load_json(path: Path):
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def split_pairs(d: dict) -> list[tuple[str, str]]:
-    out: list[tuple[str, str]] = []
-    for k in d.keys():
-        if "+" not in k:
-            continue
-        a, b = k.split("+", 1)
-        out.append((a, b))
-    return out
-
-
-def main() -> int:
-    roles = Counter()
-    tags = Counter()
-
-    hero_files = sorted(HERO_DIR.glob("*.json"))
-    for path in hero_files:
-        hero = load_json(path)
-        for r in hero.get("roles", []):
-            roles[r] += 1
-        for t in hero.get("tags", []):
-            tags[t] += 1
-
-    roles_rules = load_json(ROLES_FILE)
-    role_synergies = roles_rules.get("role_synergies", {})
-    role_conflicts = roles_rules.get("role_conflicts", {})
-
-    syn_rules = load_json(SYNERGIES_FILE)
-    tag_synergies = syn_rules.get("tag_synergies", {})
-    tag_counters = syn_rules.get("tag_counters", {})
-    phase_bias = syn_rules.get("phase_bias", {})
-
-    roles_in_rules = set([a for a, b in split_pairs(role_synergies) + split_pairs(role_conflicts)] + [b for a, b in split_pairs(role_synergies) + split_pairs(role_conflicts)])
-    tags_in_rules = set([a for a, b in split_pairs(tag_synergies) + split_pairs(tag_counters)] + [b for a, b in split_pairs(tag_synergies) + split_pairs(tag_counters)])
-    tags_in_phase_bias = set()
-    for phase_map in phase_bias.values():
-        if isinstance(phase_map, dict):
-            tags_in_phase_bias.update(phase_map.keys())
-
-    roles_set = set(roles.keys())
-    tags_set = set(tags.keys())
-
-    dead_role_keys = []
-    for k in list(role_synergies.keys()) + list(role_conflicts.keys()):
-        if "+" not in k:
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterable, Mapping
+
+import hero_names
+from hero_db import HERO_DIR, PHASES, POSITIONS, ROLES_FILE, SYNERGIES_FILE
+
+SEVERITIES = ("error", "warning", "info")
+ROLE_SECTIONS = ("role_synergies", "role_conflicts")
+TAG_SECTIONS = ("tag_synergies", "tag_counters")
+
+
+@dataclass(frozen=True)
+class Finding:
+    check: str
+    severity: str
+    subject: str
+    message: str
+
+
+@dataclass(frozen=True)
+class RuleKey:
+    section: str
+    key: str
+    a: str | None
+    b: str | None
+    weight: object
+
+    @property
+    def kind(self) -> str:
+        return "role" if self.section in ROLE_SECTIONS else "tag"
+
+
+@dataclass
+class AuditIndex:
+    heroes: dict[str, dict]
+    names: hero_names.HeroNames
+    files: dict[str, str] = field(default_factory=dict)     # hero name -> file name
+    broken: dict[str, str] = field(default_factory=dict)    # file name -> why it was not read
+    roles: Counter = field(default_factory=Counter)
+    tags: Counter = field(default_factory=Counter)
+    rule_keys: list[RuleKey] = field(default_factory=list)
+    phase_bias: dict = field(default_factory=dict)
+    role_definitions: dict = field(default_factory=dict)
+
+    @property
+    def rule_roles(self) -> set[str]:
+        return {x for k in self.rule_keys if k.kind == "role" for x in (k.a, k.b) if x}
+
+    @property
+    def rule_tags(self) -> set[str]:
+        return {x for k in self.rule_keys if k.kind == "tag" for x in (k.a, k.b) if x}
+
+    @property
+    def phase_bias_tags(self) -> set[str]:
+        return {t for m in self.phase_bias.values() if isinstance(m, dict) for t in m}
+
+
+def _strings(value) -> list[str]:
+    return [x for x in value if isinstance(x, str)] if isinstance(value, list) else []
+
+
+def _object(value) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def load_sources(overrides: Mapping[str, dict] | None = None):
+    """(heroes, roles, synergies, files, broken) from the JSON sources.
+
+    `overrides` maps hero file names to data used instead of the file on disk
+    (updates not written yet). Files that cannot be parsed end up in `broken`.
+    """
+    overrides = overrides or {}
+    heroes: dict[str, dict] = {}
+    files: dict[str, str] = {}
+    broken: dict[str, str] = {}
+    for path in sorted(HERO_DIR.glob("*.json")):
+        hero = overrides.get(path.name)
+        if hero is None:
+            try:
+                hero = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                broken[path.name] = f"unreadable: {e}"
+                continue
+        name = hero.get("name") if isinstance(hero, dict) else None
+        if not isinstance(name, str) or not name:
+            broken[path.name] = "no hero name"
+        elif name in heroes:
+            broken[path.name] = f"duplicate hero name {name!r} (also in {files[name]})"
+        else:
+            heroes[name] = hero
+            files[name] = path.name
+    roles, synergies = (_object(json.loads(f.read_text(encoding="utf-8"))) for f in (ROLES_FILE, SYNERGIES_FILE))
+    return heroes, roles, synergies, files, broken
+
+
+def build_index(heroes: dict[str, dict], roles_rules: dict, syn_rules: dict,
+                names: hero_names.HeroNames | None = None) -> AuditIndex:
+    index = AuditIndex(heroes, names if names is not None else hero_names.index())
+    for hero in heroes.values():
+        index.roles.update(_strings(hero.get("roles")))
+        index.tags.update(_strings(hero.get("tags")))
+    for rules, sections in ((roles_rules, ROLE_SECTIONS), (syn_rules, TAG_SECTIONS)):
+        for section in sections:
+            for key, weight in _object(rules.get(section)).items():
+                a, sep, b = key.partition("+")
+                index.rule_keys.append(RuleKey(section, key, a if sep else None, b if sep else None, weight))
+    index.phase_bias = _object(syn_rules.get("phase_bias"))
+    index.role_definitions = _object(roles_rules.get("role_definitions"))
+    return index
+
+
+# --- Check registry -------------------------------------------------------
+
+HeroCheck = Callable[[AuditIndex, str, dict], Iterable[Finding]]
+RuleCheck = Callable[[AuditIndex, RuleKey], Iterable[Finding]]
+IndexCheck = Callable[[AuditIndex], Iterable[Finding]]
+
+HERO_CHECKS: dict[str, HeroCheck] = {}
+RULE_CHECKS: dict[str, RuleCheck] = {}
+INDEX_CHECKS: dict[str, IndexCheck] = {}
+
+
+def hero_check(name: str):
+    def register(fn: HeroCheck) -> HeroCheck:
+        HERO_CHECKS[name] = fn
+        return fn
+    return register
+
+
+def rule_check(name: str):
+    def register(fn: RuleCheck) -> RuleCheck:
+        RULE_CHECKS[name] = fn
+        return fn
+    return register
+
+
+def index_check(name: str):
+    def register(fn: IndexCheck) -> IndexCheck:
+        INDEX_CHECKS[name] = fn
+        return fn
+    return register
+
+
+def _did_you_mean(index: AuditIndex, ref: str) -> str:
+    entry = index.names.resolve(ref)
+    return f" (did you mean {entry.name!r}?)" if entry is not None and entry.name in index.heroes else ""
+
+
+@hero_check("hero-refs")
+def check_hero_refs(index: AuditIndex, name: str, hero: dict):
+    for field_name in ("explicit_counters", "explicit_synergies"):
+        refs = hero.get(field_name) or {}
+        if not isinstance(refs, dict):
+            yield Finding("hero-refs", "error", name, f"{field_name} is not an object")
             continue
-        a, b = k.split("+", 1)
-        if a not in roles_set or b not in roles_set:
-            dead_role_keys.append(k)
-
-    dead_tag_synergy_keys = []
-    for k in tag_synergies.keys():
-        if "+" not in k:
+        for other, value in refs.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                yield Finding("hero-refs", "error", name, f"{field_name}.{other} value {value!r} is not a number")
+            if other == name:
+                yield Finding("hero-refs", "warning", name, f"{field_name} references the hero itself")
+            elif other not in index.heroes:
+                # score_hero looks these up by exact name, so the entry never applies
+                yield Finding("hero-refs", "error", name,
+                              f"{field_name} references unknown hero {other!r}{_did_you_mean(index, other)}")
+
+
+@hero_check("positions")
+def check_positions(index: AuditIndex, name: str, hero: dict):
+    positions = hero.get("positions") or {}
+    if not isinstance(positions, dict):
+        yield Finding("positions", "error", name, "positions is not an object")
+        return
+    if not positions:
+        yield Finding("positions", "error", name, "no positions")
+        return
+    missing = [p for p in POSITIONS if p not in positions]
+    if missing:
+        yield Finding("positions", "warning", name, f"missing {', '.join(missing)}")
+    unknown = [p for p in positions if p not in POSITIONS]
+    if unknown:
+        yield Finding("positions", "error", name, f"unknown position keys {', '.join(unknown)}")
+    bad = [p for p, v in positions.items() if not isinstance(v, (int, float)) or isinstance(v, bool) or v < 0]
+    if bad:
+        yield Finding("positions", "error", name, f"non-numeric or negative pick rate for {', '.join(bad)}")
+
+
+@hero_check("game-phase")
+def check_game_phase(index: AuditIndex, name: str, hero: dict):
+    phase = _object(hero.get("game_phase"))
+    missing = [p for p in PHASES if not isinstance(phase.get(p), int) or isinstance(phase.get(p), bool)]
+    if missing:
+        yield Finding("game-phase", "error", name, f"missing or non-integer game_phase {', '.join(missing)}")
+
+
+@hero_check("roles-tags")
+def check_roles_tags(index: AuditIndex, name: str, hero: dict):
+    if not hero.get("roles"):
+        yield Finding("roles-tags", "warning", name, "no roles")
+    if not hero.get("tags"):
+        yield Finding("roles-tags", "warning", name, "no tags")
+    for field_name in ("roles", "tags"):
+        value = hero.get(field_name)
+        if value is not None and (not isinstance(value, list) or len(_strings(value)) != len(value)):
+            yield Finding("roles-tags", "error", name, f"{field_name} is not a list of strings")
+        dupes = [x for x, c in Counter(_strings(value)).items() if c > 1]
+        if dupes:
+            yield Finding("roles-tags", "warning", name, f"duplicate {field_name}: {', '.join(dupes)}")
+
+
+@rule_check("rule-keys")
+def check_rule_key(index: AuditIndex, rule: RuleKey):
+    subject = f"{rule.section}.{rule.key}"
+    if rule.a is None or not rule.a or not rule.b:
+        yield Finding("rule-keys", "error", subject, "key is not of the form a+b")
+        return
+    if not isinstance(rule.weight, int) or isinstance(rule.weight, bool):
+        yield Finding("rule-keys", "error", subject, f"weight {rule.weight!r} is not an integer")
+    present = index.roles if rule.kind == "role" else index.tags
+    missing = [x for x in (rule.a, rule.b) if x not in present]
+    if missing:
+        yield Finding("rule-keys", "warning", subject,
+                      f"dead key: {rule.kind} {', '.join(missing)} not on any hero")
+
+
+@index_check("phase-bias")
+def check_phase_bias(index: AuditIndex):
+    for phase, m in index.phase_bias.items():
+        if phase not in PHASES:
+            yield Finding("phase-bias", "error", f"phase_bias.{phase}", "unknown phase")
             continue
-        a, b = k.split("+", 1)
-        if a not in tags_set or b not in tags_set:
-            dead_tag_synergy_keys.append(k)
-
-    dead_tag_counter_keys = []
-    for k in tag_counters.keys():
-        if "+" not in k:
+        if not isinstance(m, dict):
+            yield Finding("phase-bias", "error", f"phase_bias.{phase}", "is not an object")
             continue
-        a, b = k.split("+", 1)
-        if a not in tags_set or b not in tags_set:
-            dead_tag_counter_keys.append(k)
-
-    print(f"heroes_files\t{len(hero_files)}")
-    print(f"roles_unique\t{len(roles)}")
-    print(f"tags_unique\t{len(tags)}")
-
+        for tag, weight in m.items():
+            if tag not in index.tags:
+                yield Finding("phase-bias", "warning", f"phase_bias.{phase}.{tag}", "dead key: tag not on any hero")
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool):
+                yield Finding("phase-bias", "error", f"phase_bias.{phase}.{tag}", f"weight {weight!r} is not a number")
+
+
+@index_check("unused")
+def check_unused(index: AuditIndex):
+    covered = index.rule_tags | index.phase_bias_tags
+    for tag in sorted(set(index.tags) - covered):
+        yield Finding("unused", "info", tag, f"tag on {index.tags[tag]} heroes is not used by any rule")
+    for role in sorted(set(index.roles) - index.rule_roles):
+        yield Finding("unused", "info", role, f"role on {index.roles[role]} heroes is not used by any rule")
+
+
+@index_check("hero-files")
+def check_hero_files(index: AuditIndex):
+    for file, problem in sorted(index.broken.items()):
+        yield Finding("hero-files", "error", file, problem)
+    indexed = {e.name: e.file for e in index.names}
+    for name in sorted(set(index.files) - set(indexed)):
+        yield Finding("hero-files", "warning", name, "hero is not in the name index (renamed? stale index)")
+    for name in sorted(set(indexed) - set(index.files)):
+        yield Finding("hero-files", "warning", name, f"name index points to {indexed[name]}, which has another name")
+
+
+# --- Engine ---------------------------------------------------------------
+
+@dataclass
+class Report:
+    findings: list[Finding]
+    summary: dict
+    seconds: float
+    index: AuditIndex | None = field(default=None, repr=False)
+
+    def count(self, severity: str) -> int:
+        return sum(1 for f in self.findings if f.severity == severity)
+
+    @property
+    def errors(self) -> int:
+        return self.count("error")
+
+    def to_json(self) -> dict:
+        return {
+            "summary": self.summary,
+            "counts": {s: self.count(s) for s in SEVERITIES},
+            "seconds": round(self.seconds, 4),
+            "findings": [asdict(f) for f in self.findings],
+        }
+
+
+def run_checks(index: AuditIndex, only: set[str] | None = None) -> list[Finding]:
+    def enabled(registry):
+        return [fn for name, fn in registry.items() if only is None or name in only]
+
+    hero_fns, rule_fns, index_fns = enabled(HERO_CHECKS), enabled(RULE_CHECKS), enabled(INDEX_CHECKS)
+    findings: list[Finding] = []
+    for name, hero in index.heroes.items():
+        for fn in hero_fns:
+            findings.extend(fn(index, name, hero))
+    for rule in index.rule_keys:
+        for fn in rule_fns:
+            findings.extend(fn(index, rule))
+    for fn in index_fns:
+        findings.extend(fn(index))
+    order = {s: i for i, s in enumerate(SEVERITIES)}
+    return sorted(findings, key=lambda f: (order[f.severity], f.check, f.subject))
+
+
+def run_audit(only: set[str] | None = None, overrides: Mapping[str, dict] | None = None) -> Report:
+    """Audit the JSON sources; `overrides` (file name -> hero data) replace files not yet written."""
+    start = time.perf_counter()
+    heroes, roles, synergies, files, broken = load_sources(overrides)
+    index = build_index(heroes, roles, synergies)
+    index.files, index.broken = files, broken
+    findings = run_checks(index, only)
+    summary = {
+        "heroes": len(index.heroes),
+        "roles": len(index.roles),
+        "tags": len(index.tags),
+        "rule_keys": len(index.rule_keys),
+        "checks": sorted(n for n in (*HERO_CHECKS, *RULE_CHECKS, *INDEX_CHECKS) if only is None or n in only),
+    }
+    return Report(findings, summary, time.perf_counter() - start, index)
+
+
+def print_details(index: AuditIndex) -> None:
     print("\n== ROLES (count) ==")
-    for r, c in roles.most_common():
+    for r, c in index.roles.most_common():
         print(f"{r}\t{c}")
-
     print("\n== TAGS top-200 (count) ==")
-    for t, c in tags.most_common(200):
+    for t, c in index.tags.most_common(200):
         print(f"{t}\t{c}")
-
     print("\n== RULES ROLES referenced ==")
-    for r in sorted(roles_in_rules):
+    for r in sorted(index.rule_roles):
         print(r)
-
     print("\n== RULES TAGS referenced ==")
-    for t in sorted(tags_in_rules):
+    for t in sorted(index.rule_tags):
         print(t)
-
-    if tags_in_phase_bias:
+    if index.phase_bias_tags:
         print("\n== PHASE_BIAS tags referenced ==")
-        for t in sorted(tags_in_phase_bias):
+        for t in sorted(index.phase_bias_tags):
             print(t)
 
-    print("\n== DEAD role keys (do not match any hero role) ==")
-    for k in dead_role_keys:
-        print(k)
-
-    print("\n== DEAD tag_synergies keys (missing tag in heroes) ==")
-    for k in dead_tag_synergy_keys:
-        print(k)
 
-    print("\n== DEAD tag_counters keys (missing tag in heroes) ==")
-    for k in dead_tag_counter_keys:
-        print(k)
-
-    missing_roles = sorted(roles_in_rules - roles_set)
-    missing_tags = sorted(tags_in_rules - tags_set)
-    print("\n== MISSING roles (in rules, not in heroes) ==")
-    for r in missing_roles:
-        print(r)
-
-    print("\n== MISSING tags (in rules, not in heroes) ==")
-    for t in missing_tags:
-        print(t)
-
-    return 0
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    ap.add_argument("--check", action="append", help="run only these checks (repeatable)")
+    ap.add_argument("--strict", action="store_true", help="warnings also fail")
+    ap.add_argument("--verbose", action="store_true", help="also print info findings, role/tag counts and referenced keys")
+    args = ap.parse_args()
+
+    all_checks = {*HERO_CHECKS, *RULE_CHECKS, *INDEX_CHECKS}
+    unknown = set(args.check or ()) - all_checks
+    if unknown:
+        print(f"unknown checks: {', '.join(sorted(unknown))} (have: {', '.join(sorted(all_checks))})", file=sys.stderr)
+        return 2
+
+    report = run_audit(set(args.check) if args.check else None)
+    failed = report.errors > 0 or (args.strict and report.count("warning") > 0)
+
+    if args.json:
+        print(json.dumps(report.to_json(), ensure_ascii=False, indent=1))
+        return 1 if failed else 0
+
+    for key, value in report.summary.items():
+        if key != "checks":
+            print(f"{key}\t{value}")
+    if args.verbose:
+        print_details(report.index)
+    shown = [f for f in report.findings if args.verbose or f.severity != "info"]
+    if shown:
+        print()
+    for f in shown:
+        print(f"{f.severity}\t{f.check}\t{f.subject}\t{f.message}")
+    print(f"\nerrors\t{report.errors}\nwarnings\t{report.count('warning')}\ninfo\t{report.count('info')}")
+    print(f"seconds\t{report.seconds:.3f}")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""Backtest the recommendation logic over recorded drafts.
+
+Input is JSON Lines (optionally .gz), one match per line:
+
+  {"picks": [{"team": 0, "hero": "Axe"}, {"team": 1, "hero": "Lion"}, ...],
+   "bans": ["Pudge", ...],           # optional
+   "radiant_win": true}
+
+`team` is 0 for Radiant and 1 for Dire; picks are in draft order. At every
+pick the candidates are scored with `scoring.score_drafts` (the engine's
+score_hero, vectorised) against the picks made so far, excluding heroes
+already picked or banned, and the hero that was actually taken is ranked.
+Each finished lineup is scored as the sum of its heroes' scores against the
+final teams; the Radiant - Dire difference is correlated with the result.
+
+The file is read lazily and evaluated in chunks spread over a process pool
+with a bounded number of chunks in flight, so memory does not grow with the
+file size. Per-chunk results are merged from running sums and a rank
+histogram.
+
+Run:
+  python scripts/backtest.py matches.jsonl.gz --workers 8
+  python scripts/backtest.py matches.jsonl --synergies data/synergies.generated.json
+  python scripts/backtest.py --synthetic 20000 --out synthetic.jsonl   # offline data
+  python scripts/backtest.py synthetic.jsonl --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import itertools
+import json
+import math
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from scoring import compile_tables, load_data, score_drafts
+
+# Captains Mode pick order relative to the first-picking team (bans omitted).
+PICK_ORDER = (0, 1, 1, 0, 0, 1, 1, 0, 0, 1)
+DEFAULT_CHUNK = 1000
+DEFAULT_TOP = (1, 5, 10)
+
+_TABLES = None  # per-process ScoringTables, set by _init_worker
+
+
+def _init_worker(roles_path: str, synergies_path: str) -> None:
+    global _TABLES
+    heroes, roles, synergies = load_data()
+    if roles_path:
+        roles = json.loads(Path(roles_path).read_text(encoding="utf-8"))
+    if synergies_path:
+        synergies = json.loads(Path(synergies_path).read_text(encoding="utf-8"))
+    _TABLES = compile_tables(heroes, roles, synergies)
+
+
+def open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_chunks(path: Path, size: int):
+    with open_text(path) as f:
+        while True:
+            chunk = [line for line in itertools.islice(f, size) if line.strip()]
+            if not chunk:
+                return
+            yield chunk
+
+
+@dataclass
+class Summary:
+    matches: int = 0
+    skipped: int = 0
+    picks: int = 0
+    rank_sum: int = 0
+    percentile_sum: float = 0.0
+    rank_hist: list[int] = field(default_factory=list)  # rank_hist[r - 1] = picks ranked r
+    # Running sums for Pearson r between (radiant - dire) lineup score and radiant_win
+    n: int = 0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxx: float = 0.0
+    syy: float = 0.0
+    sxy: float = 0.0
+    predicted: int = 0
+    correct: int = 0
+
+    def merge(self, other: "Summary") -> None:
+        for name in ("matches", "skipped", "picks", "rank_sum", "percentile_sum",
+                     "n", "sx", "sy", "sxx", "syy", "sxy", "predicted", "correct"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        if len(other.rank_hist) > len(self.rank_hist):
+            self.rank_hist.extend([0] * (len(other.rank_hist) - len(self.rank_hist)))
+        for i, c in enumerate(other.rank_hist):
+            self.rank_hist[i] += c
+
+    def hit_rate(self, k: int) -> float:
+        return sum(self.rank_hist[:k]) / self.picks if self.picks else 0.0
+
+    def median_rank(self) -> int:
+        half, seen = self.picks / 2, 0
+        for r, c in enumerate(self.rank_hist, 1):
+            seen += c
+            if seen >= half:
+                return r
+        return 0
+
+    def correlation(self) -> float:
+        if self.n < 2:
+            return float("nan")
+        cov = self.sxy - self.sx * self.sy / self.n
+        vx = self.sxx - self.sx ** 2 / self.n
+        vy = self.syy - self.sy ** 2 / self.n
+        return cov / math.sqrt(vx * vy) if vx > 0 and vy > 0 else float("nan")
+
+    def report(self, top: tuple[int, ...] = DEFAULT_TOP) -> dict:
+        return {
+            "matches": self.matches,
+            "skipped": self.skipped,
+            "picks": self.picks,
+            **{f"hit@{k}": round(self.hit_rate(k), 4) for k in top},
+            "mean_rank": round(self.rank_sum / self.picks, 2) if self.picks else None,
+            "median_rank": self.median_rank(),
+            "mean_percentile": round(self.percentile_sum / self.picks, 4) if self.picks else None,
+            "win_correlation": round(self.correlation(), 4),
+            "win_prediction_accuracy": round(self.correct / self.predicted, 4) if self.predicted else None,
+        }
+
+
+def parse_match(obj: dict, index: dict[str, int]):
+    """(picks [(team, hero_idx)], bans [hero_idx], radiant_win) or None if unusable."""
+    try:
+        picks = [(int(p["team"]), index[p["hero"]]) for p in obj["picks"]]
+        bans = [index[b] for b in obj.get("bans") or [] if b in index]
+        radiant_win = bool(obj["radiant_win"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not picks or any(t not in (0, 1) for t, _ in picks):
+        return None
+    return picks, bans, radiant_win
+
+
+def pick_steps(tables, matches):
+    """One scoring row per pick: ally/enemy counts, unavailable mask, picked hero."""
+    rows = sum(len(p) for p, _, _ in matches)
+    allies = np.zeros((rows, tables.n), dtype=np.int32)
+    enemies = np.zeros((rows, tables.n), dtype=np.int32)
+    taken = np.zeros((rows, tables.n), dtype=bool)
+    target = np.zeros(rows, dtype=np.int64)
+    r = 0
+    for picks, bans, _ in matches:
+        for i, (team, hero) in enumerate(picks):
+            for t, h in picks[:i]:
+                (allies if t == team else enemies)[r, h] += 1
+                taken[r, h] = True
+            taken[r, bans] = True
+            target[r] = hero
+            r += 1
+    return allies, enemies, taken, target
+
+
+def lineup_scores(tables, matches) -> "np.ndarray":
+    """Radiant minus Dire: each hero scored with its final allies and enemies, summed per team."""
+    rows = sum(len(p) for p, _, _ in matches)
+    allies = np.zeros((rows, tables.n), dtype=np.int32)
+    enemies = np.zeros((rows, tables.n), dtype=np.int32)
+    target = np.zeros(rows, dtype=np.int64)
+    sign = np.zeros(rows, dtype=np.int64)
+    owner = np.zeros(rows, dtype=np.int64)
+    r = 0
+    for m, (picks, _, _) in enumerate(matches):
+        for i, (team, hero) in enumerate(picks):
+            for j, (t, h) in enumerate(picks):
+                if j != i:
+                    (allies if t == team else enemies)[r, h] += 1
+            target[r], sign[r], owner[r] = hero, 1 if team == 0 else -1, m
+            r += 1
+    scores = score_drafts(tables, allies, enemies)[np.arange(rows), target]
+    diff = np.zeros(len(matches), dtype=np.int64)
+    np.add.at(diff, owner, sign * scores)
+    return diff
+
+
+def evaluate_matches(tables, matches) -> Summary:
+    s = Summary(matches=len(matches), rank_hist=[0] * tables.n)
+    if not matches:
+        return s
+
+    allies, enemies, taken, target = pick_steps(tables, matches)
+    scores = score_drafts(tables, allies, enemies)
+    rows = np.arange(len(target))
+    picked = scores[rows, target]
+    available = ~taken
+    rank = 1 + ((scores > picked[:, None]) & available).sum(axis=1)
+    pool = available.sum(axis=1)
+    s.picks = len(target)
+    s.rank_sum = int(rank.sum())
+    s.percentile_sum = float(((rank - 1) / np.maximum(pool - 1, 1)).sum())
+    s.rank_hist = np.bincount(rank - 1, minlength=tables.n).tolist()
+
+    x = lineup_scores(tables, matches).astype(np.float64)
+    y = np.array([win for _, _, win in matches], dtype=np.float64)
+    s.n = len(x)
+    s.sx, s.sy = float(x.sum()), float(y.sum())
+    s.sxx, s.syy, s.sxy = float((x * x).sum()), float((y * y).sum()), float((x * y).sum())
+    decided = x != 0
+    s.predicted = int(decided.sum())
+    s.correct = int(((x > 0) == (y > 0))[decided].sum())
+    return s
+
+
+def evaluate_chunk(lines: list[str]) -> Summary:
+    matches, skipped = [], 0
+    for line in lines:
+        try:
+            m = parse_match(json.loads(line), _TABLES.index)
+        except ValueError:
+            m = None
+        if m is None:
+            skipped += 1
+        else:
+            matches.append(m)
+    s = evaluate_matches(_TABLES, matches)
+    s.skipped = skipped
+    return s
+
+
+def run(path: Path, workers: int, chunk: int, roles_path: str = "", synergies_path: str = "",
+        progress: bool = True) -> Summary:
+    total = Summary()
+    chunks = iter_chunks(path, chunk)
+    if workers <= 1:
+        _init_worker(roles_path, synergies_path)
+        for lines in chunks:
+            total.merge(evaluate_chunk(lines))
+            if progress:
+                print(f"  {total.matches + total.skipped} matches...", end="\r", file=sys.stderr)
+        return total
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(roles_path, synergies_path)) as pool:
+        pending = set()
+        for lines in chunks:
+            pending.add(pool.submit(evaluate_chunk, lines))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    total.merge(f.result())
+                if progress:
+                    print(f"  {total.matches + total.skipped} matches...", end="\r", file=sys.stderr)
+        for f in pending:
+            total.merge(f.result())
+    return total
+
+
+def synthetic_matches(tables, count: int, seed: int = 0, skill: float = 0.6,
+                      scale: float = 20.0, batch: int = 1000):
+    """Drafts where each pick comes from the current top 5 with probability `skill`
+    (uniformly random otherwise) and Radiant wins with probability
+    sigmoid(lineup score difference / scale)."""
+    rng = np.random.default_rng(seed)
+    order = np.array(PICK_ORDER)
+    done = 0
+    while done < count:
+        b = min(batch, count - done)
+        first = rng.integers(0, 2, b)
+        counts = np.zeros((2, b, tables.n), dtype=np.int32)
+        picks = np.zeros((b, len(order)), dtype=np.int64)
+        teams = first[:, None] ^ order[None, :]
+        rows = np.arange(b)
+        for step in range(len(order)):
+            team = teams[:, step]
+            scores = score_drafts(tables, counts[team, rows], counts[1 - team, rows]).astype(np.float64)
+            taken = counts.sum(axis=0) > 0
+            scores[taken] = -np.inf
+            top = np.argsort(-scores, axis=1)[:, :5]
+            noise = rng.random((b, tables.n))
+            noise[taken] = -1.0
+            hero = np.where(rng.random(b) < skill, top[rows, rng.integers(0, 5, b)], noise.argmax(axis=1))
+            picks[:, step] = hero
+            counts[team, rows, hero] += 1
+
+        matches = [([(int(t), int(h)) for t, h in zip(teams[m], picks[m])], [], False) for m in range(b)]
+        diff = lineup_scores(tables, matches)
+        radiant_win = rng.random(b) < 1.0 / (1.0 + np.exp(-diff / scale))
+        for m in range(b):
+            yield {
+                "picks": [{"team": int(t), "hero": tables.names[int(h)]} for t, h in zip(teams[m], picks[m])],
+                "radiant_win": bool(radiant_win[m]),
+            }
+        done += b
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path", nargs="?", help="matches .jsonl or .jsonl.gz")
+    ap.add_argument("--workers", type=int, default=4, help="processes (1 = in-process)")
+    ap.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="matches per work unit")
+    ap.add_argument("--roles", default="", help="roles.json to test instead of data/roles.json")
+    ap.add_argument("--synergies", default="", help="synergies.json to test instead of data/synergies.json")
+    ap.add_argument("--top", default="1,5,10", help="hit@k cut-offs")
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--synthetic", type=int, default=0, metavar="N", help="write N synthetic matches to --out")
+    ap.add_argument("--out", default="", help="output path for --synthetic (.gz compresses; default stdout)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--skill", type=float, default=0.6, help="synthetic: share of picks from the top 5")
+    args = ap.parse_args()
+
+    if args.synthetic:
+        _init_worker(args.roles, args.synergies)
+        out = Path(args.out) if args.out else None
+        f = (gzip.open(out, "wt", encoding="utf-8") if out.suffix == ".gz" else open(out, "w", encoding="utf-8")) \
+            if out else sys.stdout
+        try:
+            for match in synthetic_matches(_TABLES, args.synthetic, args.seed, args.skill):
+                f.write(json.dumps(match, ensure_ascii=False) + "\n")
+        finally:
+            if out:
+                f.close()
+        return 0
+
+    if not args.path:
+        ap.error("path is required unless --synthetic is given")
+
+    top = tuple(int(k) for k in args.top.split(",") if k)
+    t0 = time.perf_counter()
+    total = run(Path(args.path), args.workers, args.chunk, args.roles, args.synergies, progress=not args.json)
+    report = total.report(top)
+    report["seconds"] = round(time.perf_counter() - t0, 2)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+    else:
+        print(" " * 40, end="\r", file=sys.stderr)
+        for k, v in report.items():
+            print(f"{k}\t{v}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Fuzz and microbenchmark suite for the scoring model.
+
+Generates random legal draft states (0-5 allies, 0-5 enemies, up to 14
+bans, no hero twice) and runs each through the full recommend path of
+`ScoringService` (name lookup, team aggregate, scores, ranking), timing it
+cold (empty aggregate cache) and warm (same draft again), grouped by the
+number of picked heroes.
+
+Invariants checked on every draft:
+
+  - no picked or banned hero is recommended, and the list is ranked by score
+  - scores are deterministic: a second, independent service returns the
+    same recommendations, and the vectorised scores match the reference
+    `score_all` on a sample of drafts
+  - explicit counters are symmetric: on random hero pairs (half of them
+    listed in a counter list), the explicit counter term score_hero adds for
+    A against B (A's counter entry for B minus B's for A, each as
+    as_i32(f32(v * 2)), before div10) is the negation of B's against A and
+    equals the explicit part of the compiled enemy_matrix
+
+The same invariants run on small budgets in scripts/tests/test_scoring_invariants.py.
+
+Each run appends a record to data/bench_scoring_history.json tagged with the
+git commit and is compared with the previous run on the same pool, so
+regressions across commits show up as a percentage.
+
+--pool N builds a synthetic pool of N heroes from the real ones (roles, tags
+and phases copied, positions jittered, counters and synergies rewired to
+random synthetic heroes) to show how the model scales past 127 heroes.
+
+Run:
+  python scripts/bench_scoring.py
+  python scripts/bench_scoring.py --drafts 2000 --pool 500
+  python scripts/bench_scoring.py --pool 1000 --no-history --fail-over 25
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from hero_db import DATA_DIR
+from scoring import as_i32, compile_tables, f32, load_data, score_all
+from scoring_service import ScoringService
+from snapshots import atomic_write_text
+
+ROOT = Path(__file__).resolve().parent.parent
+HISTORY_FILE = DATA_DIR / "bench_scoring_history.json"
+MAX_BANS = 14
+# Hero pairs checked for explicit counter symmetry
+COUNTER_PAIRS = 300
+# Records kept in the history file
+HISTORY_LIMIT = 200
+
+
+# --- Draft and pool generation ---------------------------------------------
+
+def random_draft_states(names: list[str], count: int, seed: int = 0):
+    """[(allies, enemies, bans)] with every hero used at most once."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        n_allies, n_enemies = rng.randint(0, 5), rng.randint(0, 5)
+        n_bans = rng.randint(0, MAX_BANS)
+        picked = rng.sample(names, n_allies + n_enemies + n_bans)
+        out.append((picked[:n_allies], picked[n_allies:n_allies + n_enemies], picked[n_allies + n_enemies:]))
+    return out
+
+
+def synthetic_pool(heroes: dict[str, dict], size: int, seed: int = 0) -> dict[str, dict]:
+    """`size` heroes modelled on the real ones, with counters/synergies among themselves."""
+    rng = random.Random(seed)
+    templates = [heroes[n] for n in sorted(heroes)]
+    names = [f"{templates[i % len(templates)]['name']} #{i // len(templates)}" for i in range(size)]
+    pool = {}
+    for i, name in enumerate(names):
+        t = templates[i % len(templates)]
+        positions = {p: round(max(0.0, v + rng.uniform(-5.0, 5.0)), 1) for p, v in (t.get("positions") or {}).items()}
+        others = [n for n in rng.sample(names, min(len(names), 21)) if n != name]
+        counter_values = list((t.get("explicit_counters") or {}).values())
+        synergy_values = list((t.get("explicit_synergies") or {}).values())
+        pool[name] = {
+            **t,
+            "name": name,
+            "positions": positions,
+            "explicit_counters": dict(zip(others[:len(counter_values)], counter_values)),
+            "explicit_synergies": dict(zip(others[10:10 + len(synergy_values)], synergy_values)),
+        }
+    return pool
+
+
+# --- Invariants --------------------------------------------------------------
+
+def check_recommendation(recs: list[tuple[str, int]], scores: dict[str, int], taken: set[str],
+                         limit: int, free: int) -> list[str]:
+    problems = []
+    leaked = [name for name, _ in recs if name in taken]
+    if leaked:
+        problems.append(f"picked or banned heroes recommended: {', '.join(leaked)}")
+    if len(recs) != min(limit, free):
+        problems.append(f"{len(recs)} recommendations for {free} free heroes")
+    values = [s for _, s in recs]
+    if values != sorted(values, reverse=True):
+        problems.append("recommendations are not ranked by score")
+    wrong = [name for name, s in recs if scores.get(name) != s]
+    if wrong:
+        problems.append(f"recommended score differs from the reference for {', '.join(wrong)}")
+    return problems
+
+
+def counter_pairs(heroes: dict[str, dict], count: int, seed: int = 0) -> list[tuple[str, str]]:
+    """`count` distinct-hero pairs: half with a listed counter entry, half uniformly random."""
+    rng = random.Random(seed)
+    names = sorted(heroes)
+    listed = [(a, b) for a in names for b in sorted(heroes[a].get("explicit_counters") or {}) if b in heroes and b != a]
+    pairs = rng.sample(listed, min(len(listed), count // 2))
+    return pairs + [tuple(rng.sample(names, 2)) for _ in range(count - len(pairs))]
+
+
+def explicit_counter(heroes: dict[str, dict], hero: str, enemy: str) -> int:
+    """Explicit counter term of `hero` against `enemy` as score_hero adds it (before div10)."""
+    def term(owner: str, other: str) -> int:
+        v = (heroes[owner].get("explicit_counters") or {}).get(other)
+        return as_i32(f32(v * 2.0)) if v is not None else 0
+    return term(hero, enemy) - term(enemy, hero)
+
+
+def counter_asymmetry(tables, heroes: dict[str, dict],
+                      pairs: list[tuple[str, str]]) -> list[tuple[str, str, int, int, int]]:
+    """(A, B, explicit A vs B, explicit B vs A, compiled A vs B) for pairs that break the invariant."""
+    bad = []
+    for a, b in pairs:
+        ab, ba = explicit_counter(heroes, a, b), explicit_counter(heroes, b, a)
+        i, j = tables.index[a], tables.index[b]
+        compiled = int(tables.enemy_matrix[i, j] - tables.tag_counter_pairs[i, j])
+        compiled_ba = int(tables.enemy_matrix[j, i] - tables.tag_counter_pairs[j, i])
+        if ab != -ba or ab != compiled or ba != compiled_ba:
+            bad.append((a, b, ab, ba, compiled))
+    return bad
+
+
+# --- Benchmark ---------------------------------------------------------------
+
+def _summary(us: list[float]) -> dict[str, float]:
+    a = np.asarray(us)
+    return {"mean_us": round(float(a.mean()), 1),
+            "p50_us": round(float(np.percentile(a, 50)), 1),
+            "p99_us": round(float(np.percentile(a, 99)), 1)}
+
+
+def run_bench(heroes: dict, roles: dict, synergies: dict, drafts, limit: int, reference: int) -> tuple[dict, list[str]]:
+    t0 = time.perf_counter()
+    tables = compile_tables(heroes, roles, synergies)
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    service = ScoringService(tables)
+    twin = ScoringService(compile_tables(heroes, roles, synergies))
+    cold, warm = [], []
+    by_picks: dict[int, list[float]] = {}
+    violations: list[str] = []
+
+    for d, (allies, enemies, bans) in enumerate(drafts):
+        service.clear()
+        t = time.perf_counter_ns()
+        recs = service.recommend(allies, enemies, limit, exclude=bans)
+        cold_us = (time.perf_counter_ns() - t) / 1000
+        t = time.perf_counter_ns()
+        again = service.recommend(allies, enemies, limit, exclude=bans)
+        warm_us = (time.perf_counter_ns() - t) / 1000
+        cold.append(cold_us)
+        warm.append(warm_us)
+        by_picks.setdefault(len(allies) + len(enemies), []).append(cold_us)
+
+        problems = []
+        if again != recs or twin.recommend(allies, enemies, limit, exclude=bans) != recs:
+            problems.append("recommendations are not deterministic")
+        if d < reference:
+            scores = score_all(allies, enemies, heroes, roles, synergies)
+        else:
+            row = service.scores(service.indices(allies), service.indices(enemies))
+            scores = dict(zip(tables.names, map(int, row)))
+        taken = set(allies) | set(enemies) | set(bans)
+        problems += check_recommendation(recs, scores, taken, limit, tables.n - len(taken))
+        violations += [f"draft {d}: {p}\tallies={allies} enemies={enemies} bans={bans}" for p in problems]
+
+    asymmetric = counter_asymmetry(tables, heroes, counter_pairs(heroes, COUNTER_PAIRS))
+    violations += [f"explicit counters of {a} and {b} do not cancel out: {a} vs {b} {ab:+d}, {b} vs {a} {ba:+d},"
+                   f" enemy_matrix {compiled:+d}" for a, b, ab, ba, compiled in asymmetric]
+
+    return {
+        "heroes": tables.n,
+        "drafts": len(drafts),
+        "compile_ms": round(compile_ms, 1),
+        "cold": _summary(cold),
+        "warm": _summary(warm),
+        "by_picks": {str(k): _summary(v)["p50_us"] for k, v in sorted(by_picks.items())},
+        "violations": len(violations),
+    }, violations
+
+
+# --- History -----------------------------------------------------------------
+
+def git_commit() -> tuple[str | None, bool]:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def load_history(path: Path) -> list[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def previous_run(history: list[dict], record: dict) -> dict | None:
+    """Latest record for the same pool and workload."""
+    key = ("heroes", "synthetic", "drafts", "seed", "limit")
+    for old in reversed(history):
+        if all(old.get(k) == record.get(k) for k in key):
+            return old
+    return None
+
+
+def _change(new: float, old: float) -> float:
+    return (new - old) / old * 100.0 if old else 0.0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--drafts", type=int, default=1000, help="random draft states to run")
+    ap.add_argument("--pool", type=int, default=0, metavar="N", help="synthetic pool of N heroes (0 = real data)")
+    ap.add_argument("--limit", type=int, default=10, help="recommendations per draft")
+    ap.add_argument("--reference", type=int, default=50, metavar="N",
+                    help="check the first N drafts against the reference score_all")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--history", default=str(HISTORY_FILE))
+    ap.add_argument("--no-history", action="store_true", help="do not record this run")
+    ap.add_argument("--fail-over", type=float, default=0.0, metavar="PCT",
+                    help="exit 1 if cold p50 is more than PCT%% slower than the previous run")
+    ap.add_argument("--json", action="store_true", help="print the record as JSON")
+    args = ap.parse_args()
+
+    heroes, roles, synergies = load_data()
+    if args.pool:
+        heroes = synthetic_pool(heroes, args.pool, args.seed)
+    drafts = random_draft_states(sorted(heroes), args.drafts, args.seed)
+    result, violations = run_bench(heroes, roles, synergies, drafts, args.limit, args.reference)
+
+    commit, dirty = git_commit()
+    record = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "synthetic": bool(args.pool),
+        "seed": args.seed,
+        "limit": args.limit,
+        **result,
+    }
+    history_path = Path(args.history)
+    history = load_history(history_path)
+    prev = previous_run(history, record)
+    if not args.no_history:
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(history_path, json.dumps((history + [record])[-HISTORY_LIMIT:], indent=1))
+
+    for v in violations[:20]:
+        print(v, file=sys.stderr)
+    if args.json:
+        print(json.dumps(record, indent=2))
+    else:
+        print(f"heroes\t{record['heroes']}{' (synthetic)' if args.pool else ''}")
+        print(f"drafts\t{record['drafts']}")
+        print(f"compile_tables\t{record['compile_ms']} ms")
+        for mode in ("cold", "warm"):
+            s = record[mode]
+            print(f"{mode}\tp50 {s['p50_us']} us\tp99 {s['p99_us']} us\tmean {s['mean_us']} us")
+        for picks, p50 in record["by_picks"].items():
+            print(f"picks={picks}\tp50 {p50} us")
+        print(f"violations\t{record['violations']}")
+
+    regressed = False
+    if prev is not None:
+        change = _change(record["cold"]["p50_us"], prev["cold"]["p50_us"])
+        print(f"vs {prev.get('commit') or '?'}\tcold p50 {change:+.1f}%\t"
+              f"warm p50 {_change(record['warm']['p50_us'], prev['warm']['p50_us']):+.1f}%")
+        regressed = bool(args.fail_over) and change > args.fail_over
+    return 1 if violations or regressed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
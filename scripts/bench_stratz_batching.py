@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark batched vs per-hero Stratz matchup queries against a recorded-response stub.
+
+Starts `stratz_stub_server` in-process (serving a recording, synthetic if none
+is given), runs the full fetch stage of `stratz_hero_requests.py` once per
+batch size and reports HTTP requests, 429s, rejected-as-too-complex queries,
+bytes and wall time.
+
+Run:
+  python scripts/bench_stratz_batching.py
+  python scripts/bench_stratz_batching.py --sizes 1,8,16,32 --max-aliases 20 --latency 0.08
+  python scripts/bench_stratz_batching.py --recording data/stratz_recording.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+
+import stratz_hero_requests as shr
+from stratz_sources import StratzSource
+from stratz_stub_server import StubState, serve
+
+
+def run_once(recording: dict, batch_size: int, args) -> dict:
+    state = StubState(latency=args.latency, rate=args.server_rate, max_aliases=args.max_aliases, recording=recording)
+    server = serve(state)
+    host, port = server.server_address[:2]
+    try:
+        run_args = shr.parse_args([
+            "bench-token", str(args.workers),
+            "--api-url", f"http://{host}:{port}/graphql",
+            "--rate", str(args.rate),
+            "--batch-size", str(batch_size),
+            "--skip-update",
+        ])
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            heroes = asyncio.run(shr.run(run_args, StratzSource()))
+        wall = time.perf_counter() - t0
+    finally:
+        server.shutdown()
+    filled = sum(1 for h in heroes or [] if h["counters"])
+    return {"batch": batch_size, "requests": state.counts["requests"], "429": state.counts["429"],
+            "too_complex": state.counts["too_complex"], "bytes": state.counts["bytes"],
+            "heroes": filled, "wall_s": round(wall, 3)}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--recording", default="", help="stub recording (see stratz_stub_server.py --save-recording)")
+    ap.add_argument("--sizes", default="1,4,10,25")
+    ap.add_argument("--latency", type=float, default=0.05, help="stub latency per request, sec")
+    ap.add_argument("--max-aliases", type=int, default=16, help="stub complexity limit (aliases per document)")
+    ap.add_argument("--server-rate", type=float, default=0.0, help="stub requests/sec before 429 (0 = unlimited)")
+    ap.add_argument("--rate", type=float, default=20.0, help="client requests/sec")
+    ap.add_argument("--workers", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args()
+
+    if args.recording:
+        with open(args.recording, "r", encoding="utf-8") as f:
+            recording = json.load(f)
+    else:
+        recording = StubState().record()
+
+    results = [run_once(recording, int(size), args) for size in args.sizes.split(",")]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("batch\trequests\t429\ttoo_complex\tMB\theroes\twall_s")
+    for r in results:
+        print(f"{r['batch']}\t{r['requests']}\t{r['429']}\t{r['too_complex']}\t"
+              f"{r['bytes'] / 1e6:.1f}\t{r['heroes']}\t{r['wall_s']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
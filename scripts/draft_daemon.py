@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Long-running local scoring daemon (HTTP on 127.0.0.1).
+
+Keeps the hero data and the compiled scoring tables in memory so scripts
+and bulk jobs do not pay interpreter startup and 127 JSON parses per call.
+The data comes from the current published snapshot (snapshots.py), so a
+refresh in progress is never seen half-written; the model is swapped
+atomically when a new snapshot is published (checked every --poll seconds)
+and requests in flight finish on the model they started with. Without any
+snapshot it reads data/ directly and watches the source fingerprint.
+
+Endpoints (POST bodies are JSON; every POST takes {"drafts": [...]} or a
+single draft object and answers {"results": [...]} in the same order):
+
+  POST /recommend  draft: {"allies": [], "enemies": [], "limit": 10, "exclude": []}
+                   -> [{"hero", "score", "reasons"}]
+  POST /score      draft: {"allies": [], "enemies": [], "heroes": [...] optional}
+                   -> {hero: score}
+  POST /explain    draft: {"allies": [], "enemies": [], "hero": name}
+                   -> {"hero", "score", "reasons"}
+  GET  /metrics    request counts and p50/p99 latency per endpoint, cache counters
+  GET  /health     {"ok": true, "heroes": n, "fingerprint": ...}
+  POST /reload     reload the data now
+
+Run:
+  python scripts/draft_daemon.py --port 8765
+  curl -s localhost:8765/recommend -d '{"allies": ["Axe"], "enemies": ["Pudge"], "limit": 5}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import hero_names
+from hero_db import source_fingerprint
+from scoring import compile_tables, explain, load_data
+from scoring_service import DEFAULT_CACHE, ScoringService
+from snapshots import Snapshot, SnapshotReader
+
+DEFAULT_PORT = 8765
+DEFAULT_POLL = 2.0
+LATENCY_WINDOW = 10_000
+MAX_BODY = 16 * 1024 * 1024
+
+
+class BadRequest(ValueError):
+    pass
+
+
+@dataclass
+class Model:
+    heroes: dict[str, dict]
+    service: ScoringService
+    fingerprint: str
+    loaded_at: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @classmethod
+    def load(cls, cache_size: int = DEFAULT_CACHE, snapshot: Snapshot | None = None) -> "Model":
+        """Model of `snapshot`, or of data/ itself when there is none (fingerprint = source stat digest)."""
+        if snapshot is not None:
+            heroes, roles, synergies, fingerprint = snapshot.heroes, snapshot.roles, snapshot.synergies, snapshot.name
+        else:
+            fingerprint = source_fingerprint().hex()
+            heroes, roles, synergies = load_data()
+        return cls(heroes, ScoringService(compile_tables(heroes, roles, synergies), cache_size),
+                   fingerprint, time.time())
+
+    def _names(self, refs, what: str) -> list[str]:
+        """Canonical names for ids, names, slugs or typos (hero_names index)."""
+        if not isinstance(refs, list):
+            raise BadRequest(f"{what} must be a list")
+        names, unknown = hero_names.index().names(refs)
+        unknown += [n for n in names if n not in self.service.tables.index]
+        if unknown:
+            raise BadRequest(f"unknown heroes in {what}: {', '.join(map(str, unknown))}")
+        return names
+
+    def _indices(self, refs, what: str) -> list[int]:
+        index = self.service.tables.index
+        return [index[n] for n in self._names(refs, what)]
+
+    def _scores(self, draft: dict) -> "np.ndarray":
+        allies = self._indices(draft.get("allies", []), "allies")
+        enemies = self._indices(draft.get("enemies", []), "enemies")
+        # The LRU and its counters are not thread-safe
+        with self.lock:
+            return self.service.scores(allies, enemies)
+
+    def recommend(self, draft: dict) -> list[dict]:
+        scores = self._scores(draft)
+        enemies = self._names(draft.get("enemies", []), "enemies")
+        taken = (set(self._names(draft.get("allies", []), "allies")) | set(enemies)
+                 | set(self._names(draft.get("exclude", []), "exclude")))
+        names = self.service.tables.names
+        ranked = sorted((i for i in range(len(names)) if names[i] not in taken),
+                        key=lambda i: (-scores[i], names[i]))
+        return [{"hero": names[i], "score": int(scores[i]), "reasons": explain(self.heroes[names[i]], enemies, self.heroes)}
+                for i in ranked[:int(draft.get("limit", 10))]]
+
+    def score(self, draft: dict) -> dict[str, int]:
+        scores = self._scores(draft)
+        names = self.service.tables.names
+        wanted = draft.get("heroes")
+        if wanted is None:
+            return {name: int(s) for name, s in zip(names, scores)}
+        return {names[i]: int(scores[i]) for i in self._indices(wanted, "heroes")}
+
+    def explain(self, draft: dict) -> dict:
+        (name,) = self._names([draft.get("hero")], "hero")
+        scores = self._scores(draft)
+        return {"hero": name, "score": int(scores[self.service.tables.index[name]]),
+                "reasons": explain(self.heroes[name], self._names(draft.get("enemies", []), "enemies"), self.heroes)}
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: dict[str, deque] = {}
+        self._count: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._drafts: dict[str, int] = {}
+
+    def record(self, endpoint: str, seconds: float, drafts: int, ok: bool) -> None:
+        with self._lock:
+            self._latency.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+            self._count[endpoint] = self._count.get(endpoint, 0) + 1
+            self._drafts[endpoint] = self._drafts.get(endpoint, 0) + drafts
+            if not ok:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for endpoint, window in self._latency.items():
+                ms = np.array(window) * 1000.0
+                out[endpoint] = {
+                    "requests": self._count[endpoint],
+                    "errors": self._errors.get(endpoint, 0),
+                    "drafts": self._drafts.get(endpoint, 0),
+                    "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                    "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                }
+            return out
+
+
+class Daemon:
+    def __init__(self, cache_size: int = DEFAULT_CACHE):
+        self.cache_size = cache_size
+        self.snapshots = SnapshotReader()
+        self.model = Model.load(cache_size, self.snapshots.get())
+        self.metrics = Metrics()
+        self.started = time.time()
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def reload(self, force: bool = False) -> bool:
+        """Swap in a fresh model if a new snapshot was published (or always with force)."""
+        with self._reload_lock:
+            switched = self.snapshots.poll()
+            snapshot = self.snapshots.get()
+            if snapshot is not None:
+                stale = switched or snapshot.name != self.model.fingerprint
+            else:
+                stale = source_fingerprint().hex() != self.model.fingerprint
+            if not (force or stale):
+                return False
+            hero_names.index.cache_clear()
+            self.model = Model.load(self.cache_size, snapshot)
+            self.reloads += 1
+            return True
+
+    def watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                if self.reload():
+                    print(f"reloaded data ({self.model.fingerprint})", file=sys.stderr)
+            except (OSError, ValueError, KeyError) as e:
+                # Half-written refresh: keep serving the old model and retry next tick
+                print(f"reload failed: {e}", file=sys.stderr)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> dict:
+        model = self.model
+        return {
+            "ok": True,
+            "heroes": model.service.tables.n,
+            "fingerprint": model.fingerprint,
+            "loaded_at": model.loaded_at,
+            "uptime": round(time.time() - self.started, 1),
+            "reloads": self.reloads,
+        }
+
+    def metrics_snapshot(self) -> dict:
+        return {**self.status(), "endpoints": self.metrics.snapshot(), "cache": self.model.service.stats()}
+
+
+def make_handler(daemon: Daemon):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # keep stderr for reloads and errors
+            pass
+
+        def _send(self, status: int, payload) -> None:
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, daemon.metrics_snapshot())
+            elif self.path == "/health":
+                self._send(200, daemon.status())
+            else:
+                self._send(404, {"error": f"no such endpoint: {self.path}"})
+
+        def do_POST(self):
+            endpoint = self.path
+            if endpoint == "/reload":
+                daemon.reload(force=True)
+                self._send(200, daemon.status())
+                return
+            if endpoint not in ("/recommend", "/score", "/explain"):
+                self._send(404, {"error": f"no such endpoint: {endpoint}"})
+                return
+
+            start = time.perf_counter()
+            drafts, ok = 0, False
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY:
+                    raise BadRequest("request body too large")
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError as e:
+                    raise BadRequest(f"invalid JSON: {e}") from None
+                batch = body.get("drafts") if isinstance(body, dict) and "drafts" in body else [body]
+                if not isinstance(batch, list) or not all(isinstance(d, dict) for d in batch):
+                    raise BadRequest("drafts must be a list of objects")
+                drafts = len(batch)
+                model = daemon.model
+                handle = getattr(model, endpoint[1:])
+                results = [handle(d) for d in batch]
+                ok = True
+            except (ValueError, TypeError) as e:  # BadRequest, or a malformed field such as "limit"
+                self._send(400, {"error": str(e)})
+            else:
+                self._send(200, {"results": results})
+            finally:
+                daemon.metrics.record(endpoint, time.perf_counter() - start, drafts, ok)
+
+    return Handler
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--poll", type=float, default=DEFAULT_POLL, help="seconds between data change checks (0 = off)")
+    ap.add_argument("--cache", type=int, default=DEFAULT_CACHE, help="draft aggregates kept in the LRU")
+    args = ap.parse_args()
+
+    daemon = Daemon(args.cache)
+    if args.poll > 0:
+        threading.Thread(target=daemon.watch, args=(args.poll,), daemon=True).start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(daemon))
+    server.daemon_threads = True
+    print(f"listening on http://{args.host}:{args.port} ({daemon.model.service.tables.n} heroes)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
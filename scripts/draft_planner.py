@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Look-ahead draft planner over the Captains Mode pick/ban order.
+
+`Drafter::recommend` ranks each free hero by its own score against the
+current teams. This planner searches the rest of the sequence instead:
+
+- our turns are max nodes over the `beam` best candidates (picks by our
+  score; bans by the opponent's score, i.e. denying their best pick);
+- opponent turns are chance nodes over their `replies` most likely moves,
+  weighted by a softmax of their greedy scores (expectimax);
+- a position is worth V(us vs them) - V(them vs us), where V sums every
+  member's score_hero against the other four and the enemy team.
+
+Candidate rows and team values are memoised by sorted team tuples, search
+is iterative deepening under a wall-clock budget (the deepest completed
+depth wins), and root moves can be expanded in a process pool.
+
+Run:
+  python scripts/draft_planner.py --allies "Crystal Maiden" --enemies Axe Pudge --bans Tinker --side first
+  python scripts/draft_planner.py --enemies Axe --side second --budget 2 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+
+import hero_names
+from scoring import compile_tables, load_data, score_drafts
+
+# (team, action) in order; team 0 has first pick.
+CM_SEQUENCE = (
+    [(0, "ban"), (0, "ban"), (1, "ban"), (1, "ban"), (0, "ban"), (1, "ban"), (1, "ban")]
+    + [(0, "pick"), (1, "pick")]
+    + [(0, "ban"), (0, "ban"), (1, "ban")]
+    + [(1, "pick"), (0, "pick"), (0, "pick"), (1, "pick"), (1, "pick"), (0, "pick")]
+    + [(0, "ban"), (1, "ban"), (0, "ban"), (1, "ban")]
+    + [(0, "pick"), (1, "pick")]
+)
+
+DEFAULT_BUDGET = 1.0
+DEFAULT_BEAM = 6
+DEFAULT_REPLIES = 4
+DEFAULT_TEMPERATURE = 5.0
+CACHE_SIZE = 200_000
+
+
+class Timeout(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class DraftState:
+    """Hero indices into ScoringTables.names; `us` is 0 when we pick first."""
+    us: int
+    allies: tuple[int, ...] = ()
+    enemies: tuple[int, ...] = ()
+    bans: tuple[int, ...] = ()
+
+    @property
+    def step(self) -> int:
+        return len(self.allies) + len(self.enemies) + len(self.bans)
+
+    @property
+    def done(self) -> bool:
+        return self.step >= len(CM_SEQUENCE)
+
+    def turn(self) -> tuple[bool, str]:
+        """(our turn?, "pick" | "ban")."""
+        team, action = CM_SEQUENCE[self.step]
+        return team == self.us, action
+
+    def taken(self) -> set[int]:
+        return set(self.allies) | set(self.enemies) | set(self.bans)
+
+    def apply(self, hero: int) -> "DraftState":
+        ours, action = self.turn()
+        if action == "ban":
+            return DraftState(self.us, self.allies, self.enemies, self.bans + (hero,))
+        if ours:
+            return DraftState(self.us, self.allies + (hero,), self.enemies, self.bans)
+        return DraftState(self.us, self.allies, self.enemies + (hero,), self.bans)
+
+
+class _LRU(OrderedDict):
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+
+    def put(self, key, value):
+        self[key] = value
+        if len(self) > self.size:
+            self.popitem(last=False)
+        return value
+
+
+class Planner:
+    def __init__(self, tables, beam: int = DEFAULT_BEAM, replies: int = DEFAULT_REPLIES,
+                 temperature: float = DEFAULT_TEMPERATURE, cache_size: int = CACHE_SIZE):
+        self.tables = tables
+        self.beam = beam
+        self.replies = replies
+        self.temperature = temperature
+        self._rows = _LRU(cache_size)
+        self._values = _LRU(cache_size)
+        self.nodes = 0
+        self.deadline = float("inf")
+
+    # --- memoised scoring --------------------------------------------------
+
+    def candidate_scores(self, team: tuple[int, ...], opp: tuple[int, ...]) -> "np.ndarray":
+        """score_hero of every hero joining `team` against `opp`."""
+        key = (tuple(sorted(team)), tuple(sorted(opp)))
+        row = self._rows.get(key)
+        if row is None:
+            allies = np.zeros((1, self.tables.n), dtype=np.int32)
+            enemies = np.zeros((1, self.tables.n), dtype=np.int32)
+            allies[0, list(team)] = 1
+            enemies[0, list(opp)] = 1
+            row = self._rows.put(key, score_drafts(self.tables, allies, enemies)[0])
+        return row
+
+    def team_value(self, team: tuple[int, ...], opp: tuple[int, ...]) -> int:
+        """Sum of each member's score with the rest of `team` as allies."""
+        key = (tuple(sorted(team)), tuple(sorted(opp)))
+        value = self._values.get(key)
+        if value is None:
+            if not team:
+                value = 0
+            else:
+                allies = np.zeros((len(team), self.tables.n), dtype=np.int32)
+                enemies = np.zeros((len(team), self.tables.n), dtype=np.int32)
+                for r, h in enumerate(key[0]):
+                    others = [x for x in key[0] if x != h]
+                    allies[r, others] = 1
+                    enemies[r, list(opp)] = 1
+                scores = score_drafts(self.tables, allies, enemies)
+                value = int(scores[np.arange(len(team)), list(key[0])].sum())
+            self._values.put(key, value)
+        return value
+
+    def evaluate(self, state: DraftState) -> float:
+        return float(self.team_value(state.allies, state.enemies) - self.team_value(state.enemies, state.allies))
+
+    # --- search -----------------------------------------------------------
+
+    def moves(self, state: DraftState, width: int) -> tuple["np.ndarray", "np.ndarray"]:
+        """(`width` best heroes for the side to move, their greedy scores)."""
+        ours, action = state.turn()
+        team, opp = (state.allies, state.enemies) if ours else (state.enemies, state.allies)
+        # A ban denies the other side's best pick
+        row = self.candidate_scores(opp, team) if action == "ban" else self.candidate_scores(team, opp)
+        row = row.astype(np.float64)
+        taken = list(state.taken())
+        row[taken] = -np.inf
+        width = min(width, self.tables.n - len(taken))
+        best = np.argpartition(-row, width - 1)[:width]
+        best = best[np.argsort(-row[best], kind="stable")]
+        return best, row[best]
+
+    def search(self, state: DraftState, depth: int) -> float:
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.perf_counter() > self.deadline:
+            raise Timeout
+        if depth == 0 or state.done:
+            return self.evaluate(state)
+        ours, _ = state.turn()
+        if ours:
+            heroes, _ = self.moves(state, self.beam)
+            return max(self.search(state.apply(int(h)), depth - 1) for h in heroes)
+        heroes, prior = self.moves(state, self.replies)
+        p = np.exp((prior - prior.max()) / self.temperature)
+        p /= p.sum()
+        return float(sum(w * self.search(state.apply(int(h)), depth - 1) for h, w in zip(heroes, p)))
+
+    def plan(self, state: DraftState, budget: float = DEFAULT_BUDGET, max_depth: int = 8,
+             pool: ProcessPoolExecutor | None = None) -> dict:
+        """Rank our candidate moves by look-ahead value within `budget` seconds.
+
+        Returns {"moves": [(hero, value, greedy score)], "depth": completed depth, "nodes": n}.
+        """
+        start = time.perf_counter()
+        self.deadline = start + budget
+        ours, _ = state.turn()
+        if not ours:
+            raise ValueError("not our turn")
+        heroes, greedy = self.moves(state, self.beam)
+        remaining = len(CM_SEQUENCE) - state.step
+        # Depth 1 (our move + static evaluation) always completes so there is an answer.
+        values = [self.evaluate(state.apply(int(h))) for h in heroes]
+        completed = 1
+        for depth in range(2, min(max_depth, remaining) + 1):
+            try:
+                if pool is None:
+                    values_d = [self.search(state.apply(int(h)), depth - 1) for h in heroes]
+                else:
+                    values_d = self._parallel(pool, state, heroes, depth - 1)
+            except Timeout:
+                break
+            values, completed = values_d, depth
+            if time.perf_counter() > self.deadline:
+                break
+        order = np.argsort(-np.array(values), kind="stable")
+        return {
+            "moves": [(self.tables.names[int(heroes[i])], values[i], int(greedy[i])) for i in order],
+            "depth": completed,
+            "nodes": self.nodes,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    def _parallel(self, pool, state: DraftState, heroes, depth: int) -> list[float]:
+        futures = [pool.submit(_search_worker, state.apply(int(h)), depth, self.deadline, self.beam,
+                               self.replies, self.temperature) for h in heroes]
+        done, pending = wait(futures, timeout=max(0.0, self.deadline - time.perf_counter()))
+        if pending:
+            for f in pending:
+                f.cancel()
+            raise Timeout
+        results = [f.result() for f in futures]
+        self.nodes += sum(nodes for _, nodes in results)
+        if any(value is None for value, _ in results):
+            raise Timeout
+        return [value for value, _ in results]
+
+
+_WORKER: Planner | None = None
+
+
+def _init_worker() -> None:
+    global _WORKER
+    _WORKER = Planner(compile_tables(*load_data()))
+
+
+def _search_worker(state: DraftState, depth: int, deadline: float, beam: int, replies: int,
+                   temperature: float) -> tuple[float | None, int]:
+    # perf_counter is system-wide on the platforms we run on, so the deadline carries over.
+    _WORKER.beam, _WORKER.replies, _WORKER.temperature = beam, replies, temperature
+    _WORKER.deadline = deadline
+    _WORKER.nodes = 0
+    try:
+        return _WORKER.search(state, depth), _WORKER.nodes
+    except Timeout:
+        return None, _WORKER.nodes
+
+
+def make_pool(workers: int) -> ProcessPoolExecutor | None:
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(workers, initializer=_init_worker)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--allies", nargs="*", default=[])
+    ap.add_argument("--enemies", nargs="*", default=[])
+    ap.add_argument("--bans", nargs="*", default=[], help="all bans so far, either side")
+    ap.add_argument("--side", choices=("first", "second"), default="first", help="our side of the CM order")
+    ap.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds per move")
+    ap.add_argument("--depth", type=int, default=8, help="max plies to look ahead")
+    ap.add_argument("--beam", type=int, default=DEFAULT_BEAM, help="our candidates per turn")
+    ap.add_argument("--replies", type=int, default=DEFAULT_REPLIES, help="opponent moves per turn")
+    ap.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE,
+                    help="softmax temperature of the opponent model (score points)")
+    ap.add_argument("--workers", type=int, default=0, help="processes for root moves (0 = in-process)")
+    args = ap.parse_args()
+
+    tables = compile_tables(*load_data())
+    names = hero_names.index()
+    args.allies, unknown = names.names(args.allies)
+    args.enemies, unknown_enemies = names.names(args.enemies)
+    args.bans, unknown_bans = names.names(args.bans)
+    unknown += unknown_enemies + unknown_bans
+    if unknown:
+        print(f"unknown heroes: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    state = DraftState(
+        us=0 if args.side == "first" else 1,
+        allies=tuple(tables.index[n] for n in args.allies),
+        enemies=tuple(tables.index[n] for n in args.enemies),
+        bans=tuple(tables.index[n] for n in args.bans),
+    )
+    if state.done:
+        print("draft is complete", file=sys.stderr)
+        return 1
+    ours, action = state.turn()
+    if not ours:
+        print(f"step {state.step + 1} is the opponent's {action}", file=sys.stderr)
+        return 1
+
+    planner = Planner(tables, args.beam, args.replies, args.temperature)
+    pool = make_pool(args.workers)
+    try:
+        result = planner.plan(state, args.budget, args.depth, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    print(f"step\t{state.step + 1}/{len(CM_SEQUENCE)} ({action})")
+    print(f"depth\t{result['depth']}\tnodes\t{result['nodes']}\tseconds\t{result['seconds']}")
+    for name, value, greedy in result["moves"]:
+        print(f"{name}\tvalue={value:+.1f}\tgreedy={greedy}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
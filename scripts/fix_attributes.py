@@ -1,7 +1,7 @@
 import json
-from pathlib import Path
 
-heroes_dir = Path("data/heroes")
+import hero_db
+import hero_names
 
 # Correct attribute mapping based on provided screenshots
 attribute_map = {
@@ -57,16 +57,27 @@ attribute_map = {
     "Void Spirit": "universal", "Windranger": "universal"
 }
 
+# Keys of attribute_map may use old or alternative names; resolve them once through the index
+names = hero_names.index()
+attributes = {}
+for key, attribute in attribute_map.items():
+    entry = names.resolve(key, fuzzy=False)
+    if entry is None:
+        print(f"WARNING: Unknown hero in attribute_map: {key}")
+    else:
+        attributes[entry.name] = attribute
+
 # Process all hero JSON files
 updated_count = 0
-for hero_file in heroes_dir.glob("*.json"):
+for entry in names:
+    hero_file = entry.path
     with open(hero_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
     
-    hero_name = data.get("name", "")
+    hero_name = entry.name
     
-    if hero_name in attribute_map:
-        new_attribute = attribute_map[hero_name]
+    if hero_name in attributes:
+        new_attribute = attributes[hero_name]
         old_attribute = data.get("primary_attribute", "unknown")
         
         if old_attribute != new_attribute:
@@ -80,4 +91,7 @@ for hero_file in heroes_dir.glob("*.json"):
     else:
         print(f"WARNING: Unknown hero: {hero_name}")
 
+if updated_count:
+    hero_db.compile_db()
+
 print(f"\nTotal updated: {updated_count}")
@@ -5,38 +5,278 @@ Uses:
 - explicit_synergies (positive): derive unordered tag pairs that correlate with good teammates
 - explicit_counters (negative on victim): derive directional pairs (enemy_tag + our_tag) that correlate with good counters
 
-This is a helper for curating `data/synergies.json`.
+This is a helper for curating `data/synergies.json`. Heroes are read from the
+compiled data/heroes.db (rebuilt from the JSON files when stale).
+
+Tags are interned to integer ids and each source becomes a hero x tag
+incidence matrix T plus hero x hero score matrices S; tag-pair sums and
+sample counts are then T^T . S . T (scipy.sparse when installed, NumPy
+otherwise). Several sources can be mined at once with `--patches`, one
+process per source, and are pooled before filtering:
+
+- a directory of hero JSON files (e.g. an archived data/heroes of an older patch)
+- a dota_heroes_matrix.npz from stratz_hero_requests.py (every hero pair,
+  not just the top-10 lists; tags come from the current heroes)
+
+A matrix holds every hero pair twice (A with B and B with A, the same
+games), so its synergy matrices are folded to one entry per unordered pair
+before mining; a tag-pair sample from a matrix is one hero pair, not one
+orientation. Hero JSON sources keep the counting of the original pair loops.
+
+`--weighted` mines matrix sources with every hero pair weighted by its match
+count, ranks tag pairs by the lower bound of a Wilson (or shrinkage)
+interval instead of the plain mean, derives the weight from that bound and
+writes the interval next to each rule.
 
 Run:
   python src/generate_synergy_rules.py
   python src/generate_synergy_rules.py --top 40 --min 12
   python src/generate_synergy_rules.py --write data/synergies.generated.json
+  python src/generate_synergy_rules.py --patches data/dota_heroes_matrix.npz archive/7.37/heroes --workers 2
+  python src/generate_synergy_rules.py --weighted --write data/synergies.generated.json
 """
 
 from __future__ import annotations
 
 import argparse
 import json
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:  # optional dependency
+    sparse = None
+
+import hero_matrix
+from hero_db import load_heroes
+
 ROOT = Path(__file__).resolve().parent.parent
-HERO_DIR = ROOT / "data" / "heroes"
+MIN_MATRIX_MATCHES = 30  # same cut-off as summarize_matchups() for counters
+
+
+def _matrix(a):
+    return sparse.csr_matrix(a) if sparse is not None else a
+
+
+def _dense(a):
+    return a.toarray() if sparse is not None and sparse.issparse(a) else np.asarray(a)
+
+
+def tag_incidence(names: list[str], heroes: dict[str, dict]) -> tuple[list[str], "np.ndarray"]:
+    """(tag vocabulary sorted by name, int[n_heroes, n_tags] tag multiplicity)."""
+    vocab = sorted({t for name in names for t in heroes[name].get("tags", [])})
+    ids = {t: i for i, t in enumerate(vocab)}
+    inc = np.zeros((len(names), len(vocab)), dtype=np.float64)
+    for i, name in enumerate(names):
+        for t in heroes[name].get("tags", []):
+            inc[i, ids[t]] += 1
+    return vocab, inc
+
+
+def fold_pairs(values, weights):
+    """Upper-triangular (value, weight) with one entry per unordered hero pair.
+
+    The value is the weighted mean of both directions; the weight counts the
+    pair's games once (both directions are the same games).
+    """
+    vw = values * weights
+    wsum = weights + weights.T
+    folded = np.divide(vw + vw.T, wsum, out=np.zeros_like(vw), where=wsum > 0)
+    return np.triu(folded, 1), np.triu(np.maximum(weights, weights.T), 1)
+
+
+def pair_scores_from_heroes(names: list[str], heroes: dict[str, dict]):
+    """Hero x hero (value, weight) matrices for synergies and counters from the top-10 lists.
+
+    syn[h, a] = explicit_synergies of h with a (positive only);
+    ctr[v, c] = |explicit_counters of victim v against c| (negative only).
+    Every listed pair weighs 1: the hero files carry no match counts.
+    """
+    index = {n: i for i, n in enumerate(names)}
+    syn = np.zeros((len(names), len(names)))
+    ctr = np.zeros((len(names), len(names)))
+    for i, name in enumerate(names):
+        h = heroes[name]
+        for ally, s in (h.get("explicit_synergies") or {}).items():
+            j = index.get(ally)
+            if s > 0 and j is not None:
+                syn[i, j] = float(s)
+        for counter, c in (h.get("explicit_counters") or {}).items():
+            j = index.get(counter)
+            if c < 0 and j is not None:
+                ctr[i, j] = abs(float(c))
+    return syn, (syn > 0).astype(np.float64), ctr, (ctr > 0).astype(np.float64)
+
+
+def pair_scores_from_matrix(path: Path, names: list[str], weighted: bool = False):
+    """Same matrices from every pair in a hero_matrix npz.
+
+    Unweighted: the positive synergies and the counters with win rate < 50%
+    (over MIN_MATRIX_MATCHES games), one sample each, like the top-10 lists.
+    Weighted: every pair with games, weighted by its match count; counter
+    strength is 50 - win rate of the victim, so weak or reversed pairs pull
+    the tag-pair mean down instead of being dropped.
+    """
+    mx = hero_matrix.load_matrices(path)
+    if weighted and "synergy_matches" not in mx:
+        raise SystemExit(f"{path}: no synergy_matches, re-run stratz_hero_requests.py to rebuild it")
+    src = {str(n): i for i, n in enumerate(mx["names"])}
+    pick = np.array([src.get(n, -1) for n in names])
+    ok = pick >= 0
+    sub = np.ix_(np.flatnonzero(ok), np.flatnonzero(ok))
+    rows = np.ix_(pick[ok], pick[ok])
+    out = [np.zeros((len(names), len(names))) for _ in range(4)]
+    syn, syn_w, ctr, ctr_w = out
+
+    has_syn = mx["synergy_count"][rows] > 0
+    s = np.where(has_syn, mx["synergy"][rows].astype(np.float64), 0.0)
+    if weighted:
+        games = mx["matches"][rows]
+        syn[sub] = s
+        syn_w[sub] = np.where(has_syn, mx["synergy_matches"][rows], 0)
+        ctr[sub] = 50.0 - np.nan_to_num(hero_matrix.win_rate(mx)[rows], nan=50.0)
+        ctr_w[sub] = games
+    else:
+        syn[sub] = np.where(s > 0, s, 0.0)
+        adv = hero_matrix.win_rate(mx, MIN_MATRIX_MATCHES)[rows] - 50.0
+        ctr[sub] = np.where(adv < 0, -np.nan_to_num(adv, nan=0.0), 0.0)
+        syn_w[sub], ctr_w[sub] = syn[sub] > 0, ctr[sub] > 0
+    syn, syn_w = fold_pairs(syn, syn_w)
+    return syn, syn_w, ctr, ctr_w
+
+
+def mine(names: list[str], heroes: dict[str, dict], syn, syn_w, ctr, ctr_w, pairs_once: bool = False) -> dict:
+    """{"synergy": {(a, b): [sum w*v, sum w, samples]}, "counter": {(enemy, our): [...]}}.
+
+    Every (our tag, partner tag) pair with different tags gets the hero pair's
+    value with its weight; synergy keys are unordered. With unit weights and
+    pairs_once=False this is the plain sum/count of the pair loops it replaces.
+    pairs_once (matrix sources) counts each hero pair once per key, also when
+    both heroes carry both tags and the orientations a+b and b+a would
+    otherwise count twice, so samples is the number of hero pairs.
+    """
+    vocab, inc = tag_incidence(names, heroes)
+    t = _matrix(inc)
+    tt = t.T
+
+    def products(values, weights):
+        out = []
+        for m in (values * weights, weights, (weights > 0).astype(np.float64)):
+            m = _dense(tt @ _matrix(m) @ t)
+            np.fill_diagonal(m, 0.0)
+            out.append(m)
+        return out
 
+    mined: dict = {"synergy": {}, "counter": {}}
+    folded = [np.triu(m + m.T) for m in products(syn, syn_w)]
+    if pairs_once:
+        keys = np.nonzero(folded[2])
+        both = inc[:, keys[0]] * inc[:, keys[1]]  # hero x key: the hero carries both tags of the key
+        for acc, m in zip(folded, (syn * syn_w, syn_w, (syn_w > 0).astype(np.float64))):
+            acc[keys] -= np.einsum("hk,hk->k", both, _dense(_matrix(m) @ both))
+    total, weight, samples = folded
+    for i, j in zip(*np.nonzero(samples)):
+        mined["synergy"][(vocab[i], vocab[j])] = [float(total[i, j]), float(weight[i, j]), int(samples[i, j])]
+    total, weight, samples = products(ctr, ctr_w)
+    for i, j in zip(*np.nonzero(samples)):
+        mined["counter"][(vocab[i], vocab[j])] = [float(total[i, j]), float(weight[i, j]), int(samples[i, j])]
+    return mined
 
-def load_heroes() -> dict[str, dict]:
-    heroes: dict[str, dict] = {}
-    for path in sorted(HERO_DIR.glob("*.json")):
-        h = json.loads(path.read_text(encoding="utf-8"))
+
+def load_hero_dir(path: Path) -> dict[str, dict]:
+    heroes = {}
+    for f in sorted(path.glob("*.json")):
+        h = json.loads(f.read_text(encoding="utf-8"))
         heroes[h["name"]] = h
     return heroes
 
 
+def mine_source(source: str, weighted: bool = False) -> dict:
+    """Mine one source: "" for the current heroes, a hero JSON directory or a matrix .npz."""
+    path = Path(source) if source else None
+    if path is not None and not path.exists():
+        raise SystemExit(f"{source}: not found")
+    if path is not None and path.is_dir():
+        heroes = load_hero_dir(path)
+    else:
+        heroes = load_heroes()
+    names = sorted(heroes)
+    if path is not None and path.suffix == ".npz":
+        return mine(names, heroes, *pair_scores_from_matrix(path, names, weighted), pairs_once=True)
+    if weighted:
+        raise SystemExit(f"{source or 'data/heroes'}: no match counts, weighted mining needs a matrix .npz")
+    return mine(names, heroes, *pair_scores_from_heroes(names, heroes))
+
+
+def merge_mined(results: list[dict]) -> dict:
+    out: dict = {"synergy": {}, "counter": {}}
+    for r in results:
+        for kind in out:
+            for key, stats in r[kind].items():
+                acc = out[kind].setdefault(key, [0.0, 0.0, 0])
+                for i, v in enumerate(stats):
+                    acc[i] += v
+    return out
+
+
+# Percentage-point scores are win-rate deltas, so an interval is taken on
+# p = 0.5 + score / 100 with the summed match count as n.
+def wilson_interval(mean, n, z: float = 1.96):
+    """Vectorised Wilson score interval for mean percentage-point deltas over n games."""
+    mean, n = np.asarray(mean, dtype=np.float64), np.maximum(np.asarray(n, dtype=np.float64), 1e-9)
+    p = np.clip(0.5 + mean / 100.0, 0.0, 1.0)
+    denom = 1.0 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z / denom * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return (center - half - 0.5) * 100.0, (center + half - 0.5) * 100.0
+
+
+def shrinkage_interval(mean, n, z: float = 1.96, prior: float = 200.0):
+    """Normal-approximation interval of the mean shrunk toward 0 by `prior` pseudo-games.
+
+    A single game is a Bernoulli outcome, i.e. 50 percentage points of spread.
+    """
+    mean, n = np.asarray(mean, dtype=np.float64), np.asarray(n, dtype=np.float64)
+    post = mean * n / (n + prior)
+    half = z * 50.0 / np.sqrt(n + prior)
+    return post - half, post + half
+
+
+def rank_weighted(pairs: dict, min_samples: int, method: str, z: float, prior: float) -> list[tuple]:
+    """[(lower bound, mean, lo, hi, games, samples, key)] with lower bound > 0, best first."""
+    keys = [k for k, (_, w, n) in pairs.items() if n >= min_samples and w > 0]
+    if not keys:
+        return []
+    stats = np.array([pairs[k] for k in keys], dtype=np.float64)
+    mean = stats[:, 0] / stats[:, 1]
+    if method == "wilson":
+        lo, hi = wilson_interval(mean, stats[:, 1], z)
+    else:
+        lo, hi = shrinkage_interval(mean, stats[:, 1], z, prior)
+    order = np.argsort(-lo, kind="stable")
+    return [(float(lo[i]), float(mean[i]), float(lo[i]), float(hi[i]), int(stats[i, 1]), int(stats[i, 2]),
+             f"{keys[i][0]}+{keys[i][1]}") for i in order if lo[i] > 0]
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--top", type=int, default=30)
     ap.add_argument("--min", type=int, default=10, help="min samples per pair")
     ap.add_argument("--write", type=str, default="", help="write generated json to this path")
+    ap.add_argument("--patches", nargs="*", default=[],
+                    help="hero JSON dirs and/or matrix .npz files to mine and pool (default: current heroes)")
+    ap.add_argument("--workers", type=int, default=1, help="processes for --patches")
+    ap.add_argument("--weighted", action="store_true",
+                    help="weight by match count and rank by the lower confidence bound "
+                         "(matrix sources only; default data/dota_heroes_matrix.npz)")
+    ap.add_argument("--interval", choices=("wilson", "shrink"), default="wilson")
+    ap.add_argument("--z", type=float, default=1.96, help="interval z-score (1.96 = 95%%)")
+    ap.add_argument("--prior", type=float, default=200.0, help="pseudo-games toward 0 for --interval shrink")
     args = ap.parse_args()
 
     heroes = load_heroes()
@@ -46,50 +286,13 @@ def main() -> int:
         for t in h.get("tags", []):
             tag_freq[t] += 1
 
-    # pair -> (sum, count)
-    syn_sum = defaultdict(float)
-    syn_cnt = Counter()
-
-    # directional pair (enemy_tag, our_tag) -> (sum_abs, count)
-    ctr_sum = defaultdict(float)
-    ctr_cnt = Counter()
-
-    for h in heroes.values():
-        h_tags = list(h.get("tags", []))
-
-        # Synergies: unordered tag pairs
-        for ally_name, s in (h.get("explicit_synergies") or {}).items():
-            if s <= 0:
-                continue
-            ally = heroes.get(ally_name)
-            if not ally:
-                continue
-            a_tags = list(ally.get("tags", []))
-            for t1 in h_tags:
-                for t2 in a_tags:
-                    if t1 == t2:
-                        continue
-                    a, b = sorted((t1, t2))
-                    key = f"{a}+{b}"
-                    syn_sum[key] += float(s)
-                    syn_cnt[key] += 1
-
-        # Counters: victim has explicit_counters (negative), counter hero is the listed enemy
-        for counter_name, c in (h.get("explicit_counters") or {}).items():
-            if c >= 0:
-                continue
-            counter_hero = heroes.get(counter_name)
-            if not counter_hero:
-                continue
-            our_tags = list(counter_hero.get("tags", []))
-            strength = abs(float(c))
-            for enemy_tag in h_tags:
-                for our_tag in our_tags:
-                    if enemy_tag == our_tag:
-                        continue
-                    key = f"{enemy_tag}+{our_tag}"
-                    ctr_sum[key] += strength
-                    ctr_cnt[key] += 1
+    sources = args.patches or [str(hero_matrix.MATRIX_FILE) if args.weighted else ""]
+    work = partial(mine_source, weighted=args.weighted)
+    if args.workers > 1 and len(sources) > 1:
+        with ProcessPoolExecutor(min(args.workers, len(sources))) as pool:
+            mined = merge_mined(list(pool.map(work, sources)))
+    else:
+        mined = merge_mined([work(src) for src in sources])
 
     # Filter + normalize
     def to_weight(avg: float) -> int:
@@ -101,21 +304,10 @@ def main() -> int:
             w = 24
         return int(w)
 
-    syn_items = []
-    for k, cnt in syn_cnt.items():
-        if cnt < args.min:
-            continue
-        avg = syn_sum[k] / cnt
-        syn_items.append((avg, cnt, k))
-    syn_items.sort(reverse=True)
-
-    ctr_items = []
-    for k, cnt in ctr_cnt.items():
-        if cnt < args.min:
-            continue
-        avg = ctr_sum[k] / cnt
-        ctr_items.append((avg, cnt, k))
-    ctr_items.sort(reverse=True)
+    def ranked(pairs: dict) -> list[tuple[float, int, str]]:
+        items = [(total / cnt, cnt, f"{a}+{b}") for (a, b), (total, _, cnt) in pairs.items() if cnt >= args.min]
+        items.sort(reverse=True)
+        return items
 
     print(f"heroes\t{len(heroes)}")
     print(f"tags_unique\t{len(tag_freq)}")
@@ -124,6 +316,12 @@ def main() -> int:
     for t, c in tag_freq.most_common(60):
         print(f"{t}\t{c}")
 
+    if args.weighted:
+        return write_weighted(args, mined, to_weight)
+
+    syn_items = ranked(mined["synergy"])
+    ctr_items = ranked(mined["counter"])
+
     print(f"\n== Inferred tag_synergies (top {args.top}, min={args.min}) ==")
     for avg, cnt, k in syn_items[: args.top]:
         print(f"{k}\tavg={avg:.2f}\tsamples={cnt}\tweight={to_weight(avg)}")
@@ -144,5 +342,28 @@ def main() -> int:
     return 0
 
 
+def write_weighted(args, mined: dict, to_weight) -> int:
+    """--weighted output: rules ranked by lower bound, weight from the lower bound, intervals alongside."""
+    out: dict = {}
+    for kind, title in (("synergy", "tag_synergies"), ("counter", "tag_counters")):
+        items = rank_weighted(mined[kind], args.min, args.interval, args.z, args.prior)[: args.top]
+        label = " (enemy_tag+our_tag)" if kind == "counter" else ""
+        print(f"\n== Weighted {title}{label} (top {args.top}, min={args.min}, {args.interval} z={args.z:g}) ==")
+        for lcb, mean, lo, hi, games, samples, k in items:
+            print(f"{k}\tmean={mean:.2f}\tci=[{lo:.2f}, {hi:.2f}]\tgames={games}\tsamples={samples}"
+                  f"\tweight={to_weight(lcb)}")
+        out[title] = {k: to_weight(lcb) for lcb, *_, k in items}
+        out[f"{title}_intervals"] = {
+            k: {"mean": round(mean, 3), "lo": round(lo, 3), "hi": round(hi, 3), "games": games}
+            for _, mean, lo, hi, games, _, k in items
+        }
+
+    if args.write:
+        out_path = (ROOT / args.write).resolve() if not Path(args.write).is_absolute() else Path(args.write)
+        out_path.write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nWrote: {out_path}")
+    return 0
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
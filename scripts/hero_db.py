@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""Compiled, memory-mappable hero database (data/heroes.db).
+
+`data/heroes/*.json`, `roles.json` and `synergies.json` stay the source of
+truth; this module compiles them into one versioned binary file so readers
+start with a single mmap instead of parsing ~127 JSON files.
+
+Layout (little-endian, packed, sections 8-byte aligned):
+
+  header      HEADER_FMT: magic, version, counts, section offsets, source fingerprint
+  strings     u32[n_strings + 1] offsets + UTF-8 blob; hero names, roles, tags,
+              attributes and rule keys are interned to string ids
+  heroes      n_heroes fixed-width HERO_FMT records
+  name index  u32[n_heroes] record numbers sorted by name (binary search)
+  pairs       PAIR_FMT records (target string id, score) for explicit
+              counters/synergies; heroes reference a contiguous run
+  rules       RULE_FMT records (kind, a, b, weight); see RULE_* kinds
+
+Readers use `numpy.frombuffer` over the mmap when NumPy is installed (zero
+copies) and `struct.unpack_from` over the same mmap otherwise. The engine-side
+reader is `loader::load_db` in src/loader.rs.
+
+Run:
+  python scripts/hero_db.py                # compile data/heroes.db
+  python scripts/hero_db.py --check        # exit 1 if heroes.db is stale
+  python scripts/hero_db.py --dump Axe
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+HERO_DIR = DATA_DIR / "heroes"
+ROLES_FILE = DATA_DIR / "roles.json"
+SYNERGIES_FILE = DATA_DIR / "synergies.json"
+DB_FILE = DATA_DIR / "heroes.db"
+
+MAGIC = b"D2HEROdb"
+VERSION = 2
+MAX_ROLES = 8
+MAX_TAGS = 16
+POSITIONS = ("pos_1", "pos_2", "pos_3", "pos_4", "pos_5")
+PHASES = ("early", "mid", "late")
+
+HEADER_FMT = "<8s11I8s"
+HERO_FMT = f"<II{MAX_ROLES}IB{MAX_TAGS}IB5f3iIHIH"
+PAIR_FMT = "<If"
+RULE_FMT = "<BIIi"
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+RULE_ROLE_SYNERGY = 0
+RULE_ROLE_CONFLICT = 1
+RULE_TAG_SYNERGY = 2
+RULE_TAG_COUNTER = 3
+RULE_PHASE_BIAS = 4  # a = tag, b = phase index (PHASES)
+
+_RULE_SECTIONS = (
+    (RULE_ROLE_SYNERGY, "role_synergies"),
+    (RULE_ROLE_CONFLICT, "role_conflicts"),
+    (RULE_TAG_SYNERGY, "tag_synergies"),
+    (RULE_TAG_COUNTER, "tag_counters"),
+)
+
+if np is not None:
+    HERO_DTYPE = np.dtype([
+        ("name", "<u4"), ("attr", "<u4"),
+        ("roles", "<u4", (MAX_ROLES,)), ("n_roles", "u1"),
+        ("tags", "<u4", (MAX_TAGS,)), ("n_tags", "u1"),
+        ("positions", "<f4", (len(POSITIONS),)), ("phase", "<i4", (len(PHASES),)),
+        ("counters_off", "<u4"), ("n_counters", "<u2"),
+        ("synergies_off", "<u4"), ("n_synergies", "<u2"),
+    ])
+    PAIR_DTYPE = np.dtype([("target", "<u4"), ("score", "<f4")])
+    RULE_DTYPE = np.dtype([("kind", "u1"), ("a", "<u4"), ("b", "<u4"), ("weight", "<i4")])
+    assert HERO_DTYPE.itemsize == struct.calcsize(HERO_FMT)
+
+
+def source_files() -> list[Path]:
+    return sorted(HERO_DIR.glob("*.json")) + [ROLES_FILE, SYNERGIES_FILE]
+
+
+def source_fingerprint(files: list[Path] | None = None) -> bytes:
+    """8-byte FNV-1a/64 (little-endian) of source names, sizes and mtimes (stat only, no parsing).
+
+    Not a cryptographic hash: it only has to change with the file set, and
+    loader::source_fingerprint in the engine computes the same in a few lines.
+    """
+    h = FNV_OFFSET
+    for path in files if files is not None else source_files():
+        st = path.stat()
+        for byte in f"{path.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"):
+            h = ((h ^ byte) * FNV_PRIME) & 0xFFFF_FFFF_FFFF_FFFF
+    return h.to_bytes(8, "little")
+
+
+def _align(buf: bytearray) -> int:
+    buf.extend(b"\0" * (-len(buf) % 8))
+    return len(buf)
+
+
+def _split_key(key: str) -> tuple[str, str] | None:
+    if "+" not in key:
+        return None
+    a, b = key.split("+", 1)
+    return a, b
+
+
+def compile_db(out: Path = DB_FILE) -> Path:
+    files = source_files()
+    fingerprint = source_fingerprint(files)
+    heroes = [json.loads(p.read_text(encoding="utf-8")) for p in files[:-2]]
+    roles = json.loads(ROLES_FILE.read_text(encoding="utf-8"))
+    synergies = json.loads(SYNERGIES_FILE.read_text(encoding="utf-8"))
+
+    strings: list[str] = []
+    ids: dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        i = ids.get(s)
+        if i is None:
+            i = ids[s] = len(strings)
+            strings.append(s)
+        return i
+
+    hero_rows = []
+    pairs: list[bytes] = []
+    pair_struct = struct.Struct(PAIR_FMT)
+    for h in heroes:
+        if len(h.get("roles", [])) > MAX_ROLES or len(h.get("tags", [])) > MAX_TAGS:
+            raise ValueError(f"{h['name']}: more than {MAX_ROLES} roles or {MAX_TAGS} tags")
+        role_ids = [intern(r) for r in h.get("roles", [])]
+        tag_ids = [intern(t) for t in h.get("tags", [])]
+        pos = h.get("positions", {})
+        phase = h.get("game_phase", {})
+        counters = h.get("explicit_counters") or {}
+        syns = h.get("explicit_synergies") or {}
+
+        counters_off = len(pairs)
+        pairs.extend(pair_struct.pack(intern(k), float(v)) for k, v in counters.items())
+        synergies_off = len(pairs)
+        pairs.extend(pair_struct.pack(intern(k), float(v)) for k, v in syns.items())
+
+        hero_rows.append(struct.pack(
+            HERO_FMT,
+            intern(h["name"]), intern(h.get("primary_attribute", "")),
+            *(role_ids + [0] * (MAX_ROLES - len(role_ids))), len(role_ids),
+            *(tag_ids + [0] * (MAX_TAGS - len(tag_ids))), len(tag_ids),
+            *(float(pos[p]) if p in pos else float("nan") for p in POSITIONS),
+            *(int(phase.get(p, 0)) for p in PHASES),
+            counters_off, len(counters), synergies_off, len(syns),
+        ))
+
+    rules: list[bytes] = []
+    for kind, section in _RULE_SECTIONS:
+        src = roles if kind in (RULE_ROLE_SYNERGY, RULE_ROLE_CONFLICT) else synergies
+        for key, weight in (src.get(section) or {}).items():
+            ab = _split_key(key)
+            if ab:
+                rules.append(struct.pack(RULE_FMT, kind, intern(ab[0]), intern(ab[1]), int(weight)))
+    for phase_idx, phase_name in enumerate(PHASES):
+        for tag, weight in ((synergies.get("phase_bias") or {}).get(phase_name) or {}).items():
+            rules.append(struct.pack(RULE_FMT, RULE_PHASE_BIAS, intern(tag), phase_idx, int(weight)))
+
+    names = [h["name"] for h in heroes]
+    name_index = sorted(range(len(heroes)), key=lambda i: names[i].encode("utf-8"))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    buf = bytearray(struct.calcsize(HEADER_FMT))
+    strings_index_off = _align(buf)
+    offsets, pos = [], 0
+    for e in encoded:
+        offsets.append(pos)
+        pos += len(e)
+    offsets.append(pos)
+    buf += struct.pack(f"<{len(offsets)}I", *offsets)
+    strings_blob_off = len(buf)
+    buf += b"".join(encoded)
+    heroes_off = _align(buf)
+    buf += b"".join(hero_rows)
+    name_index_off = _align(buf)
+    buf += struct.pack(f"<{len(name_index)}I", *name_index)
+    pairs_off = _align(buf)
+    buf += b"".join(pairs)
+    rules_off = _align(buf)
+    buf += b"".join(rules)
+
+    struct.pack_into(
+        HEADER_FMT, buf, 0, MAGIC, VERSION,
+        len(strings), len(heroes), len(pairs), len(rules),
+        strings_index_off, strings_blob_off, heroes_off, name_index_off, pairs_off, rules_off,
+        fingerprint,
+    )
+
+    out = Path(out)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, out)
+    return out
+
+
+class HeroDB:
+    """Read-only view over a compiled heroes.db. Nothing is parsed until accessed."""
+
+    def __init__(self, path: Path = DB_FILE):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n_strings, self.n_heroes, self.n_pairs, self.n_rules,
+         self._strings_index_off, self._strings_blob_off, self._heroes_off, self._name_index_off,
+         self._pairs_off, self._rules_off, self.fingerprint) = struct.unpack_from(HEADER_FMT, self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path}: not a heroes.db v{VERSION} file")
+        self._str_offsets = memoryview(self._mm)[self._strings_index_off:self._strings_blob_off].cast("I")
+        self._str_cache: dict[int, str] = {}
+        self._name_index = memoryview(self._mm)[self._name_index_off:self._name_index_off + 4 * self.n_heroes].cast("I")
+        self._hero_struct = struct.Struct(HERO_FMT)
+        self._pair_struct = struct.Struct(PAIR_FMT)
+        self._rule_struct = struct.Struct(RULE_FMT)
+        if np is not None:
+            self.records = np.frombuffer(self._mm, HERO_DTYPE, self.n_heroes, self._heroes_off)
+            self.pairs = np.frombuffer(self._mm, PAIR_DTYPE, self.n_pairs, self._pairs_off)
+            self.rules = np.frombuffer(self._mm, RULE_DTYPE, self.n_rules, self._rules_off)
+
+    def close(self) -> None:
+        self.__dict__.pop("records", None)
+        self.__dict__.pop("pairs", None)
+        self.__dict__.pop("rules", None)
+        self._str_offsets.release()
+        self._name_index.release()
+        self._mm.close()
+
+    def __enter__(self) -> "HeroDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_heroes
+
+    def is_fresh(self) -> bool:
+        try:
+            return self.fingerprint == source_fingerprint()
+        except OSError:
+            return False
+
+    def string(self, i: int) -> str:
+        s = self._str_cache.get(i)
+        if s is None:
+            a, b = self._str_offsets[i], self._str_offsets[i + 1]
+            s = self._str_cache[i] = self._mm[self._strings_blob_off + a:self._strings_blob_off + b].decode("utf-8")
+        return s
+
+    def _record(self, i: int) -> tuple:
+        return self._hero_struct.unpack_from(self._mm, self._heroes_off + i * self._hero_struct.size)
+
+    def name(self, i: int) -> str:
+        return self.string(self._record(i)[0])
+
+    def find(self, name: str) -> int | None:
+        """Record number of a hero by exact name (binary search over the name index)."""
+        key = name.encode("utf-8")
+        lo, hi = 0, self.n_heroes
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_name = self.name(self._name_index[mid]).encode("utf-8")
+            if mid_name < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_heroes and self.name(self._name_index[lo]) == name:
+            return self._name_index[lo]
+        return None
+
+    def _pairs_dict(self, off: int, n: int) -> dict[str, float]:
+        out = {}
+        for k in range(off, off + n):
+            target, score = self._pair_struct.unpack_from(self._mm, self._pairs_off + k * self._pair_struct.size)
+            out[self.string(target)] = round(score, 4)
+        return out
+
+    def hero(self, i: int) -> dict:
+        """One hero in the same shape as its data/heroes/*.json file."""
+        r = self._record(i)
+        roles_end = 2 + MAX_ROLES
+        tags_start = roles_end + 1
+        tags_end = tags_start + MAX_TAGS
+        n_roles, n_tags = r[roles_end], r[tags_end]
+        pos = r[tags_end + 1:tags_end + 6]
+        phase = r[tags_end + 6:tags_end + 9]
+        c_off, c_n, s_off, s_n = r[tags_end + 9:tags_end + 13]
+        return {
+            "name": self.string(r[0]),
+            "primary_attribute": self.string(r[1]),
+            "roles": [self.string(x) for x in r[2:2 + n_roles]],
+            "tags": [self.string(x) for x in r[tags_start:tags_start + n_tags]],
+            "positions": {p: round(v, 4) for p, v in zip(POSITIONS, pos) if v == v},
+            "game_phase": dict(zip(PHASES, phase)),
+            "explicit_counters": self._pairs_dict(c_off, c_n),
+            "explicit_synergies": self._pairs_dict(s_off, s_n),
+        }
+
+    def heroes(self) -> dict[str, dict]:
+        return {h["name"]: h for h in (self.hero(i) for i in range(self.n_heroes))}
+
+    def _iter_rules(self):
+        for k in range(self.n_rules):
+            yield self._rule_struct.unpack_from(self._mm, self._rules_off + k * self._rule_struct.size)
+
+    def role_rules(self) -> dict:
+        out = {"role_synergies": {}, "role_conflicts": {}}
+        for kind, a, b, w in self._iter_rules():
+            if kind == RULE_ROLE_SYNERGY:
+                out["role_synergies"][f"{self.string(a)}+{self.string(b)}"] = w
+            elif kind == RULE_ROLE_CONFLICT:
+                out["role_conflicts"][f"{self.string(a)}+{self.string(b)}"] = w
+        return out
+
+    def synergy_rules(self) -> dict:
+        out: dict = {"tag_synergies": {}, "tag_counters": {}, "phase_bias": {}}
+        for kind, a, b, w in self._iter_rules():
+            if kind == RULE_TAG_SYNERGY:
+                out["tag_synergies"][f"{self.string(a)}+{self.string(b)}"] = w
+            elif kind == RULE_TAG_COUNTER:
+                out["tag_counters"][f"{self.string(a)}+{self.string(b)}"] = w
+            elif kind == RULE_PHASE_BIAS:
+                out["phase_bias"].setdefault(PHASES[b], {})[self.string(a)] = w
+        return out
+
+
+def open_db(path: Path = DB_FILE, rebuild: bool = True) -> HeroDB | None:
+    """Open heroes.db, recompiling it first if the JSON sources changed.
+
+    Returns None if the database is missing or stale and `rebuild` is False.
+    """
+    path = Path(path)
+    try:
+        db = HeroDB(path)
+        if db.is_fresh():
+            return db
+        db.close()
+    except (OSError, ValueError):
+        pass
+    if not rebuild:
+        return None
+    compile_db(path)
+    return HeroDB(path)
+
+
+def load_heroes() -> dict[str, dict]:
+    """{name: hero dict} from heroes.db (rebuilt if stale) — drop-in for per-file JSON loading."""
+    with open_db() as db:
+        return db.heroes()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default=str(DB_FILE))
+    ap.add_argument("--check", action="store_true", help="exit 1 if the database is missing or stale")
+    ap.add_argument("--dump", default="", help="print one hero from the database as JSON")
+    args = ap.parse_args()
+
+    out = Path(args.out)
+    if args.check:
+        db = open_db(out, rebuild=False)
+        print("fresh" if db else "stale")
+        if db:
+            db.close()
+        return 0 if db else 1
+
+    if args.dump:
+        with open_db(out) as db:
+            i = db.find(args.dump)
+            if i is None:
+                print(f"not found: {args.dump}", file=sys.stderr)
+                return 1
+            print(json.dumps(db.hero(i), ensure_ascii=False, indent=2))
+        return 0
+
+    compile_db(out)
+    with HeroDB(out) as db:
+        print(f"Wrote: {out} ({out.stat().st_size} bytes, {len(db)} heroes, "
+              f"{db.n_strings} strings, {db.n_pairs} pairs, {db.n_rules} rules)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
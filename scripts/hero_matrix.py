@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Dense hero-vs-hero / hero-with-hero matrices from the Stratz matchup aggregates.
+
+The fetch stage keeps only each hero's top-10 counters and synergies in
+dota_heroes_stratz.json. This module keeps every pair as N x N NumPy arrays on a
+stable axis (hero ids sorted ascending) and saves them next to it as
+dota_heroes_matrix.npz:
+
+  hero_ids        int32[N]    axis; row i / column j is hero_ids[i] / hero_ids[j]
+  names           str[N]
+  matches         int64[N,N]  games hero i played against hero j
+  wins            int64[N,N]  wins of hero i in those games
+  synergy         float32[N,N] mean Stratz synergy of i with j (0 where unknown)
+  synergy_count   int32[N,N]  number of synergy samples behind `synergy`
+  synergy_matches int64[N,N]  games i and j played together behind `synergy`
+
+NumPy is optional for the rest of the pipeline; without it the matrices are skipped.
+
+Run:
+  python scripts/hero_matrix.py                 # summary of data/dota_heroes_matrix.npz
+  python scripts/hero_matrix.py --top Axe
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+ROOT = Path(__file__).resolve().parent.parent
+MATRIX_FILE = ROOT / "data" / "dota_heroes_matrix.npz"
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required for hero matrices (pip install numpy)")
+
+
+def build_matrices(id_name_map: dict[int, str], aggregates: dict[int, tuple[dict, dict] | None]) -> dict:
+    """Dense arrays from {hid: (vs_agg, with_agg)} as built by aggregate_matchups()."""
+    require_numpy()
+    hero_ids = np.array(sorted(id_name_map), dtype=np.int32)
+    index = {int(hid): i for i, hid in enumerate(hero_ids)}
+    n = len(hero_ids)
+
+    matches = np.zeros((n, n), dtype=np.int64)
+    wins = np.zeros((n, n), dtype=np.int64)
+    syn_sum = np.zeros((n, n), dtype=np.float64)
+    syn_cnt = np.zeros((n, n), dtype=np.int32)
+    syn_matches = np.zeros((n, n), dtype=np.int64)
+
+    for hid, aggs in aggregates.items():
+        if not aggs or hid not in index:
+            continue
+        i = index[hid]
+        vs_agg, with_agg = aggs
+        for eid, s in vs_agg.items():
+            j = index.get(eid)
+            if j is not None:
+                matches[i, j] = s["m"]
+                wins[i, j] = s["w"]
+        for aid, s in with_agg.items():
+            j = index.get(aid)
+            if j is not None:
+                syn_sum[i, j] = s["syn"]
+                syn_cnt[i, j] = s["cnt"]
+                syn_matches[i, j] = s.get("m", 0)
+
+    synergy = np.divide(syn_sum, syn_cnt, out=np.zeros_like(syn_sum), where=syn_cnt > 0).astype(np.float32)
+    return {
+        "hero_ids": hero_ids,
+        "names": np.array([id_name_map[int(h)] for h in hero_ids]),
+        "matches": matches,
+        "wins": wins,
+        "synergy": synergy,
+        "synergy_count": syn_cnt,
+        "synergy_matches": syn_matches,
+    }
+
+
+def save_matrices(matrices: dict, path: Path = MATRIX_FILE) -> Path:
+    require_numpy()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(path, **matrices)
+    return path
+
+
+def load_matrices(path: Path = MATRIX_FILE) -> dict:
+    require_numpy()
+    with np.load(path, allow_pickle=False) as z:
+        return {k: z[k] for k in z.files}
+
+
+def win_rate(matrices: dict, min_matches: int = 0):
+    """Win rate of row hero vs column hero in percent; NaN below `min_matches`."""
+    m = matrices["matches"]
+    rate = np.divide(matrices["wins"] * 100.0, m, out=np.full(m.shape, np.nan), where=m > 0)
+    if min_matches:
+        rate[m <= min_matches] = np.nan
+    return rate
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=str(MATRIX_FILE))
+    ap.add_argument("--top", default="", help="print best/worst matchups of this hero")
+    ap.add_argument("--min", type=int, default=30, help="min matches per pair")
+    args = ap.parse_args()
+
+    require_numpy()
+    mx = load_matrices(Path(args.path))
+    names = list(mx["names"])
+    print(f"heroes\t{len(names)}")
+    print(f"pairs_with_games\t{int((mx['matches'] > 0).sum())}")
+    print(f"pairs_with_synergy\t{int((mx['synergy_count'] > 0).sum())}")
+
+    if args.top:
+        i = names.index(args.top)
+        adv = win_rate(mx, args.min)[i] - 50.0
+        order = np.argsort(np.nan_to_num(adv, nan=np.inf))
+        print(f"\n== {args.top}: worst matchups ==")
+        for j in order[:10]:
+            print(f"{names[j]}\t{adv[j]:+.2f}\tmatches={mx['matches'][i, j]}")
+        order = np.argsort(-np.nan_to_num(mx["synergy"][i], nan=-np.inf))
+        print(f"\n== {args.top}: best synergies ==")
+        for j in order[:10]:
+            print(f"{names[j]}\t{mx['synergy'][i, j]:+.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
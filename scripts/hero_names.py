@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Hero name resolution shared by the scripts.
+
+One alias index maps every way a hero is referred to onto a HeroEntry
+(display name as in data/heroes, file name, Stratz id):
+
+  - the display name and the file name of data/heroes/*.json
+  - the Stratz id and display name from dota_heroes_stratz.json
+  - slugs ("anti-mage", "anti_mage", "antimage") and ALIASES (old names)
+
+Keys are normalised to lowercase ASCII letters and digits, so all of the
+above are one dict lookup. Anything that still misses (typos) goes through a
+trigram index and resolves to the best match above TRIGRAM_THRESHOLD.
+
+The index is built from data/heroes/ once and cached in
+data/.cache/hero_names.json under a stat fingerprint of the sources; later
+loads read only that file.
+
+Run:
+  python scripts/hero_names.py "anti mage" 1 outworld_destroyer.json "Shadow Fend"
+  python scripts/hero_names.py --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from hero_db import DATA_DIR, HERO_DIR, source_fingerprint
+
+STRATZ_FILE = DATA_DIR / "dota_heroes_stratz.json"
+CACHE_FILE = DATA_DIR / ".cache" / "hero_names.json"
+CACHE_VERSION = 1
+TRIGRAM_THRESHOLD = 0.45
+
+# Former or alternative names -> current display name
+ALIASES = {
+    "Outworld Devourer": "Outworld Destroyer",
+    "Windrunner": "Windranger",
+    "Centaur": "Centaur Warrunner",
+    "Furion": "Nature's Prophet",
+    "Necrolyte": "Necrophos",
+    "Wisp": "Io",
+    "Zuus": "Zeus",
+    "Magnataur": "Magnus",
+    "Obsidian Destroyer": "Outworld Destroyer",
+    "Doom Bringer": "Doom",
+    "Shredder": "Timbersaw",
+    "Skeleton King": "Wraith King",
+    "Treant": "Treant Protector",
+    "Queen Of Pain": "Queen of Pain",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase letters and digits only: Nature's Prophet, natures_prophet.json -> naturesprophet."""
+    text = str(text).lower()
+    if text.endswith(".json"):
+        text = text[:-5]
+    return _NON_ALNUM.sub("", text)
+
+
+def slug(name: str) -> str:
+    """Hyphenated URL-style name: Nature's Prophet -> natures-prophet."""
+    return _NON_ALNUM.sub("-", str(name).lower().replace("'", "")).strip("-")
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True, slots=True)
+class HeroEntry:
+    name: str
+    file: str
+    stratz_id: int | None = None
+
+    @property
+    def path(self) -> Path:
+        return HERO_DIR / self.file
+
+
+class HeroNames:
+    def __init__(self, entries: list[HeroEntry], aliases: dict[str, str] | None = None):
+        self.entries = sorted(entries, key=lambda e: e.name)
+        self.by_id: dict[int, HeroEntry] = {e.stratz_id: e for e in self.entries if e.stratz_id is not None}
+        self.by_key: dict[str, HeroEntry] = {}
+        for e in self.entries:
+            for alias in (e.name, e.file, slug(e.name)):
+                self.by_key.setdefault(normalize(alias), e)
+        by_name = {e.name: e for e in self.entries}
+        for alias, name in (ALIASES if aliases is None else aliases).items():
+            if name in by_name:
+                self.by_key.setdefault(normalize(alias), by_name[name])
+        self._grams: dict[str, list[str]] = {}
+        for key in self.by_key:
+            for g in trigrams(key):
+                self._grams.setdefault(g, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def resolve(self, ref, fuzzy: bool = True) -> HeroEntry | None:
+        """Entry for a Stratz id, display name, slug, file name or alias; typos via trigrams."""
+        if isinstance(ref, int) and not isinstance(ref, bool):
+            return self.by_id.get(ref)
+        key = normalize(ref)
+        if not key:
+            return None
+        if key.isdigit():
+            return self.by_id.get(int(key))
+        entry = self.by_key.get(key)
+        if entry is None and fuzzy:
+            entry = self.fuzzy(key)
+        return entry
+
+    def fuzzy(self, key: str) -> HeroEntry | None:
+        grams = trigrams(key)
+        shared: dict[str, int] = {}
+        for g in grams:
+            for k in self._grams.get(g, ()):
+                shared[k] = shared.get(k, 0) + 1
+        best, best_score = None, TRIGRAM_THRESHOLD
+        for k, n in shared.items():
+            # Dice coefficient over trigram sets
+            score = 2.0 * n / (len(grams) + len(trigrams(k)))
+            if score > best_score or (score == best_score and best is not None and k < best):
+                best, best_score = k, score
+        return self.by_key[best] if best is not None else None
+
+    def name(self, ref, default: str | None = None) -> str | None:
+        entry = self.resolve(ref)
+        return entry.name if entry is not None else default
+
+    def names(self, refs) -> tuple[list[str], list[str]]:
+        """(canonical names, refs that did not resolve)."""
+        found, missing = [], []
+        for ref in refs:
+            entry = self.resolve(ref)
+            if entry is None:
+                missing.append(str(ref))
+            else:
+                found.append(entry.name)
+        return found, missing
+
+    def path(self, ref) -> Path | None:
+        entry = self.resolve(ref, fuzzy=False)
+        return entry.path if entry is not None else None
+
+
+def _fingerprint() -> str:
+    files = sorted(HERO_DIR.glob("*.json"))
+    if STRATZ_FILE.exists():
+        files.append(STRATZ_FILE)
+    return source_fingerprint(files).hex()
+
+
+def build_entries() -> list[HeroEntry]:
+    ids = {}
+    if STRATZ_FILE.exists():
+        for h in json.loads(STRATZ_FILE.read_text(encoding="utf-8")):
+            ids[normalize(h["name"])] = h["id"]
+    entries = []
+    for f in sorted(HERO_DIR.glob("*.json")):
+        name = json.loads(f.read_text(encoding="utf-8"))["name"]
+        entries.append(HeroEntry(name, f.name, ids.get(normalize(name))))
+    return entries
+
+
+def load_index(rebuild: bool = False) -> HeroNames:
+    """Index from the cache file, rebuilt from data/heroes/ when the sources changed."""
+    fingerprint = _fingerprint()
+    if not rebuild:
+        try:
+            cached = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+            if cached.get("version") == CACHE_VERSION and cached.get("fingerprint") == fingerprint:
+                return HeroNames([HeroEntry(*row) for row in cached["entries"]])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    entries = build_entries()
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "fingerprint": fingerprint,
+                               "entries": [[e.name, e.file, e.stratz_id] for e in entries]},
+                              ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, CACHE_FILE)
+    return HeroNames(entries)
+
+
+@lru_cache(maxsize=1)
+def index() -> HeroNames:
+    """Process-wide index; call index.cache_clear() after rewriting hero files."""
+    return load_index()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("refs", nargs="*", help="ids, names, slugs or file names to resolve")
+    ap.add_argument("--rebuild", action="store_true", help="ignore the cache")
+    args = ap.parse_args()
+
+    names = load_index(rebuild=args.rebuild)
+    if not args.refs:
+        print(f"heroes\t{len(names)}\naliases\t{len(names.by_key)}\nstratz_ids\t{len(names.by_id)}")
+        return 0
+    missing = 0
+    for ref in args.refs:
+        entry = names.resolve(ref)
+        if entry is None:
+            missing += 1
+            print(f"{ref}\t-")
+        else:
+            print(f"{ref}\t{entry.name}\t{entry.file}\t{entry.stratz_id if entry.stratz_id is not None else '-'}")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""Append-only columnar history of the Stratz matchup data (data/history/).
+
+dota_heroes_stratz.json only holds the latest run. Every fetch also appends
+its full matchup aggregates here, one row per (hero, other, relation), in a
+hive-style partition per patch, rank bracket and fetch date:
+
+  data/history/patch=<patch>/bracket=<bracket>/date=<YYYY-MM-DD>/run-<HHMMSS>.parquet|.npz
+  data/history/heroes.json       {hero id: name}, merged on every append
+
+Columns (one array per column; Parquet via pyarrow when installed, otherwise
+an uncompressed-per-column .npz so np.load reads only the columns asked for):
+
+  hero      int16   hero id
+  other     int16   opponent (vs) or teammate (with) hero id
+  relation  int8    REL_VS / REL_WITH
+  matches   int64   games behind the row
+  wins      int64   wins of `hero` (vs rows)
+  synergy   float64 summed Stratz synergy (with rows)
+  samples   int32   synergy samples behind `synergy`
+
+Queries prune partitions by path, read only the needed columns and filter
+with vectorised masks. Stratz matchUp stats cover a rolling window, so runs
+within one patch overlap; `latest=True` keeps only the newest run per
+(patch, bracket).
+
+Run:
+  python scripts/history_store.py                          # list partitions
+  python scripts/history_store.py --matchup Axe Spectre --last 5
+  python scripts/history_store.py --matchup Axe Spectre --relation with --bracket all
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = pq = None
+
+import hero_names
+
+ROOT = Path(__file__).resolve().parent.parent
+HISTORY_DIR = ROOT / "data" / "history"
+NAMES_FILE = "heroes.json"
+
+REL_VS = 0
+REL_WITH = 1
+RELATIONS = {"vs": REL_VS, "with": REL_WITH}
+
+COLUMNS = {
+    "hero": "int16",
+    "other": "int16",
+    "relation": "int8",
+    "matches": "int64",
+    "wins": "int64",
+    "synergy": "float64",
+    "samples": "int32",
+}
+DEFAULT_BRACKET = "all"
+UNKNOWN_PATCH = "unknown"
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required for the history store (pip install numpy)")
+
+
+def _safe(value: str) -> str:
+    return str(value).replace("/", "_").replace("\\", "_").replace("=", "_") or UNKNOWN_PATCH
+
+
+def rows_from_aggregates(aggregates: dict) -> dict[str, "np.ndarray"]:
+    """Columns from {hid: (vs_agg, with_agg)} as built by aggregate_matchups()."""
+    require_numpy()
+    cols: dict[str, list] = {c: [] for c in COLUMNS}
+
+    def add(hero, other, relation, matches, wins, synergy, samples):
+        for c, v in zip(COLUMNS, (hero, other, relation, matches, wins, synergy, samples)):
+            cols[c].append(v)
+
+    for hid, aggs in aggregates.items():
+        if hid is None or not aggs:
+            continue
+        vs_agg, with_agg = aggs
+        for eid, s in vs_agg.items():
+            add(hid, eid, REL_VS, s["m"], s["w"], 0.0, 0)
+        for aid, s in with_agg.items():
+            add(hid, aid, REL_WITH, s.get("m", 0), 0, s["syn"], s["cnt"])
+    return {c: np.asarray(v, dtype=COLUMNS[c]) for c, v in cols.items()}
+
+
+@dataclass(frozen=True)
+class Partition:
+    patch: str
+    bracket: str
+    date: str
+    path: Path
+
+    @property
+    def run(self) -> str:
+        return f"{self.date}/{self.path.stem}"
+
+
+@dataclass
+class Scan:
+    columns: dict[str, "np.ndarray"]
+    part: "np.ndarray"          # int32 index into `parts` for every row
+    parts: list[Partition]
+
+    def __len__(self) -> int:
+        return len(self.part)
+
+
+class HistoryStore:
+    def __init__(self, root: Path = HISTORY_DIR):
+        self.root = Path(root)
+
+    # --- writing ----------------------------------------------------------
+
+    def append(self, aggregates: dict, patch: str = UNKNOWN_PATCH, bracket: str = DEFAULT_BRACKET,
+               fetched_at: float | None = None) -> Path:
+        """Write one run; the id -> name map is read from aggregates[None] like save_hero_matrices."""
+        require_numpy()
+        t = time.gmtime(fetched_at if fetched_at is not None else time.time())
+        part_dir = (self.root / f"patch={_safe(patch)}" / f"bracket={_safe(bracket)}"
+                    / f"date={time.strftime('%Y-%m-%d', t)}")
+        part_dir.mkdir(parents=True, exist_ok=True)
+        cols = rows_from_aggregates(aggregates)
+        stem = f"run-{time.strftime('%H%M%S', t)}"
+        if pq is not None:
+            path = part_dir / f"{stem}.parquet"
+            tmp = part_dir / f".{stem}.parquet.tmp"
+            pq.write_table(pa.table(cols), tmp)
+        else:
+            path = part_dir / f"{stem}.npz"
+            tmp = part_dir / f".{stem}.tmp.npz"
+            np.savez(tmp, **cols)
+        os.replace(tmp, path)
+        self._merge_names(aggregates.get(None) or {})
+        return path
+
+    def _merge_names(self, id_name_map: dict) -> None:
+        names = self.names()
+        merged = {**names, **{int(k): v for k, v in id_name_map.items()}}
+        if merged == names:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{NAMES_FILE}.tmp"
+        tmp.write_text(json.dumps({str(k): v for k, v in sorted(merged.items())}, ensure_ascii=False, indent=1),
+                       encoding="utf-8")
+        os.replace(tmp, self.root / NAMES_FILE)
+
+    # --- reading ----------------------------------------------------------
+
+    def names(self) -> dict[int, str]:
+        try:
+            raw = json.loads((self.root / NAMES_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {int(k): v for k, v in raw.items()}
+
+    def hero_id(self, hero: str | int) -> int:
+        if isinstance(hero, int) or str(hero).isdigit():
+            return int(hero)
+        lower = str(hero).lower()
+        for hid, name in self.names().items():
+            if name.lower() == lower:
+                return hid
+        entry = hero_names.index().resolve(hero)
+        if entry is None or entry.stratz_id is None:
+            raise KeyError(f"unknown hero: {hero}")
+        return entry.stratz_id
+
+    def partitions(self) -> list[Partition]:
+        """All runs, ordered by fetch date and time."""
+        parts = []
+        for path in self.root.glob("patch=*/bracket=*/date=*/run-*"):
+            if path.suffix not in (".parquet", ".npz"):
+                continue
+            patch, bracket, date = (p.name.split("=", 1)[1] for p in (path.parents[2], path.parents[1], path.parent))
+            parts.append(Partition(patch, bracket, date, path))
+        return sorted(parts, key=lambda p: (p.date, p.path.stem, p.patch, p.bracket))
+
+    def patches(self) -> list[str]:
+        """Patch names in the order they were first fetched."""
+        seen: dict[str, None] = {}
+        for p in self.partitions():
+            seen.setdefault(p.patch, None)
+        return list(seen)
+
+    def select(self, patches=None, brackets=None, since: str | None = None, until: str | None = None,
+               latest: bool = False) -> list[Partition]:
+        parts = [p for p in self.partitions()
+                 if (patches is None or p.patch in patches)
+                 and (brackets is None or p.bracket in brackets)
+                 and (since is None or p.date >= since)
+                 and (until is None or p.date <= until)]
+        if latest:
+            newest = {(p.patch, p.bracket): p for p in parts}
+            parts = [p for p in parts if newest[(p.patch, p.bracket)] is p]
+        return parts
+
+    @staticmethod
+    def _read(path: Path, columns: list[str]) -> dict[str, "np.ndarray"]:
+        if path.suffix == ".parquet":
+            if pq is None:
+                raise RuntimeError(f"{path} needs pyarrow (pip install pyarrow)")
+            table = pq.read_table(path, columns=columns)
+            return {c: table.column(c).to_numpy() for c in columns}
+        with np.load(path) as z:
+            return {c: z[c] for c in columns}
+
+    def scan(self, columns=tuple(COLUMNS), *, hero=None, other=None, relation: int | None = None,
+             parts: list[Partition] | None = None, **select) -> Scan:
+        """Rows of the selected partitions matching hero/other/relation, concatenated."""
+        require_numpy()
+        parts = self.select(**select) if parts is None else parts
+        hero = None if hero is None else self.hero_id(hero)
+        other = None if other is None else self.hero_id(other)
+        filters = [c for c, v in (("hero", hero), ("other", other), ("relation", relation)) if v is not None]
+        needed = list(dict.fromkeys(list(columns) + filters))
+        chunks: dict[str, list] = {c: [] for c in columns}
+        part_idx = []
+        for i, part in enumerate(parts):
+            cols = self._read(part.path, needed)
+            mask = np.ones(len(cols[needed[0]]), dtype=bool)
+            for c, v in (("hero", hero), ("other", other), ("relation", relation)):
+                if v is not None:
+                    mask &= cols[c] == v
+            for c in columns:
+                chunks[c].append(cols[c][mask])
+            part_idx.append(np.full(int(mask.sum()), i, dtype=np.int32))
+        return Scan(
+            columns={c: (np.concatenate(v) if v else np.zeros(0, dtype=COLUMNS[c])) for c, v in chunks.items()},
+            part=np.concatenate(part_idx) if part_idx else np.zeros(0, dtype=np.int32),
+            parts=parts,
+        )
+
+    def matchup(self, hero, other, relation: int = REL_VS, last: int | None = None,
+                brackets=None, latest: bool = True) -> list[dict]:
+        """Per-run stats of one pair over the last `last` patches (oldest first).
+
+        vs rows give matches / wins / win_rate of `hero` against `other`;
+        with rows give matches / mean synergy.
+        """
+        patches = self.patches()
+        if last:
+            patches = patches[-last:]
+        scan = self.scan(("matches", "wins", "synergy", "samples"), hero=hero, other=other, relation=relation,
+                         patches=set(patches), brackets=brackets, latest=latest)
+        n = len(scan.parts)
+        c = scan.columns
+        matches = np.bincount(scan.part, weights=c["matches"], minlength=n)
+        wins = np.bincount(scan.part, weights=c["wins"], minlength=n)
+        synergy = np.bincount(scan.part, weights=c["synergy"], minlength=n)
+        samples = np.bincount(scan.part, weights=c["samples"], minlength=n)
+        out = []
+        for i, part in enumerate(scan.parts):
+            row = {"patch": part.patch, "bracket": part.bracket, "run": part.run, "matches": int(matches[i])}
+            if relation == REL_VS:
+                row["wins"] = int(wins[i])
+                row["win_rate"] = wins[i] / matches[i] if matches[i] else None
+            else:
+                row["synergy"] = synergy[i] / samples[i] if samples[i] else None
+            out.append(row)
+        return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default=str(HISTORY_DIR))
+    ap.add_argument("--matchup", nargs=2, metavar=("HERO", "OTHER"))
+    ap.add_argument("--relation", choices=sorted(RELATIONS), default="vs")
+    ap.add_argument("--last", type=int, default=0, help="only the last N patches")
+    ap.add_argument("--bracket", action="append", help="repeatable; default all brackets")
+    ap.add_argument("--all-runs", action="store_true", help="every run, not only the newest per patch/bracket")
+    args = ap.parse_args()
+
+    store = HistoryStore(Path(args.root))
+    if not args.matchup:
+        parts = store.partitions()
+        for p in parts:
+            print(f"{p.patch}\t{p.bracket}\t{p.run}\t{p.path.suffix[1:]}")
+        print(f"runs\t{len(parts)}\npatches\t{len(store.patches())}")
+        return 0
+
+    try:
+        rows = store.matchup(*args.matchup, relation=RELATIONS[args.relation], last=args.last or None,
+                             brackets=set(args.bracket) if args.bracket else None, latest=not args.all_runs)
+    except KeyError as e:
+        print(e.args[0], file=sys.stderr)
+        return 1
+    for r in rows:
+        if args.relation == "vs":
+            rate = "-" if r["win_rate"] is None else f"{r['win_rate'] * 100:.2f}%"
+            print(f"{r['patch']}\t{r['bracket']}\t{r['run']}\tmatches={r['matches']}\twins={r['wins']}\twin_rate={rate}")
+        else:
+            syn = "-" if r["synergy"] is None else f"{r['synergy']:.2f}"
+            print(f"{r['patch']}\t{r['bracket']}\t{r['run']}\tmatches={r['matches']}\tsynergy={syn}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Precomputed hero x hero interaction tables (data/interaction_tables.json).
+
+score_hero resolves role and tag pair rules by formatting "a+b" / "b+a" keys
+for every (candidate role x ally role) and (candidate tag x ally tag). All of
+that depends only on the two heroes, so it is folded here once per refresh:
+
+  role_pairs[c * n + a]     sum of role_synergies + role_conflicts for candidate c with ally a
+  tag_synergies[c * n + a]  sum of tag_synergies for candidate c with ally a
+  tag_counters[c * n + e]   sum of tag_counters (enemy_tag+our_tag) for candidate c vs enemy e
+  phase_bias[c]             [early, mid, late] lists of the phase_bias weights of c's tags
+
+Heroes are indexed by `heroes` (sorted names). phase_bias keeps one weight
+per tag because the engine rounds each tag's weighted bias separately.
+
+The engine loads the file with `loader::load_interactions` when it is not
+older than the JSON sources and falls back to the string rules otherwise.
+
+Run:
+  python scripts/interaction_tables.py              # write data/interaction_tables.json
+  python scripts/interaction_tables.py --validate   # compare with the string rules, exit 1 on mismatch
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from hero_db import DATA_DIR, PHASES, source_fingerprint
+from scoring import compile_tables, load_data, pair_weight
+
+TABLES_FILE = DATA_DIR / "interaction_tables.json"
+VERSION = 1
+
+
+def build_tables(heroes: dict[str, dict], roles: dict, synergies: dict) -> dict:
+    t = compile_tables(heroes, roles, synergies)
+    phase_bias = synergies.get("phase_bias") or {}
+    return {
+        "version": VERSION,
+        "fingerprint": source_fingerprint().hex(),
+        "heroes": t.names,
+        "role_pairs": t.role_pairs.ravel().tolist(),
+        "tag_synergies": t.tag_synergy_pairs.ravel().tolist(),
+        "tag_counters": t.tag_counter_pairs.ravel().tolist(),
+        "phase_bias": [
+            [[phase_bias[p][tag] for tag in heroes[name]["tags"] if tag in (phase_bias.get(p) or {})]
+             for p in PHASES]
+            for name in t.names
+        ],
+    }
+
+
+def write_tables(path: Path = TABLES_FILE) -> Path:
+    tables = build_tables(*load_data())
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(tables, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def rule_pair_sums(cand: dict, other: dict, roles: dict, synergies: dict) -> tuple[int, int, int]:
+    """(role, tag synergy, tag counter) sums for one pair, resolved from the string keys like score_hero."""
+    role = tag_syn = tag_ctr = 0
+    for r1 in cand["roles"]:
+        for r2 in other["roles"]:
+            role += pair_weight(roles.get("role_synergies") or {}, r1, r2) or 0
+            role += pair_weight(roles.get("role_conflicts") or {}, r1, r2) or 0
+    for t1 in cand["tags"]:
+        for t2 in other["tags"]:
+            tag_syn += pair_weight(synergies.get("tag_synergies") or {}, t1, t2) or 0
+            tag_ctr += (synergies.get("tag_counters") or {}).get(f"{t2}+{t1}", 0)
+    return role, tag_syn, tag_ctr
+
+
+def validate(tables: dict, heroes: dict[str, dict], roles: dict, synergies: dict) -> list[str]:
+    """Every difference between the tables and the string-rule results."""
+    problems = []
+    if tables.get("version") != VERSION:
+        problems.append(f"version {tables.get('version')} != {VERSION}")
+    names = tables["heroes"]
+    if names != sorted(heroes):
+        return problems + ["hero list differs from data/heroes"]
+    n = len(names)
+    for key in ("role_pairs", "tag_synergies", "tag_counters"):
+        if len(tables[key]) != n * n:
+            problems.append(f"{key}: {len(tables[key])} entries, expected {n * n}")
+    if problems:
+        return problems
+
+    phase_bias = synergies.get("phase_bias") or {}
+    for c, cand_name in enumerate(names):
+        cand = heroes[cand_name]
+        for o, other_name in enumerate(names):
+            want = rule_pair_sums(cand, heroes[other_name], roles, synergies)
+            got = tuple(tables[key][c * n + o] for key in ("role_pairs", "tag_synergies", "tag_counters"))
+            if got != want:
+                problems.append(f"{cand_name} / {other_name}: tables {got} != rules {want}")
+        for k, p in enumerate(PHASES):
+            m = phase_bias.get(p) or {}
+            want_bias = [m[t] for t in cand["tags"] if t in m]
+            if tables["phase_bias"][c][k] != want_bias:
+                problems.append(f"{cand_name} phase_bias.{p}: {tables['phase_bias'][c][k]} != {want_bias}")
+    return problems
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=str(TABLES_FILE))
+    ap.add_argument("--validate", action="store_true", help="check the tables against the string rules")
+    args = ap.parse_args()
+
+    path = Path(args.path)
+    if not args.validate:
+        write_tables(path)
+        print(f"Wrote: {path} ({path.stat().st_size} bytes)")
+        return 0
+
+    tables = json.loads(path.read_text(encoding="utf-8"))
+    if tables.get("fingerprint") != source_fingerprint().hex():
+        print("note: tables are older than the JSON sources", file=sys.stderr)
+    problems = validate(tables, *load_data())
+    for p in problems[:50]:
+        print(p)
+    n = len(tables["heroes"])
+    print(f"pairs\t{n * n}\nproblems\t{len(problems)}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Newline-delimited JSON events from the update pipeline.
+
+With `stratz_hero_requests.py --events` stdout carries only events, one
+compact JSON object per line, and the human-readable progress log goes to
+stderr. Consumers parse whole stdout lines (`parse_line`); the Tauri
+`cmd_update_data` does the same.
+
+Every event has "event" and "t" (seconds since the run started):
+
+  run_start     workers, rate, batch_size, source
+  phase_start   phase (heroes, positions, matchups, save, update)
+  phase_end     phase, seconds
+  request       context, status, latency_ms, bytes, attempt; cached=true for cache hits
+  retry         context, attempt, reason (5xx status or exception), delay_s
+  throttle      context, attempt, wait_s (429 Retry-After, pauses every request)
+  progress      done, total (heroes with matchups)
+  summary       requests, cache_hits, retries, throttled, throttle_wait_s, failed,
+                bytes, latency_p50_ms, latency_p95_ms, requests_per_s, seconds
+  run_end       ok, changed, updated
+
+Run:
+  python scripts/stratz_hero_requests.py --events | python scripts/pipeline_events.py
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linear-interpolated percentile (numpy's default), None for no values."""
+    if not values:
+        return None
+    s = sorted(values)
+    k = (len(s) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+
+class EventSink:
+    """Writes events to `stream`; with stream=None events are dropped."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.started = time.monotonic()
+        self._phases: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.stream is not None
+
+    def emit(self, event: str, **fields) -> None:
+        if self.stream is None:
+            return
+        row = {"event": event, "t": round(time.monotonic() - self.started, 3), **fields}
+        line = json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def begin(self, phase: str, **fields) -> None:
+        self._phases[phase] = time.monotonic()
+        self.emit("phase_start", phase=phase, **fields)
+
+    def end(self, phase: str, **fields) -> None:
+        t0 = self._phases.pop(phase, None)
+        seconds = round(time.monotonic() - t0, 3) if t0 is not None else None
+        self.emit("phase_end", phase=phase, seconds=seconds, **fields)
+
+    @contextmanager
+    def phase(self, name: str, **fields):
+        self.begin(name, **fields)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+
+EVENT_MARKER = '{"event":'
+
+
+def parse_line(line: str) -> dict | None:
+    """The event on one whole stdout line, None for anything else."""
+    if not line.startswith(EVENT_MARKER):
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def summary(stats, seconds: float) -> dict:
+    """End-of-run figures from a stratz_fetch.FetchStats."""
+    def ms(v):
+        return round(v * 1000, 1) if v is not None else None
+    return {
+        "requests": stats.requests,
+        "cache_hits": stats.cache_hits,
+        "retries": stats.retries,
+        "throttled": stats.throttled,
+        "throttle_wait_s": round(stats.throttle_wait, 2),
+        "failed": stats.failed,
+        "bytes": stats.bytes,
+        "latency_p50_ms": ms(percentile(stats.latencies, 50)),
+        "latency_p95_ms": ms(percentile(stats.latencies, 95)),
+        "requests_per_s": round(stats.requests / seconds, 2) if seconds > 0 else None,
+        "seconds": round(seconds, 3),
+    }
+
+
+def main() -> int:
+    """Read an event stream and print the events as tab-separated rows."""
+    for line in sys.stdin:
+        row = parse_line(line.rstrip("\n"))
+        if row is None:
+            continue
+        event, t = row.pop("event"), row.pop("t", "")
+        print(f"{t}\t{event}\t" + "\t".join(f"{k}={v}" for k, v in row.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Typed per-position pick statistics.
+
+The fetch stage keeps raw Stratz counts per position and writes them to
+dota_heroes_stratz.json as
+
+  "positions": {"pos_1": {"pick_count": 120002, "win_count": 65161}, ...}
+
+Pick and win rates are derived from the counts only where they are shown or
+stored as hero data (`HeroPositions.pick_rates()` for data/heroes/*.json), so
+nothing goes through a "30.4%" string and back.
+
+Files written before this format carry {"pick_count", "pick_rate": "30.4%",
+"win_rate": "54.3%"}; `HeroPositions.from_json` reads both. Legacy wins are
+recovered from the rounded win rate, and an entry without a pick_count keeps
+its stored pick rate, also through `to_json` (it stays {"pick_rate": "x%"}
+until a fetch brings counts).
+
+Run:
+  python scripts/position_stats.py                     # check data/dota_heroes_stratz.json reads back the same rates
+  python scripts/position_stats.py --migrate           # rewrite it in the count format
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from hero_db import DATA_DIR, POSITIONS
+
+STRATZ_FILE = DATA_DIR / "dota_heroes_stratz.json"
+# Hero files store pick rates in percent with one decimal
+PERCENT_DECIMALS = 1
+
+
+def parse_percent(value) -> float | None:
+    """30.4, "30.4" or "30.4%" -> 30.4; None for anything else."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip("%"))
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class PositionStats:
+    matches: int
+    wins: int
+
+    @property
+    def win_rate(self) -> float | None:
+        """Percent, None without matches."""
+        return self.wins / self.matches * 100.0 if self.matches else None
+
+
+@dataclass(slots=True)
+class HeroPositions:
+    stats: dict[str, PositionStats] = field(default_factory=dict)
+    # Pick rates read from legacy entries that have no pick_count
+    legacy_rates: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_counts(cls, counts: dict[str, dict]) -> "HeroPositions":
+        """{pos: {"matches", "wins"}} as collected from the winWeek responses."""
+        return cls({pos: PositionStats(int(c["matches"]), int(c["wins"])) for pos, c in counts.items()})
+
+    @classmethod
+    def from_json(cls, positions: dict | None) -> "HeroPositions":
+        """Either the count format or the legacy "x%" format."""
+        out = cls()
+        for pos, data in (positions or {}).items():
+            if not isinstance(data, dict):
+                continue
+            matches = data.get("pick_count")
+            if not isinstance(matches, int):
+                rate = parse_percent(data.get("pick_rate"))
+                if rate is not None:
+                    out.legacy_rates[pos] = rate
+                continue
+            wins = data.get("win_count")
+            if not isinstance(wins, int):
+                win_rate = parse_percent(data.get("win_rate"))
+                wins = round(win_rate / 100.0 * matches) if win_rate is not None else 0
+            out.stats[pos] = PositionStats(matches, wins)
+        return out
+
+    @property
+    def total(self) -> int:
+        return sum(s.matches for s in self.stats.values())
+
+    def pick_rate(self, pos: str) -> float | None:
+        """Percent of the hero's games played in `pos`."""
+        s = self.stats.get(pos)
+        if s is not None:
+            total = self.total
+            return s.matches / total * 100.0 if total else None
+        return self.legacy_rates.get(pos)
+
+    def win_rate(self, pos: str) -> float | None:
+        s = self.stats.get(pos)
+        return s.win_rate if s is not None else None
+
+    def pick_rates(self, decimals: int = PERCENT_DECIMALS) -> dict[str, float]:
+        """{pos: pick rate %} for the hero files; positions without data are left out."""
+        out = {}
+        for pos in list(self.stats) + [p for p in self.legacy_rates if p not in self.stats]:
+            rate = self.pick_rate(pos)
+            if rate is not None:
+                out[pos] = round(rate, decimals)
+        return out
+
+    def to_json(self) -> dict[str, dict]:
+        """Count format; positions known only by a legacy pick rate keep it as {"pick_rate": "x%"}."""
+        order = {p: i for i, p in enumerate(POSITIONS)}
+        entries: dict[str, dict] = {pos: {"pick_count": s.matches, "win_count": s.wins} for pos, s in self.stats.items()}
+        for pos, rate in self.legacy_rates.items():
+            entries.setdefault(pos, {"pick_rate": f"{rate:g}%"})
+        return dict(sorted(entries.items(), key=lambda kv: order.get(kv[0], len(order))))
+
+
+def legacy_pick_rates(positions: dict) -> dict[str, float]:
+    """What the old string round trip produced, for --check."""
+    out = {}
+    for pos, data in positions.items():
+        if isinstance(data, dict) and "pick_rate" in data:
+            out[pos] = parse_percent(data["pick_rate"]) or 0.0
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=str(STRATZ_FILE))
+    ap.add_argument("--migrate", action="store_true", help="rewrite the file with raw counts")
+    args = ap.parse_args()
+
+    path = Path(args.path)
+    heroes = json.loads(path.read_text(encoding="utf-8"))
+    legacy = sum(1 for h in heroes for d in (h.get("positions") or {}).values()
+                 if isinstance(d, dict) and "win_count" not in d)
+
+    if args.migrate:
+        rates_only = 0
+        for h in heroes:
+            positions = HeroPositions.from_json(h.get("positions"))
+            rates_only += sum(1 for pos in positions.legacy_rates if pos not in positions.stats)
+            h["positions"] = positions.to_json()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(heroes, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(path)
+        print(f"Migrated: {path} ({legacy} legacy entries, {rates_only} without counts kept as pick_rate)")
+        return 0
+
+    diffs = 0
+    for h in heroes:
+        positions = h.get("positions") or {}
+        got = HeroPositions.from_json(positions).pick_rates()
+        want = legacy_pick_rates(positions)
+        if want and got != want:
+            diffs += 1
+            print(f"{h.get('name')}\t{got}\t!=\t{want}", file=sys.stderr)
+    print(f"heroes\t{len(heroes)}\nlegacy_entries\t{legacy}\ndifferences\t{diffs}")
+    return 1 if diffs else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Append-only checkpoint journal for `stratz_hero_requests.py`.
+
+Every fetch run writes data/.cache/stratz_journal.jsonl as it goes, one JSON
+object per line, flushed and fsynced before the next one:
+
+  {"type": "start", "run": "...", "started": "...", "api_url": "...", "bracket": "..."}
+  {"type": "query", "name": "constants" | "positions" | "patch", "data": ...}
+  {"type": "hero", "hid": 1, "aggs": {"vs": [...], "with": [...]}}
+  {"type": "hero", "hid": 2, "failed": true}
+  {"type": "done"}
+
+A run that dies (crash, Ctrl-C) or finishes with failed heroes leaves a
+journal without "done". `--resume` replays it: the constants and positions
+responses are reused and only heroes that are missing or whose last entry
+failed are fetched again, appending to the same journal. A torn last line
+from a crash is ignored when reading and cut off before appending. A journal
+written against another API URL or rank bracket is not resumed.
+
+Run:
+  python scripts/refresh_journal.py          # state of the current journal
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+JOURNAL_FILE = ROOT / "data" / ".cache" / "stratz_journal.jsonl"
+
+
+@dataclass
+class JournalState:
+    run: str | None = None
+    started: str | None = None
+    api_url: str | None = None
+    bracket: str | None = None
+    done: bool = False
+    queries: dict[str, object] = field(default_factory=dict)
+    heroes: dict[int, dict] = field(default_factory=dict)   # hid -> packed aggregates
+    failed: set[int] = field(default_factory=set)
+
+    @property
+    def resumable(self) -> bool:
+        return self.run is not None and not self.done
+
+
+def read_journal(path: Path = JOURNAL_FILE) -> JournalState:
+    state = JournalState()
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return state
+    for line in lines:
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue  # torn write at the end of a crashed run
+        kind = row.get("type")
+        if kind == "start":
+            state = JournalState(row.get("run"), row.get("started"), row.get("api_url"), row.get("bracket"))
+        elif kind == "query":
+            state.queries[row["name"]] = row.get("data")
+        elif kind == "hero":
+            hid = int(row["hid"])
+            if row.get("failed"):
+                state.failed.add(hid)
+                state.heroes.pop(hid, None)
+            else:
+                state.heroes[hid] = row["aggs"]
+                state.failed.discard(hid)
+        elif kind == "done":
+            state.done = True
+    return state
+
+
+class RefreshJournal:
+    """Writer for one fetch run. `open(resume=True)` continues an unfinished journal."""
+
+    def __init__(self, path: Path | str = JOURNAL_FILE):
+        self.path = Path(path)
+        self.state = JournalState()
+        self.not_resumed: str | None = None   # why an unfinished run was started over
+        self._file = None
+
+    def open(self, api_url: str = "", resume: bool = False, bracket: str = "") -> JournalState:
+        """Returns the state to resume from (empty unless resuming an unfinished run)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume:
+            state = read_journal(self.path)
+            if state.resumable and (state.api_url or "") != api_url:
+                self.not_resumed = f"run {state.run} was against {state.api_url or '?'}, not {api_url}"
+            elif state.resumable and (state.bracket or "") != bracket:
+                self.not_resumed = f"run {state.run} was for bracket {state.bracket or '?'}, not {bracket}"
+            elif state.resumable:
+                self.state = state
+                self._drop_torn_tail()
+                self._file = open(self.path, "a", encoding="utf-8")
+                return state
+        self.state = JournalState(uuid.uuid4().hex[:12], datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                                  api_url, bracket)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._append({"type": "start", "run": self.state.run, "started": self.state.started, "api_url": api_url,
+                      "bracket": bracket})
+        return JournalState()
+
+    def _drop_torn_tail(self) -> None:
+        """Cut a partial last line (crash mid-write) so appended rows start on their own line."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _append(self, row: dict) -> None:
+        self._file.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_query(self, name: str, data) -> None:
+        self.state.queries[name] = data
+        self._append({"type": "query", "name": name, "data": data})
+
+    def record_hero(self, hid: int, packed: dict | None) -> None:
+        if packed is None:
+            self.state.failed.add(hid)
+            self._append({"type": "hero", "hid": hid, "failed": True})
+        else:
+            self.state.heroes[hid] = packed
+            self.state.failed.discard(hid)
+            self._append({"type": "hero", "hid": hid, "aggs": packed})
+
+    def finish(self) -> None:
+        """Mark the run complete; only call when no hero failed."""
+        self.state.done = True
+        self._append({"type": "done"})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=str(JOURNAL_FILE))
+    args = ap.parse_args()
+
+    state = read_journal(Path(args.path))
+    if state.run is None:
+        print("journal\tnone")
+        return 0
+    print(f"run\t{state.run}\nstarted\t{state.started}\ndone\t{state.done}")
+    print(f"queries\t{', '.join(sorted(state.queries)) or '-'}")
+    print(f"heroes\t{len(state.heroes)}\nfailed\t{len(state.failed)}")
+    if state.failed:
+        print(f"failed_ids\t{', '.join(map(str, sorted(state.failed)))}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
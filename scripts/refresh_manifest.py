@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Content-hash manifest for incremental Stratz refreshes.
+
+Keeps one hash per query response and one hash per section of every hero
+(meta, positions, counters, synergies) from the last refresh, so a new run can
+tell which heroes actually changed and rewrite only those files.
+
+Stored at data/.refresh_manifest.json (local state, not versioned).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_FILE = ROOT / "data" / ".refresh_manifest.json"
+MANIFEST_VERSION = 1
+
+HERO_SECTIONS = ("meta", "positions", "counters", "synergies")
+
+
+def content_hash(obj) -> str:
+    """Stable hash of a JSON-serialisable value (key order does not matter)."""
+    raw = json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def hero_section_hashes(hero: dict) -> dict[str, str]:
+    """Per-section hashes of one entry of dota_heroes_stratz.json."""
+    return {
+        "meta": content_hash([hero.get("name"), hero.get("primary_attr"), hero.get("roles")]),
+        "positions": content_hash(hero.get("positions")),
+        "counters": content_hash(hero.get("counters")),
+        "synergies": content_hash(hero.get("synergies")),
+    }
+
+
+class RefreshManifest:
+    def __init__(self, path: Path = MANIFEST_FILE, queries: dict | None = None, heroes: dict | None = None):
+        self.path = Path(path)
+        self.queries: dict[str, str] = queries or {}
+        self.heroes: dict[str, dict[str, str]] = heroes or {}
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_FILE) -> "RefreshManifest":
+        path = Path(path)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if raw.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, raw.get("queries"), raw.get("heroes"))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        payload = {"version": MANIFEST_VERSION, "queries": self.queries, "heroes": self.heroes}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def record_query(self, key: str, response) -> bool:
+        """Store the hash of one query response. Returns True if it differs from the last run."""
+        h = content_hash(response)
+        changed = self.queries.get(key) != h
+        self.queries[key] = h
+        return changed
+
+    def diff_heroes(self, heroes: list[dict]) -> dict[str, list[str]]:
+        """{hero name: [changed sections]} for heroes that differ from the manifest."""
+        changed: dict[str, list[str]] = {}
+        for hero in heroes:
+            new = hero_section_hashes(hero)
+            old = self.heroes.get(hero["name"], {})
+            sections = [s for s in HERO_SECTIONS if old.get(s) != new[s]]
+            if sections:
+                changed[hero["name"]] = sections
+        return changed
+
+    def update_heroes(self, heroes: list[dict]) -> None:
+        self.heroes = {hero["name"]: hero_section_hashes(hero) for hero in heroes}
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""Python port of the engine's `score_hero` (src/scoring.rs) for bulk evaluation.
+
+Two implementations of the same function:
+
+- `score_hero()` is a line-by-line reference with the engine's numeric
+  semantics: f32 arithmetic, `as i32` truncation toward zero, `f32::round`
+  (half away from zero) and `score / 10` truncating toward zero.
+- `ScoringTables` + `score_drafts()` precompile heroes, role rules and tag
+  rules into integer-indexed weight matrices and score every candidate
+  against many drafts in one NumPy pass (NumPy required).
+
+Every score_hero term is linear in the ally/enemy multisets except the
+position/role penalties and the phase weighting, so the pair terms collapse
+into two hero x hero integer matrices:
+
+  ally[h, a]  = trunc(2 * syn_h[a]) + roles_h . R . roles_a + tags_h . TS . tags_a
+  enemy[h, e] = trunc(2 * ctr_h[e]) - trunc(2 * ctr_e[h]) + tags_h . TC' . tags_e
+
+where R/TS/TC are role/tag rule weights indexed by interned role/tag ids,
+with the engine's `key1` then `key2` lookup order baked in.
+
+Names are matched exactly; allies/enemies that are not known heroes are
+dropped by `encode_drafts` (the engine ignores them as well, except for an
+explicit counter/synergy keyed by an unknown name, which the data never has).
+The primary position of a hero with tied top pick rates is the first one in
+data order; the engine takes whichever its HashMap yields first.
+
+Parity with the engine is checked against fixtures written by
+`examples/score_fixtures.rs`:
+
+  python scripts/scoring.py --make-drafts 500 --out drafts.json
+  cargo run --release --example score_fixtures -- drafts.json > fixtures.json
+  python scripts/scoring.py --parity fixtures.json
+
+A committed fixture over a slice of the data (scripts/tests/fixtures/parity)
+is checked by scripts/tests/test_scoring_parity.py.
+
+Run:
+  python scripts/scoring.py --self-check 2000     # vectorised vs reference
+  python scripts/scoring.py --bench 20000
+  python scripts/scoring.py --allies "Crystal Maiden" --enemies Axe Pudge
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+import hero_names
+from hero_db import PHASES, POSITIONS, open_db
+
+POSITION_BASE_PENALTY = {"pos_1": 120, "pos_2": 110, "pos_3": 90, "pos_4": 70, "pos_5": 60}
+POSITION_ALLOWED = {"pos_4": 2, "pos_5": 2}
+CARRY_PENALTY = 100
+SUPPORT_PENALTY = 50
+
+_F32 = struct.Struct("<f")
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required for vectorised scoring (pip install numpy)")
+
+
+def load_data() -> tuple[dict[str, dict], dict, dict]:
+    """(heroes, roles, synergies) as the engine sees them, from data/heroes.db."""
+    with open_db() as db:
+        return db.heroes(), db.role_rules(), db.synergy_rules()
+
+
+# --- Reference implementation ---------------------------------------------
+
+def f32(x: float) -> float:
+    """Round a Python float to the nearest f32."""
+    return _F32.unpack(_F32.pack(x))[0]
+
+
+def as_i32(x: float) -> int:
+    """Rust `f32 as i32`: truncate toward zero, NaN -> 0, saturate."""
+    if x != x:
+        return 0
+    return max(-2**31, min(2**31 - 1, int(x)))
+
+
+def round_half_away(x: float) -> int:
+    """Rust `f32::round() as i32`."""
+    return as_i32(math.copysign(math.floor(abs(x) + 0.5), x))
+
+
+def div10(score: int) -> int:
+    """Rust `i32 / 10` (truncates toward zero)."""
+    q = abs(score) // 10
+    return -q if score < 0 else q
+
+
+def primary_position(hero: dict) -> tuple[str, float, float] | None:
+    best_key = None
+    best_val = second_val = -1.0
+    for k, v in (hero.get("positions") or {}).items():
+        if v > best_val:
+            second_val = best_val
+            best_val = v
+            best_key = k
+        elif v > second_val:
+            second_val = v
+    if best_key is None:
+        return None
+    return best_key, max(best_val, 0.0), max(second_val, 0.0)
+
+
+def _flex_factor(top: float, second: float) -> float:
+    if top < 40.0:
+        return f32(0.55)
+    if f32(top - second) < 15.0:
+        return f32(0.75)
+    return 1.0
+
+
+def position_penalty(top: float, second: float, pos: str) -> int:
+    """Penalty for picking a hero whose primary position is already filled."""
+    base = float(POSITION_BASE_PENALTY.get(pos, 60))
+    weight = min(max(f32(top / 100.0), 0.0), 1.0)
+    return round_half_away(f32(f32(base * _flex_factor(top, second)) * weight))
+
+
+def team_phase(team: list[str], heroes: dict[str, dict]) -> dict[str, int]:
+    """Drafter::calculate_team_phase."""
+    phase = dict.fromkeys(PHASES, 0)
+    for name in team:
+        h = heroes.get(name)
+        if h:
+            for p in PHASES:
+                phase[p] += h["game_phase"].get(p, 0)
+    return phase
+
+
+def pair_weight(rules: dict, a: str, b: str) -> int | None:
+    v = rules.get(f"{a}+{b}")
+    return v if v is not None else rules.get(f"{b}+{a}")
+
+
+def score_hero(hero: dict, allies: list[str], enemies: list[str], heroes: dict[str, dict],
+               roles: dict, synergies: dict, enemy_phase: dict[str, int]) -> int:
+    """Reference port of scoring::score_hero."""
+    score = 0
+
+    role_counts: dict[str, int] = {}
+    pos_counts: dict[str, int] = {}
+    for ally in allies:
+        h = heroes.get(ally)
+        if h:
+            for r in h["roles"]:
+                role_counts[r] = role_counts.get(r, 0) + 1
+            pp = primary_position(h)
+            if pp:
+                pos_counts[pp[0]] = pos_counts.get(pp[0], 0) + 1
+
+    pp = primary_position(hero)
+    if pp:
+        pos, top, second = pp
+        if pos_counts.get(pos, 0) >= POSITION_ALLOWED.get(pos, 1):
+            score -= position_penalty(top, second, pos)
+
+    for r in hero["roles"]:
+        count = role_counts.get(r, 0)
+        if r == "carry" and count >= 1:
+            score -= CARRY_PENALTY
+        if r == "support" and count >= 2:
+            score -= SUPPORT_PENALTY
+
+    total = float(sum(enemy_phase[p] for p in PHASES))
+    if total > 0.0:
+        phase_bias = synergies.get("phase_bias") or {}
+        for p in PHASES:
+            w = f32(float(enemy_phase[p]) / total)
+            score += as_i32(f32(f32(hero["game_phase"][p] * w) * 10.0))
+        for p in PHASES:
+            w = f32(float(enemy_phase[p]) / total)
+            m = phase_bias.get(p)
+            if m:
+                for t in hero["tags"]:
+                    v = m.get(t)
+                    if v is not None:
+                        score += round_half_away(f32(float(v) * w))
+    else:
+        score += hero["game_phase"]["late"]
+
+    counters = hero.get("explicit_counters") or {}
+    for enemy in enemies:
+        v = counters.get(enemy)
+        if v is not None:
+            score += as_i32(f32(v * 2.0))
+        e = heroes.get(enemy)
+        if e:
+            v = (e.get("explicit_counters") or {}).get(hero["name"])
+            if v is not None:
+                score -= as_i32(f32(v * 2.0))
+
+    syns = hero.get("explicit_synergies") or {}
+    for ally in allies:
+        v = syns.get(ally)
+        if v is not None:
+            score += as_i32(f32(v * 2.0))
+
+    role_syn, role_conf = roles.get("role_synergies") or {}, roles.get("role_conflicts") or {}
+    tag_syn, tag_ctr = synergies.get("tag_synergies") or {}, synergies.get("tag_counters") or {}
+    for ally in allies:
+        a = heroes.get(ally)
+        if not a:
+            continue
+        for r1 in hero["roles"]:
+            for r2 in a["roles"]:
+                score += pair_weight(role_syn, r1, r2) or 0
+                score += pair_weight(role_conf, r1, r2) or 0
+        for t1 in hero["tags"]:
+            for t2 in a["tags"]:
+                score += pair_weight(tag_syn, t1, t2) or 0
+    for enemy in enemies:
+        e = heroes.get(enemy)
+        if not e:
+            continue
+        for t1 in hero["tags"]:
+            for t2 in e["tags"]:
+                score += tag_ctr.get(f"{t2}+{t1}", 0)
+
+    return div10(score)
+
+
+def score_all(allies: list[str], enemies: list[str], heroes: dict[str, dict],
+              roles: dict, synergies: dict) -> dict[str, int]:
+    """Reference score of every hero for one draft (picked heroes included)."""
+    phase = team_phase(enemies, heroes)
+    return {name: score_hero(h, allies, enemies, heroes, roles, synergies, phase) for name, h in heroes.items()}
+
+
+def explain(hero: dict, enemies: list[str], heroes: dict[str, dict]) -> list[str]:
+    """Reference port of analysis::explain."""
+    reasons: list[str] = []
+    for enemy in enemies:
+        v = (hero.get("explicit_counters") or {}).get(enemy)
+        if v is not None:
+            if v < -2.0:
+                reasons.append(f"Weak against {enemy}")
+            elif v > 2.0:
+                reasons.append(f"counters {enemy}")
+        e = heroes.get(enemy)
+        if e:
+            v = (e.get("explicit_counters") or {}).get(hero["name"])
+            if v is not None:
+                if v < -2.0:
+                    reasons.append(f"Counters {enemy}")
+                elif v > 2.0:
+                    reasons.append(f"Weak against {enemy}")
+    if hero["game_phase"]["early"] >= 8:
+        reasons.append("Strong early game")
+    elif hero["game_phase"]["late"] >= 8:
+        reasons.append("Strong late game")
+    # Vec::dedup drops consecutive duplicates only
+    return [r for i, r in enumerate(reasons) if i == 0 or reasons[i - 1] != r]
+
+
+# --- Vectorised implementation --------------------------------------------
+
+def _round_half_away_np(x):
+    x = x.astype(np.float64)
+    return (np.sign(x) * np.floor(np.abs(x) + 0.5)).astype(np.int64)
+
+
+@dataclass
+class ScoringTables:
+    names: list[str]
+    index: dict[str, int]
+    roles: list[str]
+    tags: list[str]
+    hero_roles: "np.ndarray"        # int32[n, R] role multiplicity per hero
+    hero_tags: "np.ndarray"         # int32[n, T]
+    role_weights: "np.ndarray"      # int64[R, R] role_synergies + role_conflicts, [our, ally]
+    tag_synergy: "np.ndarray"       # int64[T, T] [our, ally]
+    tag_counter: "np.ndarray"       # int64[T, T] [enemy, our]
+    role_pairs: "np.ndarray"        # int64[n, n] role rule sum, [candidate, ally]
+    tag_synergy_pairs: "np.ndarray"  # int64[n, n] tag synergy sum, [candidate, ally]
+    tag_counter_pairs: "np.ndarray"  # int64[n, n] tag counter sum, [candidate, enemy]
+    ally_matrix: "np.ndarray"       # float64[n, n] integer-valued, [candidate, ally]
+    enemy_matrix: "np.ndarray"      # float64[n, n] integer-valued, [candidate, enemy]
+    primary_pos: "np.ndarray"       # int64[n] index into POSITIONS, -1 if none
+    pos_allowed: "np.ndarray"       # int64[n]
+    pos_penalty: "np.ndarray"       # int64[n]
+    phase: "np.ndarray"             # int64[n, 3]
+    phase_bias: list[tuple]         # per phase: (float32[K] weights, float64[K, n] one-hot hero rows)
+
+    @property
+    def n(self) -> int:
+        return len(self.names)
+
+
+def _intern(values) -> tuple[list[str], dict[str, int]]:
+    vocab = sorted(set(values))
+    return vocab, {v: i for i, v in enumerate(vocab)}
+
+
+def _rule_matrix(rules: dict, ids: dict[str, int], symmetric_lookup: bool) -> "np.ndarray":
+    """W[i, j] = rules["i+j"], falling back to rules["j+i"] like the engine's or_else."""
+    w = np.zeros((len(ids), len(ids)), dtype=np.int64)
+    names = list(ids)
+    for a in names:
+        for b in names:
+            v = pair_weight(rules, a, b) if symmetric_lookup else rules.get(f"{a}+{b}")
+            if v is not None:
+                w[ids[a], ids[b]] = v
+    return w
+
+
+def compile_tables(heroes: dict[str, dict], roles: dict, synergies: dict) -> ScoringTables:
+    require_numpy()
+    names = sorted(heroes)
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    role_vocab, role_ids = _intern(r for h in heroes.values() for r in h["roles"])
+    tag_vocab, tag_ids = _intern(t for h in heroes.values() for t in h["tags"])
+
+    hero_roles = np.zeros((n, len(role_vocab)), dtype=np.int32)
+    hero_tags = np.zeros((n, len(tag_vocab)), dtype=np.int32)
+    primary_pos = np.full(n, -1, dtype=np.int64)
+    pos_allowed = np.ones(n, dtype=np.int64)
+    pos_penalty = np.zeros(n, dtype=np.int64)
+    phase = np.zeros((n, len(PHASES)), dtype=np.int64)
+    explicit_ally = np.zeros((n, n), dtype=np.int64)
+    explicit_enemy = np.zeros((n, n), dtype=np.int64)
+
+    for i, name in enumerate(names):
+        h = heroes[name]
+        for r in h["roles"]:
+            hero_roles[i, role_ids[r]] += 1
+        for t in h["tags"]:
+            hero_tags[i, tag_ids[t]] += 1
+        pp = primary_position(h)
+        if pp and pp[0] in POSITIONS:
+            pos, top, second = pp
+            primary_pos[i] = POSITIONS.index(pos)
+            pos_allowed[i] = POSITION_ALLOWED.get(pos, 1)
+            pos_penalty[i] = position_penalty(top, second, pos)
+        phase[i] = [h["game_phase"].get(p, 0) for p in PHASES]
+        for other, v in (h.get("explicit_counters") or {}).items():
+            j = index.get(other)
+            if j is not None:
+                explicit_enemy[i, j] += as_i32(f32(v * 2.0))
+                explicit_enemy[j, i] -= as_i32(f32(v * 2.0))
+        for other, v in (h.get("explicit_synergies") or {}).items():
+            j = index.get(other)
+            if j is not None:
+                explicit_ally[i, j] += as_i32(f32(v * 2.0))
+
+    role_weights = (_rule_matrix(roles.get("role_synergies") or {}, role_ids, True)
+                    + _rule_matrix(roles.get("role_conflicts") or {}, role_ids, True))
+    tag_synergy = _rule_matrix(synergies.get("tag_synergies") or {}, tag_ids, True)
+    tag_counter = _rule_matrix(synergies.get("tag_counters") or {}, tag_ids, False)
+
+    hr, ht = hero_roles.astype(np.int64), hero_tags.astype(np.int64)
+    role_pairs = hr @ role_weights @ hr.T
+    tag_synergy_pairs = ht @ tag_synergy @ ht.T
+    tag_counter_pairs = ht @ tag_counter.T @ ht.T
+    ally_matrix = explicit_ally + role_pairs + tag_synergy_pairs
+    enemy_matrix = explicit_enemy + tag_counter_pairs
+
+    bias = []
+    for p in PHASES:
+        m = (synergies.get("phase_bias") or {}).get(p) or {}
+        weights, rows = [], []
+        for i, name in enumerate(names):
+            for t in heroes[name]["tags"]:
+                if t in m:
+                    weights.append(m[t])
+                    rows.append(i)
+        onehot = np.zeros((len(rows), n), dtype=np.float64)
+        onehot[np.arange(len(rows)), rows] = 1.0
+        bias.append((np.array(weights, dtype=np.float32), onehot))
+
+    return ScoringTables(
+        names=names, index=index, roles=role_vocab, tags=tag_vocab,
+        hero_roles=hero_roles, hero_tags=hero_tags,
+        role_weights=role_weights, tag_synergy=tag_synergy, tag_counter=tag_counter,
+        role_pairs=role_pairs, tag_synergy_pairs=tag_synergy_pairs, tag_counter_pairs=tag_counter_pairs,
+        # float64 so the per-draft products go through BLAS; every entry is a small integer
+        ally_matrix=ally_matrix.astype(np.float64), enemy_matrix=enemy_matrix.astype(np.float64),
+        primary_pos=primary_pos, pos_allowed=pos_allowed, pos_penalty=pos_penalty,
+        phase=phase, phase_bias=bias,
+    )
+
+
+def encode_drafts(tables: ScoringTables, drafts) -> tuple["np.ndarray", "np.ndarray"]:
+    """[(allies, enemies), ...] -> ally/enemy hero multiplicity matrices int32[D, n]."""
+    require_numpy()
+    drafts = list(drafts)
+    allies = np.zeros((len(drafts), tables.n), dtype=np.int32)
+    enemies = np.zeros((len(drafts), tables.n), dtype=np.int32)
+    for d, (a_names, e_names) in enumerate(drafts):
+        for name in a_names:
+            i = tables.index.get(name)
+            if i is not None:
+                allies[d, i] += 1
+        for name in e_names:
+            i = tables.index.get(name)
+            if i is not None:
+                enemies[d, i] += 1
+    return allies, enemies
+
+
+def position_onehot(tables: ScoringTables) -> "np.ndarray":
+    """float64[n, len(POSITIONS)]: 1 at each hero's primary position."""
+    has_pos = tables.primary_pos >= 0
+    onehot = np.zeros((tables.n, len(POSITIONS)), dtype=np.float64)
+    onehot[np.flatnonzero(has_pos), tables.primary_pos[has_pos]] = 1.0
+    return onehot
+
+
+def score_drafts(tables: ScoringTables, allies, enemies) -> "np.ndarray":
+    """Scores of every candidate for every draft: int64[D, n], same as score_hero."""
+    require_numpy()
+    a = allies.astype(np.float64)
+    e = enemies.astype(np.float64)
+    return score_aggregates(
+        tables,
+        pair=a @ tables.ally_matrix.T + e @ tables.enemy_matrix.T,
+        pos_counts=np.rint(a @ position_onehot(tables)).astype(np.int64),
+        role_counts=np.rint(a @ tables.hero_roles.astype(np.float64)).astype(np.int64),
+        enemy_phase=np.rint(e @ tables.phase.astype(np.float64)).astype(np.int64),
+    )
+
+
+def score_aggregates(tables: ScoringTables, pair, pos_counts, role_counts, enemy_phase) -> "np.ndarray":
+    """Finish the scores from the per-draft team aggregates, all with a leading draft axis:
+
+    pair         float64[D, n]  ally_matrix / enemy_matrix terms of every candidate
+    pos_counts   int64[D, P]    allies per primary position
+    role_counts  int64[D, R]    allies per role
+    enemy_phase  int64[D, 3]    summed game_phase of the enemies
+    """
+    score = np.rint(pair).astype(np.int64)
+
+    # Position balance
+    has_pos = tables.primary_pos >= 0
+    taken = pos_counts[:, np.where(has_pos, tables.primary_pos, 0)]
+    score -= np.where(has_pos & (taken >= tables.pos_allowed), tables.pos_penalty, 0)
+
+    # Core roles
+    for role, min_count, penalty in (("carry", 1, CARRY_PENALTY), ("support", 2, SUPPORT_PENALTY)):
+        if role in tables.roles:
+            r = tables.roles.index(role)
+            score -= np.outer(role_counts[:, r] >= min_count, tables.hero_roles[:, r] * penalty)
+
+    # Game phase weighted by the enemy team's phase profile
+    total = enemy_phase.sum(axis=1).astype(np.float32)
+    live = total > 0
+    w = np.divide(enemy_phase.astype(np.float32), total[:, None],
+                  out=np.zeros(enemy_phase.shape, dtype=np.float32), where=live[:, None])
+    hero_phase = tables.phase.astype(np.float32)
+    ten = np.float32(10.0)
+    phase_score = np.zeros(score.shape, dtype=np.int64)
+    for k, (weights, rows) in enumerate(tables.phase_bias):
+        phase_score += ((hero_phase[None, :, k] * w[:, k, None]) * ten).astype(np.int64)
+        if len(weights):
+            bias = _round_half_away_np(weights[None, :] * w[:, k, None])
+            phase_score += np.rint(bias.astype(np.float64) @ rows).astype(np.int64)
+    score += np.where(live[:, None], phase_score, tables.phase[None, :, PHASES.index("late")])
+
+    # i32 / 10 truncates toward zero
+    return np.sign(score) * (np.abs(score) // 10)
+
+
+# --- CLI ------------------------------------------------------------------
+
+def random_drafts(names: list[str], count: int, seed: int = 0) -> list[tuple[list[str], list[str]]]:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        picked = rng.sample(names, 9)
+        out.append((picked[:rng.randint(0, 4)], picked[4:4 + rng.randint(0, 5)]))
+    return out
+
+
+def _check(drafts, expected: list[dict[str, int]], heroes, roles, synergies) -> int:
+    tables = compile_tables(heroes, roles, synergies)
+    vec = score_drafts(tables, *encode_drafts(tables, drafts))
+    mismatches = 0
+    for d, ((allies, enemies), exp) in enumerate(zip(drafts, expected)):
+        ref = score_all(allies, enemies, heroes, roles, synergies)
+        for name, want in exp.items():
+            got_ref, got_vec = ref.get(name), int(vec[d, tables.index[name]]) if name in tables.index else None
+            if got_ref != want or got_vec != want:
+                mismatches += 1
+                if mismatches <= 20:
+                    print(f"draft {d} {name}: expected {want} reference {got_ref} vectorised {got_vec}"
+                          f"\tallies={allies} enemies={enemies}")
+    checked = sum(len(e) for e in expected)
+    print(f"checked\t{checked}\nmismatches\t{mismatches}")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--allies", nargs="*", default=[])
+    ap.add_argument("--enemies", nargs="*", default=[])
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--make-drafts", type=int, default=0, metavar="N", help="write N random drafts as JSON")
+    ap.add_argument("--out", default="", help="output path for --make-drafts (default stdout)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--parity", default="", metavar="FIXTURES", help="compare against engine fixtures")
+    ap.add_argument("--self-check", type=int, default=0, metavar="N", help="vectorised vs reference on N drafts")
+    ap.add_argument("--bench", type=int, default=0, metavar="N", help="time both implementations on N drafts")
+    args = ap.parse_args()
+
+    heroes, roles, synergies = load_data()
+
+    if args.make_drafts:
+        drafts = [{"allies": a, "enemies": e} for a, e in random_drafts(sorted(heroes), args.make_drafts, args.seed)]
+        text = json.dumps(drafts, ensure_ascii=False, indent=1)
+        if args.out:
+            Path(args.out).write_text(text, encoding="utf-8")
+        else:
+            print(text)
+        return 0
+
+    if args.parity:
+        fixtures = json.loads(Path(args.parity).read_text(encoding="utf-8"))["drafts"]
+        drafts = [(f["allies"], f["enemies"]) for f in fixtures]
+        return _check(drafts, [f["scores"] for f in fixtures], heroes, roles, synergies)
+
+    if args.self_check:
+        drafts = random_drafts(sorted(heroes), args.self_check, args.seed)
+        tables = compile_tables(heroes, roles, synergies)
+        vec = score_drafts(tables, *encode_drafts(tables, drafts))
+        expected = [dict(zip(tables.names, map(int, row))) for row in vec]
+        return _check(drafts, expected, heroes, roles, synergies)
+
+    if args.bench:
+        drafts = random_drafts(sorted(heroes), args.bench, args.seed)
+        t0 = time.perf_counter()
+        tables = compile_tables(heroes, roles, synergies)
+        t1 = time.perf_counter()
+        score_drafts(tables, *encode_drafts(tables, drafts))
+        t2 = time.perf_counter()
+        sample = drafts[:max(1, min(len(drafts), 200))]
+        for allies, enemies in sample:
+            score_all(allies, enemies, heroes, roles, synergies)
+        t3 = time.perf_counter()
+        per_ref = (t3 - t2) / len(sample)
+        print(f"drafts\t{len(drafts)}\ncandidates\t{len(heroes)}")
+        print(f"compile_tables\t{(t1 - t0) * 1000:.1f} ms")
+        print(f"vectorised\t{(t2 - t1) * 1000:.1f} ms\t{(t2 - t1) / len(drafts) * 1e6:.1f} us/draft")
+        print(f"reference\t{per_ref * 1e6:.1f} us/draft")
+        return 0
+
+    names = hero_names.index()
+    args.allies, unknown = names.names(args.allies)
+    args.enemies, unknown_enemies = names.names(args.enemies)
+    unknown += unknown_enemies
+    if unknown:
+        print(f"unknown heroes: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    scores = score_all(args.allies, args.enemies, heroes, roles, synergies)
+    picked = set(args.allies) | set(args.enemies)
+    ranked = sorted(((s, n) for n, s in scores.items() if n not in picked), key=lambda x: -x[0])
+    for s, name in ranked[:args.limit]:
+        print(f"{name}\t{s}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Scoring service with cached, incrementally updated team aggregates.
+
+Everything score_hero needs from the draft besides the candidate itself is a
+team aggregate: the pair terms of every candidate against the picked heroes,
+allies per position and per role, and the enemies' summed game phase. Each
+of those is a sum over picked heroes, so adding or removing one hero is a
+single row update instead of a rebuild.
+
+Aggregates are kept in an LRU keyed by the canonical draft (sorted ally and
+enemy index tuples). On a miss the service looks for a recently used draft a
+few picks away and derives the new aggregate from it; only when none is
+close does it build from scratch. Final score rows are cached on the
+aggregate, so repeating a recommend call for the same draft costs a lookup.
+
+Run:
+  python scripts/scoring_service.py --allies Axe --enemies Pudge Lion
+  python scripts/scoring_service.py --self-check 500    # replay random draft clicks vs score_drafts
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import hero_names
+from scoring import compile_tables, load_data, position_onehot, score_aggregates, score_drafts
+
+DEFAULT_CACHE = 256
+# How many recent drafts to consider as a base, and how far a base may be
+MAX_BASES = 8
+MAX_DELTA = 4
+
+
+@dataclass
+class TeamAggregate:
+    allies: tuple[int, ...]
+    enemies: tuple[int, ...]
+    pair: "np.ndarray"          # float64[n]
+    pos_counts: "np.ndarray"    # int64[P]
+    role_counts: "np.ndarray"   # int64[R]
+    enemy_phase: "np.ndarray"   # int64[3]
+    scores: "np.ndarray | None" = field(default=None, repr=False)
+
+    def copy(self) -> "TeamAggregate":
+        return TeamAggregate(self.allies, self.enemies, self.pair.copy(), self.pos_counts.copy(),
+                             self.role_counts.copy(), self.enemy_phase.copy())
+
+
+def canonical(allies, enemies) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    return tuple(sorted(allies)), tuple(sorted(enemies))
+
+
+def _delta(a: tuple[int, ...], b: tuple[int, ...]) -> tuple[list[int], list[int]]:
+    """Heroes to (add, remove) to turn multiset a into b."""
+    ca, cb = Counter(a), Counter(b)
+    return list((cb - ca).elements()), list((ca - cb).elements())
+
+
+class ScoringService:
+    def __init__(self, tables, cache_size: int = DEFAULT_CACHE):
+        self.tables = tables
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple, TeamAggregate] = OrderedDict()
+        self._pos_onehot = position_onehot(tables)
+        self._role_rows = tables.hero_roles.astype(np.int64)
+        self.hits = 0
+        self.misses = 0
+        self.incremental = 0
+        self.rebuilds = 0
+
+    @classmethod
+    def load(cls, cache_size: int = DEFAULT_CACHE) -> "ScoringService":
+        return cls(compile_tables(*load_data()), cache_size)
+
+    # --- aggregates -------------------------------------------------------
+
+    def _empty(self) -> TeamAggregate:
+        t = self.tables
+        return TeamAggregate((), (), np.zeros(t.n), np.zeros(self._pos_onehot.shape[1], dtype=np.int64),
+                             np.zeros(len(t.roles), dtype=np.int64), np.zeros(t.phase.shape[1], dtype=np.int64))
+
+    def _apply(self, agg: TeamAggregate, hero: int, enemy: bool, sign: int) -> None:
+        t = self.tables
+        if enemy:
+            agg.pair += sign * t.enemy_matrix[:, hero]
+            agg.enemy_phase += sign * t.phase[hero]
+        else:
+            agg.pair += sign * t.ally_matrix[:, hero]
+            agg.pos_counts += sign * self._pos_onehot[hero].astype(np.int64)
+            agg.role_counts += sign * self._role_rows[hero]
+
+    def _derive(self, base: TeamAggregate, allies: tuple[int, ...], enemies: tuple[int, ...]) -> TeamAggregate:
+        agg = base.copy()
+        add_a, rm_a = _delta(base.allies, allies)
+        add_e, rm_e = _delta(base.enemies, enemies)
+        for heroes, enemy, sign in ((add_a, False, 1), (rm_a, False, -1), (add_e, True, 1), (rm_e, True, -1)):
+            for h in heroes:
+                self._apply(agg, h, enemy, sign)
+        agg.allies, agg.enemies = allies, enemies
+        return agg
+
+    def _nearest(self, allies: tuple[int, ...], enemies: tuple[int, ...]) -> TeamAggregate | None:
+        best, best_cost = None, MAX_DELTA + 1
+        for key in list(reversed(self._cache))[:MAX_BASES]:
+            base = self._cache[key]
+            cost = sum(len(x) for x in _delta(base.allies, allies) + _delta(base.enemies, enemies))
+            if cost < best_cost:
+                best, best_cost = base, cost
+        return best
+
+    def aggregate(self, allies, enemies) -> TeamAggregate:
+        """Aggregate for a draft given as hero indices (any order)."""
+        key = canonical(allies, enemies)
+        agg = self._cache.get(key)
+        if agg is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return agg
+        self.misses += 1
+        base = self._nearest(*key)
+        if base is None:
+            self.rebuilds += 1
+            base = self._empty()
+        else:
+            self.incremental += 1
+        agg = self._derive(base, *key)
+        self._cache[key] = agg
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return agg
+
+    # --- scoring ----------------------------------------------------------
+
+    def scores(self, allies, enemies) -> "np.ndarray":
+        """int64[n] score of every hero for the draft, same as score_drafts."""
+        agg = self.aggregate(allies, enemies)
+        if agg.scores is None:
+            agg.scores = score_aggregates(self.tables, agg.pair[None, :], agg.pos_counts[None, :],
+                                          agg.role_counts[None, :], agg.enemy_phase[None, :])[0]
+        return agg.scores
+
+    def indices(self, names) -> list[int]:
+        return [self.tables.index[n] for n in names]
+
+    def recommend(self, allies: list[str], enemies: list[str], limit: int = 10,
+                  exclude: list[str] = ()) -> list[tuple[str, int]]:
+        """Best free heroes for the draft, ties by name like `Drafter::recommend`."""
+        scores = self.scores(self.indices(allies), self.indices(enemies))
+        taken = set(allies) | set(enemies) | set(exclude)
+        names = self.tables.names
+        ranked = sorted((i for i in range(len(names)) if names[i] not in taken),
+                        key=lambda i: (-scores[i], names[i]))
+        return [(names[i], int(scores[i])) for i in ranked[:limit]]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "incremental": self.incremental,
+            "rebuilds": self.rebuilds,
+            "entries": len(self._cache),
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def click_sequences(n: int, count: int, seed: int = 0):
+    """Random live-draft edits: mostly picks, sometimes an undo, with repeated queries."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        allies, enemies = [], []
+        while len(allies) < 5 or len(enemies) < 5:
+            side = allies if (len(enemies) >= 5 or (len(allies) < 5 and rng.random() < 0.5)) else enemies
+            if side and rng.random() < 0.15:
+                side.pop(rng.randrange(len(side)))
+            else:
+                free = [h for h in range(n) if h not in allies and h not in enemies]
+                side.append(rng.choice(free))
+            yield tuple(allies), tuple(enemies)
+            if rng.random() < 0.5:
+                yield tuple(allies), tuple(enemies)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--allies", nargs="*", default=[])
+    ap.add_argument("--enemies", nargs="*", default=[])
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--cache", type=int, default=DEFAULT_CACHE, help="aggregates kept in the LRU")
+    ap.add_argument("--self-check", type=int, default=0, metavar="N", help="replay N random drafts vs score_drafts")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    service = ScoringService.load(args.cache)
+    if args.self_check:
+        tables = service.tables
+        queries = list(click_sequences(tables.n, args.self_check, args.seed))
+        mismatches = 0
+        t0 = time.perf_counter()
+        got = [service.scores(a, e) for a, e in queries]
+        elapsed = time.perf_counter() - t0
+        allies = np.zeros((len(queries), tables.n), dtype=np.int32)
+        enemies = np.zeros((len(queries), tables.n), dtype=np.int32)
+        for d, (a, e) in enumerate(queries):
+            allies[d, list(a)] = 1
+            enemies[d, list(e)] = 1
+        want = score_drafts(tables, allies, enemies)
+        for d, row in enumerate(got):
+            if not np.array_equal(row, want[d]):
+                mismatches += 1
+                if mismatches <= 10:
+                    print(f"mismatch\t{queries[d]}", file=sys.stderr)
+        print(f"queries\t{len(queries)}")
+        print(f"us_per_query\t{elapsed / len(queries) * 1e6:.1f}")
+        for k, v in service.stats().items():
+            print(f"{k}\t{v}")
+        print(f"mismatches\t{mismatches}")
+        return 1 if mismatches else 0
+
+    names = hero_names.index()
+    args.allies, unknown = names.names(args.allies)
+    args.enemies, unknown_enemies = names.names(args.enemies)
+    unknown += unknown_enemies
+    if unknown:
+        print(f"unknown heroes: {', '.join(unknown)}", file=sys.stderr)
+        return 1
+    for name, score in service.recommend(args.allies, args.enemies, args.limit):
+        print(f"{name}\t{score}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Versioned, immutable snapshots of the hero data (data/snapshots/).
+
+`data/heroes/*.json` is rewritten file by file during a refresh, so a reader
+that loads at the same moment can mix old and new heroes. After every
+refresh the update stage publishes a snapshot instead:
+
+  data/snapshots/<UTC time>-<fingerprint>/   heroes/*.json, roles.json, synergies.json,
+                                             heroes.db, interaction_tables.json
+  data/snapshots/current                     symlink to the newest snapshot
+  data/snapshots/CURRENT                     the same name as text (for platforms or
+                                             readers without symlinks)
+
+A snapshot is staged in a hidden directory, fsync'd, renamed into place and
+only then made current with os.replace, so `current` always names a complete
+directory. Snapshots are never modified after publishing; the oldest are
+pruned beyond --keep.
+
+publish() recompiles heroes.db and interaction_tables.json first if the
+source fingerprint stored in them (see hero_db.source_fingerprint) does not
+match the JSON sources, so a snapshot never pairs new sources with a stale
+compiled file.
+
+SnapshotReader loads heroes.db of the current snapshot (one mmap, no JSON)
+and reloads only when the pointer moves; `get()` never blocks on a reload.
+A heroes.db whose header fingerprint does not match the snapshot's own JSON
+files is ignored and the JSON is read instead. draft_daemon.py serves from
+it.
+
+Run:
+  python scripts/snapshots.py --publish      # snapshot the current data/
+  python scripts/snapshots.py                # show the current snapshot and the list
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from hero_db import DATA_DIR, DB_FILE, HERO_DIR, ROLES_FILE, SYNERGIES_FILE, HeroDB, open_db, source_fingerprint
+from interaction_tables import TABLES_FILE, write_tables
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+CURRENT_LINK = "current"
+CURRENT_FILE = "CURRENT"
+DEFAULT_KEEP = 3
+
+
+def _fsync_dir(path: Path) -> None:
+    # Directories cannot be opened for fsync on Windows; rename durability is best effort there
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write via a temp file + fsync + os.replace so readers see the old or the new file, never a torn one."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _copy_synced(src: Path, dst: Path) -> None:
+    shutil.copy2(src, dst)
+    with open(dst, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def current_name(root: Path = SNAPSHOT_DIR) -> str | None:
+    """Name of the current snapshot, from the symlink or else the pointer file."""
+    link = root / CURRENT_LINK
+    try:
+        return Path(os.readlink(link)).name
+    except OSError:
+        pass
+    try:
+        name = (root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def current_snapshot(root: Path = SNAPSHOT_DIR) -> Path | None:
+    name = current_name(root)
+    if name is None or not (root / name).is_dir():
+        return None
+    return root / name
+
+
+def list_snapshots(root: Path = SNAPSHOT_DIR) -> list[Path]:
+    """Published snapshots, oldest first (names sort by time)."""
+    if not root.is_dir():
+        return []
+    return sorted(p for p in root.iterdir() if p.is_dir() and not p.is_symlink() and not p.name.startswith("."))
+
+
+def _point_to(root: Path, name: str) -> None:
+    atomic_write_text(root / CURRENT_FILE, name + "\n")
+    tmp = root / f".{CURRENT_LINK}.{os.getpid()}"
+    try:
+        if tmp.is_symlink():
+            tmp.unlink()
+        os.symlink(name, tmp, target_is_directory=True)
+        os.replace(tmp, root / CURRENT_LINK)
+    except OSError:
+        # No symlink support (e.g. Windows without developer mode): CURRENT alone is authoritative
+        link = root / CURRENT_LINK
+        if link.is_symlink():
+            link.unlink()
+    _fsync_dir(root)
+
+
+def _tables_fresh(path: Path = TABLES_FILE) -> bool:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("fingerprint") == source_fingerprint().hex()
+    except (OSError, ValueError):
+        return False
+
+
+def publish(root: Path = SNAPSHOT_DIR, keep: int = DEFAULT_KEEP) -> Path:
+    """Snapshot data/ (sources + compiled files) and make it current. Returns the snapshot path.
+
+    heroes.db and interaction_tables.json are recompiled first if stale.
+    """
+    with open_db():
+        pass
+    if not _tables_fresh():
+        write_tables()
+    root.mkdir(parents=True, exist_ok=True)
+    name = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + source_fingerprint().hex()[:8]
+    final = root / name
+    if final.exists():
+        return final
+
+    staging = root / f".staging-{name}-{os.getpid()}"
+    if staging.exists():
+        shutil.rmtree(staging)
+    (staging / HERO_DIR.name).mkdir(parents=True)
+    try:
+        for src in sorted(HERO_DIR.glob("*.json")):
+            _copy_synced(src, staging / HERO_DIR.name / src.name)
+        for src in (ROLES_FILE, SYNERGIES_FILE, DB_FILE, TABLES_FILE):
+            if src.exists():
+                _copy_synced(src, staging / src.name)
+        _fsync_dir(staging / HERO_DIR.name)
+        _fsync_dir(staging)
+        os.replace(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _point_to(root, name)
+    prune(root, keep)
+    return final
+
+
+def prune(root: Path = SNAPSHOT_DIR, keep: int = DEFAULT_KEEP) -> list[Path]:
+    """Delete all but the newest `keep` snapshots; the current one is always kept."""
+    current = current_name(root)
+    old = [p for p in list_snapshots(root)[:-keep or None] if p.name != current] if keep > 0 else []
+    for p in old:
+        shutil.rmtree(p, ignore_errors=True)
+    return old
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    name: str
+    path: Path
+    heroes: dict[str, dict]
+    roles: dict
+    synergies: dict
+
+    @classmethod
+    def load(cls, path: Path) -> "Snapshot":
+        hero_files = sorted((path / HERO_DIR.name).glob("*.json"))
+        db_path = path / DB_FILE.name
+        if db_path.exists():
+            # copy2 keeps names, sizes and mtimes, so a db compiled from these files has their fingerprint
+            fingerprint = source_fingerprint(hero_files + [path / ROLES_FILE.name, path / SYNERGIES_FILE.name])
+            with HeroDB(db_path) as db:
+                if db.fingerprint == fingerprint:
+                    return cls(path.name, path, db.heroes(), db.role_rules(), db.synergy_rules())
+        # No compiled db, or one that does not match the sources next to it
+        heroes = {}
+        for f in hero_files:
+            h = json.loads(f.read_text(encoding="utf-8"))
+            heroes[h["name"]] = h
+        return cls(path.name, path, heroes,
+                   json.loads((path / ROLES_FILE.name).read_text(encoding="utf-8")),
+                   json.loads((path / SYNERGIES_FILE.name).read_text(encoding="utf-8")))
+
+
+class SnapshotReader:
+    """Current snapshot for readers; `poll()` / `watch()` switch only on a completed publish."""
+
+    def __init__(self, root: Path = SNAPSHOT_DIR):
+        self.root = Path(root)
+        self.reloads = 0
+        self._snapshot: Snapshot | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.poll()
+
+    def get(self) -> Snapshot | None:
+        """Last loaded snapshot; a plain attribute read, never waits for a reload."""
+        return self._snapshot
+
+    def poll(self) -> bool:
+        """Load the current snapshot if the pointer moved. Returns True on a switch."""
+        with self._lock:
+            path = current_snapshot(self.root)
+            if path is None or (self._snapshot is not None and self._snapshot.name == path.name):
+                return False
+            self._snapshot = Snapshot.load(path)
+            self.reloads += 1
+            return True
+
+    def watch(self, interval: float = 1.0, on_change: Callable[[Snapshot], None] | None = None) -> threading.Thread:
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    changed = self.poll()
+                except (OSError, ValueError) as e:
+                    # Pruned under us or not readable yet: keep the old snapshot, retry next tick
+                    print(f"snapshot reload failed: {e}", file=sys.stderr)
+                    continue
+                if changed and on_change is not None:
+                    on_change(self._snapshot)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--publish", action="store_true", help="snapshot the current data/ and make it current")
+    ap.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="snapshots to keep when publishing")
+    ap.add_argument("--root", default=str(SNAPSHOT_DIR))
+    args = ap.parse_args()
+
+    root = Path(args.root)
+    if args.publish:
+        path = publish(root, args.keep)
+        print(f"Published: {path}")
+        return 0
+
+    current = current_name(root)
+    print(f"current\t{current or '-'}")
+    for p in list_snapshots(root):
+        print(f"{'*' if p.name == current else ' '} {p.name}")
+    return 0 if current else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Persistent on-disk cache of Stratz GraphQL responses.
+
+Entries are content-addressed by (endpoint, normalised query text, variables)
+and stored zlib-compressed in a single SQLite file. Each entry gets a TTL
+picked from the query (hero constants live for days, weekly win rates for
+hours) and the store is kept under a byte budget by evicting least recently
+used entries.
+
+Every successful response is committed immediately, so a refresh that dies
+halfway resumes from whatever it had already downloaded.
+
+Run:
+  python scripts/stratz_cache.py            # stats
+  python scripts/stratz_cache.py --purge    # drop expired entries
+  python scripts/stratz_cache.py --clear
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CACHE_FILE = ROOT / "data" / ".cache" / "stratz_responses.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+HOUR = 3600
+# First matching pattern wins.
+DEFAULT_TTLS: list[tuple[str, int]] = [
+    (r"\bconstants\b", 7 * 24 * HOUR),
+    (r"\bwinWeek\b", 6 * HOUR),
+    (r"\bmatchUp\b", 12 * HOUR),
+]
+FALLBACK_TTL = 1 * HOUR
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _WS.sub(" ", query).strip()
+
+
+def cache_key(endpoint: str, query: str, variables: dict | None) -> str:
+    raw = json.dumps([endpoint, normalize_query(query), variables or {}], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: Path = CACHE_FILE, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: list[tuple[str, int]] | None = None, clock=time.time):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(p), ttl) for p, ttl in (ttls if ttls is not None else DEFAULT_TTLS)]
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, query TEXT NOT NULL, body BLOB NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, expires REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access)")
+        self._db.commit()
+
+    def ttl_for(self, query: str) -> int:
+        for pattern, ttl in self.ttls:
+            if pattern.search(query):
+                return ttl
+        return FALLBACK_TTL
+
+    def get(self, endpoint: str, query: str, variables: dict | None = None):
+        key = cache_key(endpoint, query, variables)
+        now = self._clock()
+        row = self._db.execute("SELECT body, expires FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= now:
+            self.misses += 1
+            return None
+        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, endpoint: str, query: str, variables: dict | None, data) -> None:
+        key = cache_key(endpoint, query, variables)
+        now = self._clock()
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, query, body, size, created, expires, last_access)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, normalize_query(query)[:200], body, len(body), now, now + self.ttl_for(query), now),
+        )
+        self._db.commit()
+        self.evict()
+
+    def total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the store fits in `max_bytes`."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        self._db.commit()
+        return removed
+
+    def purge_expired(self) -> int:
+        cur = self._db.execute("DELETE FROM responses WHERE expires <= ?", (self._clock(),))
+        self._db.commit()
+        return cur.rowcount
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM responses")
+        self._db.commit()
+
+    def stats(self) -> dict:
+        now = self._clock()
+        count, size, live = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(expires > ?), 0) FROM responses", (now,)
+        ).fetchone()
+        return {"entries": count, "live": live, "bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--path", default=str(CACHE_FILE))
+    ap.add_argument("--purge", action="store_true", help="delete expired entries")
+    ap.add_argument("--clear", action="store_true", help="delete all entries")
+    args = ap.parse_args()
+
+    cache = ResponseCache(Path(args.path))
+    if args.clear:
+        cache.clear()
+    elif args.purge:
+        print(f"purged\t{cache.purge_expired()}")
+    for k, v in cache.stats().items():
+        print(f"{k}\t{v}")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
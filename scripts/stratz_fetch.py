@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""Asyncio fetch engine for the Stratz GraphQL API.
+
+All requests share one token bucket, so a 429 with `Retry-After` pauses every
+request at once instead of each worker sleeping on its own schedule. The number
+of in-flight requests is tuned AIMD-style: halved on a 429, grown by one after
+a full window of successful responses.
+
+The HTTP call itself is a blocking `post(url, json=..., headers=...)`
+(cloudscraper in production) run in a worker thread.
+
+Used by `stratz_hero_requests.py`; see `stratz_stub_server.py` for a local
+server that injects 429/5xx responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable
+
+# Stratz API quota: 20 req/s burst, 250 req/min sustained.
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 20
+MAX_BACKOFF = 30.0
+STREAM_CHUNK = 64 * 1024
+
+
+class QueryTooComplex(Exception):
+    """The server rejected a query for exceeding its complexity budget."""
+
+
+def is_complexity_error(errors: list[dict]) -> bool:
+    return any("complex" in str(e.get("message", "")).lower() for e in errors)
+
+
+class TokenBucket:
+    """Token bucket shared by every request, with a global Retry-After pause."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Block all acquirers for `seconds` and drop the burst allowance."""
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # After the pause tokens accrue from zero, so waiters resume at `rate`, not all at once.
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    async def acquire(self) -> float:
+        """Wait for one token. Returns the number of seconds spent waiting."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = self._clock()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return waited
+                    delay = (1.0 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class AdaptiveConcurrency:
+    """In-flight request limit: multiplicative decrease on 429, additive increase otherwise."""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int | None = None,
+                 cooldown: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.limit = min(self.maximum, max(self.minimum, initial))
+        self.cooldown = cooldown
+        self._clock = clock
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self._cond = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def __aenter__(self) -> "AdaptiveConcurrency":
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+
+    def on_throttle(self) -> None:
+        # One burst of 429s answers one question: only halve once per cooldown window.
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self.limit = max(self.minimum, self.limit // 2)
+
+
+@dataclass
+class FetchStats:
+    requests: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    exceptions: int = 0
+    failed: int = 0
+    cache_hits: int = 0
+    throttle_wait: float = 0.0
+    retries: int = 0
+    bytes: int = 0
+    latencies: list[float] = field(default_factory=list)  # seconds per HTTP round trip
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class StratzFetcher:
+    """Rate-limited GraphQL client.
+
+    `request()` returns `data` or None, like the old `make_request`, and raises
+    QueryTooComplex so callers can retry with a smaller query. With a
+    `stratz_cache.ResponseCache` attached, fresh cached responses are served
+    without touching the network and every success is stored. With a
+    `pipeline_events.EventSink` every round trip, retry and 429 wait is
+    reported as an event.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        token: str,
+        post: Callable[..., Any],
+        *,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        workers: int = 5,
+        max_wait: float = 60.0,
+        cache=None,
+        events=None,
+    ):
+        self.api_url = api_url
+        self.token = token
+        self.max_wait = max_wait
+        self._post = post
+        self.cache = cache
+        self.events = events
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrency(initial=workers, maximum=workers * 2)
+        self.stats = FetchStats()
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Content-Type": "application/json",
+        }
+
+    def _emit(self, event: str, **fields) -> None:
+        if self.events is not None:
+            self.events.emit(event, **fields)
+
+    def _send(self, payload: dict, sink_factory):
+        """Blocking POST (worker thread). With a sink, a 200 body is streamed into it.
+        Returns (response, sink, body bytes)."""
+        if sink_factory is None:
+            resp = self._post(self.api_url, json=payload, headers=self._headers())
+            return resp, None, len(getattr(resp, "content", b"") or b"")
+        resp = self._post(self.api_url, json=payload, headers=self._headers(), stream=True)
+        if resp.status_code != 200:
+            return resp, None, 0
+        sink = sink_factory()
+        received = 0
+        for chunk in resp.iter_content(STREAM_CHUNK):
+            received += len(chunk)
+            sink.feed(chunk)
+        sink.close()
+        return resp, sink, received
+
+    async def request(self, query: str, variables: dict | None = None, context: str = "",
+                      use_cache: bool = True, sink=None):
+        """POST one query. `sink` is a factory for a streaming consumer with
+        `feed(bytes)`, `close()`, `.results` and `.errors`; its `.results` is returned
+        instead of `data` and the response is never cached here."""
+        if sink is not None:
+            use_cache = False
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(self.api_url, query, variables)
+            if cached is not None:
+                self.stats.cache_hits += 1
+                self._emit("request", context=context, cached=True)
+                return cached
+
+        payload = {"query": query, "variables": variables}
+        deadline = time.monotonic() + self.max_wait
+        backoff = 1.0
+        attempt = 0
+
+        while time.monotonic() < deadline:
+            resp = streamed = None
+            attempt += 1
+            if attempt > 1:
+                self.stats.retries += 1
+            async with self.concurrency:
+                await self.bucket.acquire()
+                self.stats.requests += 1
+                t0 = time.perf_counter()
+                try:
+                    resp, streamed, received = await asyncio.to_thread(self._send, payload, sink)
+                except Exception as e:
+                    self.stats.exceptions += 1
+                    print(f"\n❌ Exception [{context}]: {e}")
+                    error = str(e)
+                latency = time.perf_counter() - t0
+
+            if resp is None:
+                delay = min(2.0, max(0.0, deadline - time.monotonic()))
+                self._emit("retry", context=context, attempt=attempt, reason=error, delay_s=round(delay, 3))
+                await asyncio.sleep(delay)
+                continue
+
+            status = resp.status_code
+            self.stats.latencies.append(latency)
+            self.stats.bytes += received
+            self._emit("request", context=context, status=status, latency_ms=round(latency * 1000, 1),
+                       bytes=received, attempt=attempt)
+            if status == 200:
+                self.concurrency.on_success()
+                if streamed is not None:
+                    if streamed.errors:
+                        if is_complexity_error([{"message": m} for m in streamed.errors]):
+                            raise QueryTooComplex(streamed.errors[0])
+                        print(f"\n❌ API Error [{context}]: {streamed.errors[0]}")
+                        self.stats.failed += 1
+                        return None
+                    return streamed.results
+                data = resp.json()
+                if "errors" in data:
+                    if is_complexity_error(data["errors"]):
+                        raise QueryTooComplex(data["errors"][0]["message"])
+                    print(f"\n❌ API Error [{context}]: {data['errors'][0]['message']}")
+                    self.stats.failed += 1
+                    return None
+                if self.cache is not None and use_cache:
+                    self.cache.put(self.api_url, query, variables, data["data"])
+                return data["data"]
+
+            if status == 429:
+                # Retry-After applies to the whole client, not just this request.
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"), backoff)
+                self.stats.throttled += 1
+                self.stats.throttle_wait += retry_after
+                self.bucket.pause(retry_after)
+                self._emit("throttle", context=context, attempt=attempt, wait_s=round(retry_after, 3))
+                self.concurrency.on_throttle()
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+
+            if status >= 500:
+                self.stats.server_errors += 1
+                delay = backoff + random.uniform(0, backoff)
+                self._emit("retry", context=context, attempt=attempt, reason=status, delay_s=round(delay, 3))
+                print(f"\n⚠️ Ошибка сервера {status} [{context}]. Ждем {delay:.1f} сек...", end="\r")
+                await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+
+            if status == 400:
+                # GraphQL servers may answer an over-budget query with 400 + errors
+                try:
+                    errors = resp.json().get("errors") or []
+                except ValueError:
+                    errors = []
+                if is_complexity_error(errors):
+                    raise QueryTooComplex(errors[0]["message"])
+
+            print(f"\n❌ HTTP Ошибка {status} [{context}]")
+            self.stats.failed += 1
+            return None
+
+        print(f"\n⛔ ПРЕВЫШЕН ЛИМИТ ОЖИДАНИЯ ({self.max_wait:g} сек) [{context}]. Пропускаем запрос.")
+        self.stats.failed += 1
+        return None
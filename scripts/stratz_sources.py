@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Data-source adapters for the Stratz fetch stage.
+
+`StratzFetcher` talks to the API through a blocking
+`post(url, json=..., headers=..., stream=False)` callable. The adapters here
+are such callables:
+
+- `StratzSource`     the live GraphQL API through cloudscraper
+- `RecordingSource`  wraps another source and captures every request and
+                     response into a gzip-compressed JSON-lines archive
+- `ReplaySource`     answers from an archive, keyed by the normalised query
+                     and variables, with an optional latency/jitter model
+
+Archives never contain the Authorization header. A request that was answered
+several times (e.g. 429 then 200) replays its responses in recorded order;
+by default only successful responses are replayed, so a replay runs at full
+speed and gives the same data every time.
+
+The matchUp batches depend on --batch-size and on how often the server
+answered QueryTooComplex, so a replay may ask for batches that were never
+recorded. Such a batched document is assembled from the per-alias results of
+the recorded batches (`heroStats { h1: matchUp(heroId: 1, ...) ... }`);
+only if one of its aliases was never recorded is the request a miss, and
+`stratz_hero_requests.py` stops on any miss instead of writing a partial
+result.
+
+Run:
+  python scripts/stratz_hero_requests.py --record data/recordings/refresh.jsonl.gz
+  python scripts/stratz_hero_requests.py --replay data/recordings/refresh.jsonl.gz \
+      --output /tmp/stratz.json --skip-update
+  python scripts/stratz_sources.py data/recordings/refresh.jsonl.gz   # archive summary
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+from stratz_cache import cache_key
+
+ROOT = Path(__file__).resolve().parent.parent
+RECORDINGS_DIR = ROOT / "data" / "recordings"
+API_URL = "https://api.stratz.com/graphql"
+TOKEN_ENV = "STRATZ_TOKEN"
+ARCHIVE_FORMAT = "stratz-recording"
+ARCHIVE_VERSION = 1
+# Replayed bodies are streamed in chunks of this size, like a real response
+REPLAY_CHUNK = 64 * 1024
+# Only these response headers are kept in an archive
+KEPT_HEADERS = ("Retry-After", "Content-Type")
+# Responses recorded under this key prefix are independent of the API URL
+KEY_ENDPOINT = "stratz"
+# `alias: field(args)` selections of a batched heroStats document
+HERO_STATS_ALIAS = re.compile(r"(\w+)\s*:\s*(matchUp|winWeek)\(([^)]*)\)")
+
+
+def resolve_token(token: str | None) -> str | None:
+    """Token from the command line, else $STRATZ_TOKEN."""
+    return token or os.environ.get(TOKEN_ENV) or None
+
+
+def request_key(payload: dict) -> str:
+    return cache_key(KEY_ENDPOINT, payload.get("query") or "", payload.get("variables"))
+
+
+class Response:
+    """The subset of a requests.Response the fetcher uses."""
+
+    def __init__(self, status_code: int, content: bytes, headers: dict | None = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = dict(headers or {})
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = REPLAY_CHUNK):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+# --- Live -----------------------------------------------------------------
+
+class StratzSource:
+    """Live API. `post` defaults to a cloudscraper session."""
+
+    name = "stratz"
+
+    def __init__(self, post=None):
+        if post is None:
+            import cloudscraper
+            post = cloudscraper.create_scraper().post
+        self._post = post
+
+    def __call__(self, url, json=None, headers=None, stream=False):
+        return self._post(url, json=json, headers=headers, stream=stream)
+
+    def close(self) -> None:
+        pass
+
+
+# --- Record ---------------------------------------------------------------
+
+class RecordingSource:
+    """Pass requests through to `inner` and keep (request, response, elapsed) for save()."""
+
+    name = "record"
+
+    def __init__(self, inner, path: Path | str, api_url: str = API_URL):
+        self.inner = inner
+        self.path = Path(path)
+        self.api_url = api_url
+        self.entries: list[dict] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url, json=None, headers=None, stream=False):
+        t0 = time.perf_counter()
+        resp = self.inner(url, json=json, headers=headers, stream=stream)
+        # The body is read in full so it can be stored; the caller still gets a streamable response
+        content = b"".join(resp.iter_content(REPLAY_CHUNK)) if stream else resp.content
+        elapsed = time.perf_counter() - t0
+        kept = {k: resp.headers[k] for k in KEPT_HEADERS if k in resp.headers}
+        with self._lock:
+            self.entries.append({
+                "key": request_key(json or {}),
+                "query": (json or {}).get("query"),
+                "variables": (json or {}).get("variables"),
+                "status": resp.status_code,
+                "headers": kept,
+                "elapsed": round(elapsed, 4),
+                "body": base64.b64encode(content).decode("ascii"),
+            })
+        return Response(resp.status_code, content, kept)
+
+    def save(self) -> Path:
+        header = {"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION, "api_url": self.api_url,
+                  "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  "requests": len(self.entries)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for row in [header] + self.entries:
+                f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+        return self.path
+
+    def close(self) -> None:
+        self.save()
+
+
+# --- Replay ---------------------------------------------------------------
+
+def alias_selections(query: str) -> list[tuple[str, tuple[str, str]]]:
+    """[(alias, (field, args))] of a batched heroStats query; args without whitespace."""
+    return [(alias, (field, re.sub(r"\s+", "", args))) for alias, field, args in HERO_STATS_ALIAS.findall(query or "")]
+
+
+def read_archive(path: Path | str) -> tuple[dict, list[dict]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    if not rows or rows[0].get("format") != ARCHIVE_FORMAT:
+        raise ValueError(f"{path}: not a Stratz recording")
+    if rows[0].get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"{path}: unsupported recording version {rows[0].get('version')}")
+    return rows[0], rows[1:]
+
+
+class LatencyModel:
+    """delay = fixed + scale * recorded elapsed + uniform(-jitter, jitter), never below 0."""
+
+    def __init__(self, fixed: float = 0.0, jitter: float = 0.0, scale: float = 0.0, seed: int = 0):
+        self.fixed = fixed
+        self.jitter = jitter
+        self.scale = scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, recorded: float) -> float:
+        with self._lock:
+            noise = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.fixed + self.scale * recorded + noise)
+
+
+class ReplaySource:
+    """Serve recorded responses. A batched heroStats query that was not recorded as
+    such is assembled from recorded aliases; anything else unknown gets a 404 and is
+    counted in `misses`."""
+
+    name = "replay"
+
+    def __init__(self, path: Path | str, latency: LatencyModel | None = None, errors: bool = False):
+        self.path = Path(path)
+        self.header, entries = read_archive(self.path)
+        self.latency = latency or LatencyModel()
+        self._responses: dict[str, deque] = defaultdict(deque)
+        self._last: dict[str, dict] = {}
+        for e in entries:
+            if errors or e["status"] == 200:
+                self._responses[e["key"]].append(e)
+        self._entries = entries
+        self._selections: dict[tuple[str, str], tuple[object, float]] | None = None
+        self._lock = threading.Lock()
+        self.served = 0
+        self.assembled = 0
+        self.misses = 0
+
+    def _index_selections(self) -> dict[tuple[str, str], tuple[object, float]]:
+        """(field, args) -> (result, share of the recorded elapsed) from every successful batch.
+        Built on the first request that needs it; the caller holds the lock."""
+        if self._selections is None:
+            self._selections = {}
+            for e in self._entries:
+                selections = alias_selections(e.get("query"))
+                if e["status"] != 200 or not selections:
+                    continue
+                try:
+                    body = json.loads(base64.b64decode(e["body"]))
+                except ValueError:
+                    continue
+                stats = (body.get("data") or {}).get("heroStats") if not body.get("errors") else None
+                if not isinstance(stats, dict):
+                    continue
+                share = e.get("elapsed", 0.0) / len(selections)
+                for alias, selection in selections:
+                    if alias in stats:
+                        self._selections[selection] = (stats[alias], share)
+        return self._selections
+
+    def _assemble(self, query: str) -> dict | None:
+        """Entry for a batch that was never recorded, built from recorded aliases."""
+        selections = alias_selections(query)
+        if not selections:
+            return None
+        with self._lock:
+            recorded = self._index_selections()
+            parts = [(alias, recorded.get(selection)) for alias, selection in selections]
+            if any(part is None for _, part in parts):
+                return None
+            self.assembled += 1
+        body = {"data": {"heroStats": {alias: result for alias, (result, _) in parts}}}
+        return {"status": 200, "headers": {"Content-Type": "application/json"},
+                "elapsed": sum(share for _, (_, share) in parts),
+                "body": base64.b64encode(json.dumps(body, separators=(",", ":")).encode("utf-8")).decode("ascii")}
+
+    def _next(self, key: str, query: str = "") -> dict | None:
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                # A replay may ask again (e.g. a retry after a timeout); repeat the last answer
+                entry = self._last.get(key)
+            if entry is not None:
+                self.served += 1
+                return entry
+        entry = self._assemble(query)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.served += 1
+        return entry
+
+    def __call__(self, url, json=None, headers=None, stream=False):
+        payload = json or {}
+        entry = self._next(request_key(payload), payload.get("query") or "")
+        if entry is None:
+            return Response(404, b'{"errors":[{"message":"request not in recording"}]}')
+        wait = self.latency.delay(entry.get("elapsed", 0.0))
+        if wait:
+            time.sleep(wait)
+        return Response(entry["status"], base64.b64decode(entry["body"]), entry.get("headers"))
+
+    def close(self) -> None:
+        pass
+
+
+def open_source(token: str | None, record: str = "", replay: str = "", latency: LatencyModel | None = None,
+                replay_errors: bool = False, api_url: str = API_URL):
+    """Source for the fetch stage: replay, live, or live wrapped in a recorder."""
+    if replay:
+        return ReplaySource(replay, latency, replay_errors)
+    if not token:
+        raise SystemExit(f"Stratz token required: pass it as the first argument or set ${TOKEN_ENV}")
+    source = StratzSource()
+    return RecordingSource(source, record, api_url) if record else source
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("archive", help="recording written with stratz_hero_requests.py --record")
+    args = ap.parse_args()
+
+    header, entries = read_archive(args.archive)
+    statuses = Counter(e["status"] for e in entries)
+    body = sum(len(e["body"]) * 3 // 4 for e in entries)
+    print(f"created\t{header.get('created')}\napi_url\t{header.get('api_url')}")
+    print(f"requests\t{len(entries)}\nunique\t{len({e['key'] for e in entries})}")
+    print(f"statuses\t{', '.join(f'{s}: {n}' for s, n in sorted(statuses.items()))}")
+    print(f"body_mb\t{body / 1e6:.1f}\narchive_mb\t{os.path.getsize(args.archive) / 1e6:.1f}")
+    print(f"recorded_s\t{sum(e.get('elapsed', 0.0) for e in entries):.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
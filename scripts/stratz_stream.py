@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Streaming parse of Stratz matchUp responses.
+
+The response body is fed chunk by chunk through an incremental JSON parser
+and `vs`/`with` rows are folded into per-hero aggregates as they arrive, so the
+full response tree is never built. Uses `ijson` (C backend when available) and
+falls back to a small pure-Python event parser with the same
+(prefix, event, value) interface.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+
+try:
+    import ijson
+except ImportError:  # optional dependency
+    ijson = None
+
+_TOKEN = re.compile(
+    r'[ \t\n\r]*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)|(true|false|null))'
+)
+_NUMBER_TAIL = set("0123456789.eE+-")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+class PyEventParser:
+    """Incremental JSON parser yielding ijson-style (prefix, event, value) tuples."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[list] = []  # [kind, prefix, current key]
+        self._expect_key = False
+
+    def feed(self, data: bytes) -> list[tuple]:
+        self._buf = self._buf[self._pos:] + self._decoder.decode(data)
+        self._pos = 0
+        return self._scan(final=False)
+
+    def close(self) -> list[tuple]:
+        self._buf = self._buf[self._pos:] + self._decoder.decode(b"", final=True)
+        self._pos = 0
+        events = self._scan(final=True)
+        if self._buf[self._pos:].strip() or self._stack:
+            raise ValueError("Incomplete JSON document")
+        return events
+
+    def _value_prefix(self) -> str:
+        if not self._stack:
+            return ""
+        kind, prefix, key = self._stack[-1]
+        part = key if kind == "map" else "item"
+        return f"{prefix}.{part}" if prefix else part
+
+    def _scan(self, final: bool) -> list[tuple]:
+        out: list[tuple] = []
+        buf, pos, n = self._buf, self._pos, len(self._buf)
+        stack = self._stack
+        while pos < n:
+            m = _TOKEN.match(buf, pos)
+            if m is None:
+                if buf[pos:].strip() and final:
+                    raise ValueError(f"Invalid JSON at offset {pos}")
+                break
+            punct, string, number, literal = m.groups()
+            if number is not None and not final and (m.end() == n or buf[m.end()] in _NUMBER_TAIL):
+                break  # the number may continue in the next chunk
+            if literal is not None and not final and m.end() == n:
+                break
+            pos = m.end()
+
+            if punct is not None:
+                if punct == "{":
+                    prefix = self._value_prefix()
+                    out.append((prefix, "start_map", None))
+                    stack.append(["map", prefix, None])
+                    self._expect_key = True
+                elif punct == "[":
+                    prefix = self._value_prefix()
+                    out.append((prefix, "start_array", None))
+                    stack.append(["array", prefix, None])
+                elif punct == "}":
+                    out.append((stack.pop()[1], "end_map", None))
+                    self._expect_key = False
+                elif punct == "]":
+                    out.append((stack.pop()[1], "end_array", None))
+                elif punct == ",":
+                    self._expect_key = bool(stack) and stack[-1][0] == "map"
+                continue
+
+            if string is not None:
+                value = string[1:-1] if "\\" not in string else json.loads(string)
+                if self._expect_key:
+                    top = stack[-1]
+                    out.append((top[1], "map_key", value))
+                    top[2] = value
+                    self._expect_key = False
+                else:
+                    out.append((self._value_prefix(), "string", value))
+            elif number is not None:
+                value = float(number) if any(c in number for c in ".eE") else int(number)
+                out.append((self._value_prefix(), "number", value))
+            else:
+                value = _LITERALS[literal]
+                out.append((self._value_prefix(), "null" if value is None else "boolean", value))
+
+        self._pos = pos
+        return out
+
+
+class IjsonEventParser:
+    """Same interface as PyEventParser on top of ijson's push API."""
+
+    def __init__(self):
+        self._events = ijson.sendable_list()
+        self._coro = ijson.parse_coro(self._events, use_float=True)
+
+    def _drain(self) -> list[tuple]:
+        out = list(self._events)
+        del self._events[:]
+        return out
+
+    def feed(self, data: bytes) -> list[tuple]:
+        self._coro.send(data)
+        return self._drain()
+
+    def close(self) -> list[tuple]:
+        self._coro.close()
+        return self._drain()
+
+
+def make_event_parser(prefer_ijson: bool = True):
+    if prefer_ijson and ijson is not None:
+        return IjsonEventParser()
+    return PyEventParser()
+
+
+def backend_name() -> str:
+    return f"ijson/{ijson.backend}" if ijson is not None else "python"
+
+
+class MatchupStreamSink:
+    """Folds a streamed batched matchUp response into {hid: (vs_agg, with_agg)}.
+
+    Heroes whose alias is null or missing in the response are absent from the result.
+    Aliases follow `build_matchup_batch`: `data.heroStats.h<ID>.item.(vs|with).item`.
+    The aggregates match `aggregate_matchups` in stratz_hero_requests.py.
+    """
+
+    _ALIAS = re.compile(r"h(\d+)$")
+
+    def __init__(self, parser=None):
+        self._parser = parser if parser is not None else make_event_parser()
+        self.results: dict[int, tuple[dict, dict]] = {}
+        self.errors: list[str] = []
+        self.bytes = 0
+        self._row: dict = {}
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes += len(chunk)
+        self._consume(self._parser.feed(chunk))
+
+    def close(self) -> dict[int, tuple[dict, dict]]:
+        self._consume(self._parser.close())
+        return self.results
+
+    def _consume(self, events: list[tuple]) -> None:
+        for prefix, event, value in events:
+            if not prefix.startswith("data.heroStats."):
+                if prefix == "errors.item.message":
+                    self.errors.append(value)
+                continue
+            parts = prefix.split(".")
+            # data . heroStats . hID [. item . vs|with . item [. field]]
+            if len(parts) == 3:
+                if event == "start_array":
+                    m = self._ALIAS.match(parts[2])
+                    if m:
+                        self.results.setdefault(int(m.group(1)), ({}, {}))
+                continue
+            if len(parts) < 6 or parts[5] != "item":
+                continue
+            if len(parts) == 7:
+                self._row[parts[6]] = value
+            elif event == "start_map":
+                self._row = {}
+            elif event == "end_map":
+                m = self._ALIAS.match(parts[2])
+                if m:
+                    self._commit(int(m.group(1)), parts[4], self._row)
+
+    def _commit(self, hid: int, relation: str, row: dict) -> None:
+        vs_agg, with_agg = self.results.setdefault(hid, ({}, {}))
+        other = row.get("heroId2")
+        if not other or other == hid:
+            return
+        if relation == "vs":
+            agg = vs_agg.get(other)
+            if agg is None:
+                agg = vs_agg[other] = {"w": 0, "m": 0}
+            agg["w"] += row.get("winCount") or 0
+            agg["m"] += row.get("matchCount") or 0
+        elif relation == "with":
+            agg = with_agg.get(other)
+            if agg is None:
+                agg = with_agg[other] = {"syn": 0, "cnt": 0, "m": 0}
+            if row.get("synergy") is not None:
+                agg["syn"] += row["synergy"]
+                agg["cnt"] += 1
+                agg["m"] += row.get("matchCount") or 0
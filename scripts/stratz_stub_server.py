@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Local stub of the Stratz GraphQL endpoint for exercising the fetch engine offline.
+
+Answers the queries used by `stratz_hero_requests.py` with deterministic
+synthetic data and can inject failures:
+- a server-side rate limit that answers 429 with `Retry-After`
+- random 429 / 5xx responses with the given probabilities
+- a complexity limit on the number of aliased fields per document
+
+Responses can be replayed from a recording (`--recording`), e.g. one written
+with `--save-recording`, so benchmarks run against fixed payloads.
+scripts/tests/test_stratz_fetch.py runs the fetch stage against it in-process.
+
+Run:
+  python scripts/stratz_stub_server.py --port 8765 --rate 10 --p429 0.05 --p5xx 0.05
+  python scripts/stratz_hero_requests.py --api-url http://127.0.0.1:8765/graphql \
+      --output /tmp/stratz.json --skip-update
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROLES = ["CARRY", "SUPPORT", "NUKER", "DISABLER", "DURABLE", "ESCAPE", "INITIATOR", "PUSHER"]
+ATTRS = ["str", "agi", "int", "all"]
+
+MATCHUP_ALIAS = re.compile(r"(\w+)\s*:\s*matchUp\(\s*heroId:\s*(\d+)")
+WINWEEK_ALIAS = re.compile(r"(\w+)\s*:\s*winWeek\(\s*positionIds:\s*\[\s*(\w+)\s*\]")
+COMPLEXITY_ERROR = "The maximum allowed query complexity was exceeded."
+
+
+class StubState:
+    """Shared counters and failure model for one stub server."""
+
+    def __init__(self, heroes: int = 127, rate: float = 0.0, p429: float = 0.0, p5xx: float = 0.0,
+                 retry_after: float = 1.0, latency: float = 0.0, seed: int = 0,
+                 max_aliases: int = 0, recording: dict | None = None):
+        self.recording = recording
+        if recording:
+            self.hero_ids = [h["id"] for h in recording["heroes"]["constants"]["heroes"]]
+        else:
+            self.hero_ids = list(range(1, heroes + 1))
+        self.max_aliases = max_aliases
+        self.rate = rate
+        self.p429 = p429
+        self.p5xx = p5xx
+        self.retry_after = retry_after
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.counts = {"requests": 0, "ok": 0, "429": 0, "5xx": 0, "too_complex": 0, "bytes": 0}
+
+    def admit(self) -> int:
+        """Return the status code to answer with (200, 429 or 503)."""
+        with self.lock:
+            self.counts["requests"] += 1
+            if self.rate > 0:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens < 1:
+                    self.counts["429"] += 1
+                    return 429
+                self.tokens -= 1
+            roll = self.rng.random()
+            if roll < self.p429:
+                self.counts["429"] += 1
+                return 429
+            if roll < self.p429 + self.p5xx:
+                self.counts["5xx"] += 1
+                return 503
+            self.counts["ok"] += 1
+            return 200
+
+    # --- synthetic data ---
+
+    def heroes(self) -> dict:
+        if self.recording:
+            return self.recording["heroes"]
+        out = []
+        for hid in self.hero_ids:
+            rng = random.Random(self.seed * 1_000_003 + hid)
+            out.append({
+                "id": hid,
+                "displayName": f"Hero {hid}",
+                "stats": {"primaryAttribute": rng.choice(ATTRS)},
+                "roles": [{"roleId": r} for r in rng.sample(ROLES, 3)],
+            })
+        return {"constants": {"heroes": out}}
+
+    def win_week(self, pos: str) -> list[dict]:
+        if self.recording:
+            return self.recording["win_week"].get(pos, [])
+        out = []
+        for hid in self.hero_ids:
+            rng = random.Random(f"{self.seed}:{pos}:{hid}")
+            m = rng.randint(100, 50_000)
+            out.append({"heroId": hid, "matchCount": m, "winCount": int(m * rng.uniform(0.44, 0.56))})
+        return out
+
+    def match_up(self, hid: int) -> list[dict]:
+        if self.recording:
+            return self.recording["match_up"].get(str(hid), [])
+        rng = random.Random(self.seed * 7_919 + hid)
+        vs, with_ = [], []
+        for other in self.hero_ids:
+            if other == hid:
+                continue
+            m = rng.randint(10, 4_000)
+            vs.append({"heroId2": other, "matchCount": m, "winCount": int(m * rng.uniform(0.4, 0.6))})
+            m = rng.randint(10, 4_000)
+            with_.append({"heroId2": other, "matchCount": m, "winCount": int(m * rng.uniform(0.4, 0.6)),
+                          "synergy": round(rng.uniform(-6, 6), 3)})
+        return [{"heroId": hid, "vs": vs, "with": with_}]
+
+    def record(self) -> dict:
+        """Snapshot every response the stub can give, for `--recording`."""
+        return {
+            "heroes": self.heroes(),
+            "win_week": {f"POSITION_{n}": self.win_week(f"POSITION_{n}") for n in range(1, 6)},
+            "match_up": {str(hid): self.match_up(hid) for hid in self.hero_ids},
+        }
+
+    def answer(self, query: str, variables: dict) -> dict:
+        if "constants" in query:
+            return {"data": self.heroes()}
+        matchups = MATCHUP_ALIAS.findall(query)
+        win_weeks = WINWEEK_ALIAS.findall(query)
+        if not matchups and not win_weeks:
+            return {"errors": [{"message": "Unknown query"}]}
+        if self.max_aliases and len(matchups) + len(win_weeks) > self.max_aliases:
+            with self.lock:
+                self.counts["too_complex"] += 1
+            return {"errors": [{"message": COMPLEXITY_ERROR}]}
+        stats = {}
+        for alias, hid in matchups:
+            stats[alias] = self.match_up(int(hid))
+        for alias, pos in win_weeks:
+            stats[alias] = self.win_week(pos)
+        return {"data": {"heroStats": stats}}
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if state.latency:
+                time.sleep(state.latency)
+            status = state.admit()
+            if status == 429:
+                self._send(429, b'{"message":"Too Many Requests"}', {"Retry-After": f"{state.retry_after:g}"})
+                return
+            if status != 200:
+                self._send(status, b'{"message":"Service Unavailable"}')
+                return
+            body = json.dumps(state.answer(payload.get("query", ""), payload.get("variables") or {})).encode("utf-8")
+            with state.lock:
+                state.counts["bytes"] += len(body)
+            self._send(200, body)
+
+    return Handler
+
+
+def serve(state: StubState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stub in a background thread. Use `server.server_address` for the bound port."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--heroes", type=int, default=127)
+    ap.add_argument("--rate", type=float, default=0.0, help="server-side requests/sec before 429 (0 = unlimited)")
+    ap.add_argument("--p429", type=float, default=0.0, help="probability of a random 429")
+    ap.add_argument("--p5xx", type=float, default=0.0, help="probability of a random 503")
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-aliases", type=int, default=0, help="reject documents with more aliased fields (0 = no limit)")
+    ap.add_argument("--recording", default="", help="serve responses from this recording")
+    ap.add_argument("--save-recording", default="", help="write the synthetic responses to this file and exit")
+    args = ap.parse_args()
+
+    recording = None
+    if args.recording:
+        with open(args.recording, "r", encoding="utf-8") as f:
+            recording = json.load(f)
+    state = StubState(args.heroes, args.rate, args.p429, args.p5xx, args.retry_after, args.latency, args.seed,
+                      args.max_aliases, recording)
+    if args.save_recording:
+        with open(args.save_recording, "w", encoding="utf-8") as f:
+            json.dump(state.record(), f)
+        print(f"Wrote: {args.save_recording}")
+        return 0
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Stratz stub on http://{args.host}:{args.port}/graphql")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(state.counts))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
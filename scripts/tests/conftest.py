@@ -0,0 +1,10 @@
+"""pytest setup: scripts import each other as top-level modules, so put scripts/ on sys.path.
+
+Run:
+  python -m pytest -q scripts/tests
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,67 @@
+"""Scoring invariants from bench_scoring.py on small budgets, so CI fails when one breaks."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bench_scoring import (check_recommendation, counter_asymmetry, counter_pairs, random_draft_states,
+                           synthetic_pool)
+from scoring import compile_tables, encode_drafts, load_data, score_all, score_drafts
+from scoring_service import ScoringService
+
+DRAFTS = 200
+LIMIT = 10
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_data()
+
+
+@pytest.mark.parametrize("pool", [0, 300], ids=["real", "synthetic"])
+def test_no_picked_or_banned_hero_recommended(data, pool):
+    heroes, roles, synergies = data
+    if pool:
+        heroes = synthetic_pool(heroes, pool)
+    tables = compile_tables(heroes, roles, synergies)
+    service = ScoringService(tables)
+    for allies, enemies, bans in random_draft_states(sorted(heroes), DRAFTS, seed=1):
+        recs = service.recommend(allies, enemies, LIMIT, exclude=bans)
+        scores = dict(zip(tables.names, map(int, service.scores(service.indices(allies), service.indices(enemies)))))
+        taken = set(allies) | set(enemies) | set(bans)
+        assert check_recommendation(recs, scores, taken, LIMIT, tables.n - len(taken)) == [], (allies, enemies, bans)
+
+
+def test_scores_are_deterministic(data):
+    heroes, roles, synergies = data
+    drafts = random_draft_states(sorted(heroes), DRAFTS, seed=2)
+    service = ScoringService(compile_tables(heroes, roles, synergies))
+    twin = ScoringService(compile_tables(heroes, roles, synergies))
+    for allies, enemies, bans in drafts:
+        recs = service.recommend(allies, enemies, LIMIT, exclude=bans)
+        assert service.recommend(allies, enemies, LIMIT, exclude=bans) == recs
+        assert twin.recommend(allies, enemies, LIMIT, exclude=bans) == recs
+
+    # The vectorised scores are the reference score_hero on every candidate
+    tables = compile_tables(heroes, roles, synergies)
+    sample = [(allies, enemies) for allies, enemies, _ in drafts[:20]]
+    vec = score_drafts(tables, *encode_drafts(tables, sample))
+    for row, (allies, enemies) in zip(vec, sample):
+        assert dict(zip(tables.names, map(int, row))) == score_all(allies, enemies, heroes, roles, synergies)
+
+
+def test_explicit_counters_are_symmetric(data):
+    heroes, roles, synergies = data
+    tables = compile_tables(heroes, roles, synergies)
+    assert counter_asymmetry(tables, heroes, counter_pairs(heroes, 300)) == []
+
+
+def test_counter_asymmetry_catches_a_corrupted_entry(data):
+    heroes, roles, synergies = data
+    tables = compile_tables(heroes, roles, synergies)
+    pairs = counter_pairs(heroes, 300)
+    a, b = pairs[0]  # a listed pair: a has a counter entry for b
+    i, j = tables.index[a], tables.index[b]
+    tables.enemy_matrix[i, j] += 1
+    flagged = {(x, y) for x, y, *_ in counter_asymmetry(tables, heroes, pairs)}
+    assert (a, b) in flagged and all({x, y} == {a, b} for x, y in flagged)
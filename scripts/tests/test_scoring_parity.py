@@ -0,0 +1,58 @@
+"""f32/i32 parity of scoring.py with the engine's score_hero (src/scoring.rs).
+
+fixtures/parity holds a 24-hero slice of data/ (heroes/, roles.json,
+synergies.json), random drafts over it and the scores the engine gave every
+hero of the slice for each draft. After changing the slice or the engine's
+scoring, regenerate scores.json:
+
+  cargo run --release --example score_fixtures -- scripts/tests/fixtures/parity/drafts.json \\
+      scripts/tests/fixtures/parity > scripts/tests/fixtures/parity/scores.json
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import hero_db
+from scoring import compile_tables, encode_drafts, np, score_all, score_drafts
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "parity"
+
+
+@pytest.fixture(scope="module")
+def data(tmp_path_factory):
+    """(heroes, roles, synergies) through a heroes.db compiled from the slice, like load_data()."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(hero_db, "HERO_DIR", FIXTURE / "heroes")
+        mp.setattr(hero_db, "ROLES_FILE", FIXTURE / "roles.json")
+        mp.setattr(hero_db, "SYNERGIES_FILE", FIXTURE / "synergies.json")
+        path = hero_db.compile_db(tmp_path_factory.mktemp("parity") / "heroes.db")
+    with hero_db.HeroDB(path) as db:
+        return db.heroes(), db.role_rules(), db.synergy_rules()
+
+
+@pytest.fixture(scope="module")
+def fixtures():
+    return json.loads((FIXTURE / "scores.json").read_text(encoding="utf-8"))["drafts"]
+
+
+def test_fixture_covers_the_slice(data, fixtures):
+    heroes, _, _ = data
+    assert len(fixtures) >= 100
+    assert all(set(f["scores"]) == set(heroes) for f in fixtures)
+
+
+def test_reference_matches_engine(data, fixtures):
+    heroes, roles, synergies = data
+    for f in fixtures:
+        assert score_all(f["allies"], f["enemies"], heroes, roles, synergies) == f["scores"], f
+
+
+@pytest.mark.skipif(np is None, reason="numpy is required for vectorised scoring")
+def test_vectorised_matches_engine(data, fixtures):
+    heroes, roles, synergies = data
+    tables = compile_tables(heroes, roles, synergies)
+    vec = score_drafts(tables, *encode_drafts(tables, [(f["allies"], f["enemies"]) for f in fixtures]))
+    for row, f in zip(vec, fixtures):
+        assert dict(zip(tables.names, map(int, row))) == f["scores"], f
@@ -0,0 +1,83 @@
+"""Fetch stage of stratz_hero_requests.py against the in-process Stratz stub."""
+
+import asyncio
+import io
+import json
+from collections import deque
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import stratz_hero_requests as shr
+from pipeline_events import EventSink, parse_line
+from stratz_sources import StratzSource
+from stratz_stub_server import StubState, serve
+
+HEROES = 12
+RETRY_AFTER = 0.05
+
+
+class ScriptedStub(StubState):
+    """StubState that answers the first requests with the given statuses, then 200."""
+
+    def __init__(self, statuses, **kwargs):
+        super().__init__(**kwargs)
+        self.script = deque(statuses)
+
+    def admit(self) -> int:
+        with self.lock:
+            self.counts["requests"] += 1
+            status = self.script.popleft() if self.script else 200
+            self.counts["ok" if status == 200 else "429" if status == 429 else "5xx"] += 1
+            return status
+
+
+def fetch(state, *extra):
+    """Run the fetch stage against `state`; returns (heroes, events by name)."""
+    server = serve(state)
+    host, port = server.server_address[:2]
+    stream = io.StringIO()
+    try:
+        args = shr.parse_args(["test-token", "4", "--api-url", f"http://{host}:{port}/graphql",
+                               "--rate", "200", "--burst", "200", "--max-wait", "30", "--batch-size", "5", *extra])
+        with requests.Session() as session:
+            heroes = asyncio.run(shr.run(args, StratzSource(session.post), events=EventSink(stream)))
+    finally:
+        server.shutdown()
+    events = {}
+    for line in stream.getvalue().splitlines():
+        row = parse_line(line)
+        events.setdefault(row["event"], []).append(row)
+    return heroes, events
+
+
+def test_fetch_recovers_from_429_and_5xx():
+    # Constants: 429 then 200; positions: 503 then 200
+    state = ScriptedStub([429, 200, 503], heroes=HEROES, retry_after=RETRY_AFTER)
+    heroes, events = fetch(state)
+
+    assert heroes is not None and len(heroes) == HEROES
+    assert all(h["counters"] and h["synergies"] and h["positions"] for h in heroes)
+    assert state.counts["429"] == 1 and state.counts["5xx"] == 1
+    assert [e["wait_s"] for e in events["throttle"]] == [RETRY_AFTER]
+    assert [e["reason"] for e in events["retry"]] == [503]
+    summary = events["summary"][-1]
+    assert (summary["throttled"], summary["retries"], summary["failed"]) == (1, 2, 0)
+    assert events["progress"][-1]["done"] == HEROES
+
+
+def test_fetch_splits_batches_the_server_rejects():
+    # Five aliases let the positions query through; matchUp batches of 8 get split
+    state = StubState(heroes=HEROES, max_aliases=5)
+    heroes, events = fetch(state, "--batch-size", "8")
+
+    assert all(h["counters"] for h in heroes)
+    assert state.counts["too_complex"] > 0
+    assert events["summary"][-1]["failed"] == 0
+
+
+def test_fetch_matches_unbatched_results():
+    batched, _ = fetch(StubState(heroes=HEROES))
+    single, _ = fetch(StubState(heroes=HEROES), "--batch-size", "1", "--no-stream")
+    assert json.dumps(batched, sort_keys=True) == json.dumps(single, sort_keys=True)
@@ -8,16 +8,49 @@
 - Позиции (positions)
 - Контрпики (explicit_counters)
 - Синергии (explicit_synergies)
+
+Файл героя перезаписывается только если его содержимое действительно
+изменилось; --heroes ограничивает обновление списком героев (так делает
+инкрементальный режим stratz_hero_requests.py).
+
+Запись идёт пакетом: каждый файл читается один раз, все обновления
+собираются в памяти, затем сериализуются и пишутся параллельно (orjson,
+если установлен, — текст тот же, что у json.dumps(indent=2)).
+--bundle дополнительно пишет data/heroes.bundle.json: все герои одним
+минифицированным файлом, который загрузчик движка читает за одно чтение.
+--timing печатает время фаз записи, --bench-write сравнивает старую
+последовательную запись с пакетной на копии data/heroes.
 """
 
+import argparse
 import json
 import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+import audit_data_rules
+import hero_db
+import hero_names
+import interaction_tables
+import snapshots
+from position_stats import HeroPositions
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 HEROES_DIR = DATA_DIR / "heroes"
 STRATZ_FILE = DATA_DIR / "dota_heroes_stratz.json"
+BUNDLE_FILE = DATA_DIR / "heroes.bundle.json"
+BUNDLE_VERSION = 1
+WRITE_WORKERS = 8
 
 
 def load_stratz_data() -> Dict[str, Any]:
@@ -99,86 +132,188 @@ def extract_synergies(synergies_list: List[Dict]) -> Dict[str, float]:
 
 
 def extract_positions(positions: Dict) -> Dict[str, float]:
-    """Извлекает позиции с pick_rate в качестве показателя"""
-    result = {}
-    for pos, data in positions.items():
-        if isinstance(data, dict) and 'pick_rate' in data:
-            # Берем pick_rate и нормализуем (убираем %)
-            pick_rate_str = data['pick_rate'].rstrip('%')
-            try:
-                result[pos] = float(pick_rate_str)
-            except ValueError:
-                result[pos] = 0.0
-    return result
+    """Позиции с pick_rate (%) в качестве показателя; читает и счётчики, и старый формат с "x%" """
+    return HeroPositions.from_json(positions).pick_rates()
 
 
-def find_hero_file(hero_name: str, verbose=False) -> Path | None:
-    """Находит файл героя, пробуя разные форматы имён"""
-    # Маппинг имён для специальных случаев
-    special_mappings = {
-        'outworld destroyer': 'outworld_devourer.json',
-    }
-    
-    hero_name_lower = hero_name.lower()
-    if hero_name_lower in special_mappings:
-        hero_file = HEROES_DIR / special_mappings[hero_name_lower]
-        if hero_file.exists():
-            return hero_file
-
-    # Попробуем разные варианты
-    variants = [
-        hero_name.lower().replace(' ', '_').replace('-', '_') + '.json',  # anti_mage
-        hero_name.lower().replace(' ', '_').replace("'", '') + '.json',    # natures_prophet
-        hero_name.lower().replace(' ', '_') + '.json',                     # standard
-        hero_name.lower().replace(' ', '-') + '.json',                     # anti-mage
-    ]
-    
-    for variant in variants:
-        hero_file = HEROES_DIR / variant
-        if hero_file.exists():
-            return hero_file
-    
-    return None
+def find_hero_file(hero_name: str) -> Path | None:
+    """Файл героя по имени через общий индекс имён (без перебора вариантов на диске)"""
+    return hero_names.index().path(hero_name)
 
 
-def update_hero_file(hero_name: str, stratz_data: Dict[str, Any], verbose=False) -> bool:
-    """Обновляет файл героя данными из stratz"""
-    hero_file = find_hero_file(hero_name, verbose=verbose)
-    
-    if not hero_file:
-        if verbose:
-            print(f"[!] Файл не найден для: {hero_name}")
-        return False
-    
-    # Загружаем текущие данные героя
-    with open(hero_file, 'r', encoding='utf-8') as f:
-        hero_data = json.load(f)
-    
-    # Обновляем данные
+def dump_hero(hero_data: Dict[str, Any]) -> str:
+    """Сериализует героя в том же формате, что лежит на диске (orjson даёт тот же текст)"""
+    if orjson is not None:
+        return orjson.dumps(hero_data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(hero_data, ensure_ascii=False, indent=2)
+
+
+@dataclass
+class HeroUpdate:
+    """Файл героя, прочитанный один раз, и его новые данные"""
+    name: str
+    path: Path
+    old_text: str
+    data: Dict[str, Any]
+
+
+def apply_stratz(hero_data: Dict[str, Any], stratz_data: Dict[str, Any]) -> List[str]:
+    """Переносит в данные героя поля из stratz.
+
+    Пустой результат (запрос героя не удался или был пропущен по таймауту)
+    никогда не затирает непустые позиции, контрпики и синергии. Возвращает
+    имена полей, оставленных как были."""
     hero_data['name'] = stratz_data['name']
     hero_data['primary_attribute'] = normalize_attribute(stratz_data['primary_attr'])
     hero_data['roles'] = normalize_roles(stratz_data['roles'])
-    
-    # Обновляем позиции (если нет поля, создаем новое)
-    if 'positions' not in hero_data:
-        hero_data['positions'] = {}
-    hero_data['positions'] = extract_positions(stratz_data['positions'])
-    
-    # Обновляем контрпики
-    hero_data['explicit_counters'] = extract_counters(stratz_data['counters'])
-    
-    # Обновляем синергии
-    hero_data['explicit_synergies'] = extract_synergies(stratz_data['synergies'])
-    
-    # Сохраняем обновленные данные
-    with open(hero_file, 'w', encoding='utf-8') as f:
-        json.dump(hero_data, f, ensure_ascii=False, indent=2)
-    
+
+    kept = []
+    for key, value in (
+        ('positions', extract_positions(stratz_data['positions'])),
+        ('explicit_counters', extract_counters(stratz_data['counters'])),
+        ('explicit_synergies', extract_synergies(stratz_data['synergies'])),
+    ):
+        if not value and hero_data.get(key):
+            kept.append(key)
+            continue
+        hero_data[key] = value
+    return kept
+
+
+def read_updates(hero_list: List[str], stratz_data: Dict[str, Any], hero_dir: Optional[Path] = None,
+                 verbose=False) -> tuple[List[HeroUpdate], int]:
+    """Читает каждый файл героя один раз и строит обновления в памяти.
+    Возвращает (обновления, число ошибок)."""
+    updates: List[HeroUpdate] = []
+    failed = 0
+    for hero_name in hero_list:
+        stratz_hero = stratz_data.get(hero_name.lower())
+        if stratz_hero is None:
+            print(f"[!] {hero_name}: не найден в stratz данных")
+            failed += 1
+            continue
+        hero_file = find_hero_file(hero_name)
+        if not hero_file:
+            if verbose:
+                print(f"[!] Файл не найден для: {hero_name}")
+            failed += 1
+            continue
+        if hero_dir is not None:
+            hero_file = hero_dir / hero_file.name
+        old_text = hero_file.read_text(encoding='utf-8')
+        hero_data = json.loads(old_text)
+        kept = apply_stratz(hero_data, stratz_hero)
+        if kept:
+            print(f"[!] {hero_name}: пустой результат stratz, оставлены прежние {', '.join(kept)}")
+        updates.append(HeroUpdate(hero_name, hero_file, old_text, hero_data))
+    return updates, failed
+
+
+def audit_updates(updates: List[HeroUpdate]) -> tuple[List[HeroUpdate], List[HeroUpdate]]:
+    """Аудит новых данных ещё в памяти. Возвращает (обновления к записи, задержанные).
+
+    Ошибка в данных или файле записываемого героя задерживает только этого героя;
+    ошибки в остальных файлах data/ и в правилах выводятся как предупреждения
+    и запись не останавливают."""
+    report = audit_data_rules.run_audit(overrides={u.path.name: u.data for u in updates})
+    by_subject = {}
+    for u in updates:
+        by_subject[u.path.name] = u
+        by_subject[u.data.get("name")] = u
+    held = set()
+    for f in report.findings:
+        if f.severity != "error":
+            continue
+        update = by_subject.get(f.subject)
+        if update is None:
+            print(f"[⚠️] audit {f.check}: {f.subject}: {f.message}")
+        else:
+            print(f"[❌] audit {f.check}: {f.subject}: {f.message}")
+            held.add(update.path)
+    return [u for u in updates if u.path not in held], [u for u in updates if u.path in held]
+
+
+def write_update(update: HeroUpdate) -> bool:
+    """Сериализует и пишет один файл; False, если содержимое не поменялось"""
+    new_text = dump_hero(update.data)
+    if new_text == update.old_text:
+        return False
+    # Через временный файл: читатель видит либо старый, либо новый файл, но не обрезанный
+    snapshots.atomic_write_text(update.path, new_text)
     return True
 
 
-def main(verbose=False):
-    """Главная функция"""
+def write_updates(updates: List[HeroUpdate], workers: int = WRITE_WORKERS) -> List[str]:
+    """Пишет изменившиеся файлы параллельно; возвращает имена переписанных героев"""
+    if workers <= 1:
+        written = [write_update(u) for u in updates]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            written = list(pool.map(write_update, updates))
+    return [u.name for u, w in zip(updates, written) if w]
+
+
+def update_hero_file(hero_name: str, stratz_data: Dict[str, Any], verbose=False) -> Optional[bool]:
+    """Обновляет один файл героя данными из stratz.
+
+    Возвращает True если файл переписан, False если изменений нет,
+    None если файл героя не найден.
+    """
+    updates, _ = read_updates([hero_name], {hero_name.lower(): stratz_data}, verbose=verbose)
+    if not updates:
+        return None
+    return write_update(updates[0])
+
+
+def write_bundle(heroes: Optional[List[Dict[str, Any]]] = None, path: Path = BUNDLE_FILE) -> Path:
+    """Все герои одним минифицированным JSON; без `heroes` читает data/heroes"""
+    if heroes is None:
+        heroes = [json.loads(e.path.read_text(encoding='utf-8')) for e in hero_names.index()]
+    # Отпечаток исходников, как в heroes.db: загрузчик на Rust по нему понимает, что bundle устарел
+    payload = {"version": BUNDLE_VERSION, "fingerprint": hero_db.source_fingerprint().hex(),
+               "heroes": sorted(heroes, key=lambda h: h["name"])}
+    if orjson is not None:
+        text = orjson.dumps(payload).decode("utf-8")
+    else:
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    snapshots.atomic_write_text(path, text)
+    return path
+
+
+def bench_write(stratz_data: Dict[str, Any], workers: int = WRITE_WORKERS) -> Dict[str, float]:
+    """Старая последовательная запись против пакетной на копии data/heroes, все файлы переписываются"""
+    names = [e.name for e in hero_names.index() if e.name.lower() in stratz_data]
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        hero_dir = Path(tmp) / "heroes"
+        shutil.copytree(HEROES_DIR, hero_dir)
+
+        # Как было: найти файл, прочитать, обновить, json.dumps, записать — по одному герою
+        t0 = time.perf_counter()
+        for name in names:
+            path = hero_dir / find_hero_file(name).name
+            hero_data = json.loads(path.read_text(encoding='utf-8'))
+            apply_stratz(hero_data, stratz_data[name.lower()])
+            snapshots.atomic_write_text(path, json.dumps(hero_data, ensure_ascii=False, indent=2))
+        timings["serial_ms"] = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        updates, _ = read_updates(names, stratz_data, hero_dir)
+        for u in updates:
+            u.old_text = ""  # переписываем всё, как и в последовательном прогоне
+        t1 = time.perf_counter()
+        write_updates(updates, workers)
+        t2 = time.perf_counter()
+        write_bundle([u.data for u in updates], Path(tmp) / BUNDLE_FILE.name)
+        t3 = time.perf_counter()
+        timings.update(read_ms=(t1 - t0) * 1000, write_ms=(t2 - t1) * 1000,
+                       batched_ms=(t2 - t0) * 1000, bundle_ms=(t3 - t2) * 1000)
+    return timings
+
+
+def main(verbose=False, only: Optional[List[str]] = None, bundle=False, timing=False,
+         workers: int = WRITE_WORKERS):
+    """Главная функция. `only` — имена героев для обновления (None = все)"""
     if verbose:
         print("[*] Загружаем данные из dota_heroes_stratz.json...")
     stratz_data = load_stratz_data()
@@ -186,35 +321,73 @@ def main(verbose=False):
         print(f"[OK] Загружено {len(stratz_data)} героев\n")
         print(f"[*] Сканируем папку {HEROES_DIR}...\n")
     
-    updated_count = 0
-    failed_count = 0
+    if only is not None:
+        # Инкрементальный режим: только изменившиеся герои, без чтения остальных файлов
+        hero_list = list(only)
+    else:
+        # Имена всех героев берём из индекса, а не читаем каждый файл
+        hero_list = [entry.name for entry in hero_names.index()]
+        if verbose:
+            print(f"Найдено файлов: {len(hero_list)}\n")
     
-    # Получаем все файлы .json в папке heroes
-    hero_files = sorted(HEROES_DIR.glob("*.json"))
-    if verbose:
-        print(f"Найдено файлов: {len(hero_files)}\n")
+    t0 = time.perf_counter()
+    updates, failed_count = read_updates(hero_list, stratz_data, verbose=verbose)
+    updates, held = audit_updates(updates)
+    if held:
+        print(f"[❌] Аудит: не записаны {len(held)} героев с ошибками: {', '.join(u.name for u in held)}")
+        failed_count += len(held)
+    t1 = time.perf_counter()
+    updated = write_updates(updates, workers)
+    t2 = time.perf_counter()
+    unchanged_count = len(updates) - len(updated)
+    if bundle and (updated or not BUNDLE_FILE.exists()):
+        # В полном режиме все герои уже в памяти, в инкрементальном остальные читаются с диска
+        write_bundle([u.data for u in updates] if only is None else None)
+    t3 = time.perf_counter()
+    if timing:
+        print(f"[⏱] чтение+сборка: {(t1 - t0) * 1000:.1f} мс, запись: {(t2 - t1) * 1000:.1f} мс"
+              f" ({len(updated)} файлов, {workers} потоков, {'orjson' if orjson else 'json'})"
+              + (f", bundle: {(t3 - t2) * 1000:.1f} мс" if bundle else ""))
     
-    for hero_file in hero_files:
-        with open(hero_file, 'r', encoding='utf-8') as f:
-            hero_local_data = json.load(f)
-        
-        hero_name = hero_local_data.get('name', '')
-        
-        if hero_name.lower() in stratz_data:
-            if update_hero_file(hero_name, stratz_data[hero_name.lower()], verbose=verbose):
-                updated_count += 1
-            else:
-                failed_count += 1
-        else:
-            print(f"[!] {hero_name}: не найден в stratz данных")
-            failed_count += 1
+    if updated:
+        # Пересобираем бинарную базу, чтобы читатели heroes.db видели новые данные,
+        # и таблицы парных взаимодействий для движка
+        hero_db.compile_db()
+        interaction_tables.write_tables()
+        # Публикуем целостный снимок data/ и атомарно переключаем data/snapshots/current
+        snapshot = snapshots.publish()
+        if verbose:
+            print(f"[OK] Снимок: {snapshot.name}")
     
     print(f"\n{'='*50}")
     print(f"Результаты:⤵️")
-    print(f"   [✔️] Обновлено: {updated_count}")
+    print(f"   [✔️] Обновлено: {len(updated)}")
+    print(f"   [=] Без изменений: {unchanged_count}")
     print(f"   [❌] Ошибок: {failed_count}")
+    if updated:
+        print(f"   Изменённые: {', '.join(updated)}")
     print(f"{'='*50}")
+    # Задержанные аудитом герои не записаны: вызывающий не должен считать их обновлёнными
+    return 1 if held else 0
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Обновляет data/heroes/*.json из dota_heroes_stratz.json")
+    ap.add_argument("--heroes", nargs="*", default=None, help="обновить только этих героев")
+    ap.add_argument("--verbose", action="store_true")
+    ap.add_argument("--bundle", action="store_true", help="также записать data/heroes.bundle.json")
+    ap.add_argument("--workers", type=int, default=WRITE_WORKERS, help="потоков записи")
+    ap.add_argument("--timing", action="store_true", help="время фаз записи")
+    ap.add_argument("--bench-write", action="store_true",
+                    help="сравнить последовательную и пакетную запись на копии data/heroes")
+    return ap.parse_args()
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.bench_write:
+        for k, v in bench_write(load_stratz_data(), args.workers).items():
+            print(f"{k}\t{v:.1f}")
+        raise SystemExit(0)
+    raise SystemExit(main(verbose=args.verbose, only=args.heroes, bundle=args.bundle, timing=args.timing,
+                          workers=args.workers))
@@ -1,4 +1,5 @@
 use dota2draft::Drafter;
+use dota2draft::loader::current_snapshot;
 use serde::{Deserialize, Serialize};
 use std::process::Command;
 use std::path::Path;
@@ -104,6 +105,15 @@ fn cmd_check_data_freshness() -> Result<bool, String> {
     Ok(duration.as_secs() < 604800)
 }
 
+/// NDJSON-событие (scripts/pipeline_events.py) из целой строки stdout; None для прочего текста.
+/// С --events скрипт пишет в stdout только события, а текстовый лог — в stderr.
+fn parse_event_line(line: &str) -> Option<serde_json::Value> {
+    if !line.starts_with("{\"event\":") {
+        return None;
+    }
+    serde_json::from_str(line).ok()
+}
+
 #[tauri::command]
 async fn cmd_update_data(window: Window, api_key: String, max_workers: i32) -> Result<(), String> {
     // Determine the path to Cargo.toml relative to execution
@@ -136,6 +146,7 @@ async fn cmd_update_data(window: Window, api_key: String, max_workers: i32) -> R
         .args(&["src/stratz_hero_requests.py"])
         .arg(&api_key)
         .arg(max_workers.to_string())
+        .arg("--events")
         .stdout(std::process::Stdio::piped())
         .stderr(std::process::Stdio::piped())
         .spawn()
@@ -151,7 +162,16 @@ async fn cmd_update_data(window: Window, api_key: String, max_workers: i32) -> R
         let reader = BufReader::new(stdout);
         for line in reader.lines() {
             if let Ok(l) = line {
-                let _ = window_clone.emit("update-log", l);
+                // Структурные события идут отдельным каналом, остальное — как текст лога
+                match parse_event_line(&l) {
+                    Some(event) => {
+                        let _ = window_clone.emit("update-event", event);
+                    }
+                    None if !l.trim().is_empty() => {
+                        let _ = window_clone.emit("update-log", l);
+                    }
+                    None => {}
+                }
             }
         }
     });
@@ -161,7 +181,7 @@ async fn cmd_update_data(window: Window, api_key: String, max_workers: i32) -> R
         let reader = BufReader::new(stderr);
         for line in reader.lines() {
             if let Ok(l) = line {
-                // Cargo build output usually goes to stderr
+                // Текстовый лог скрипта (с --events) и прочий вывод идут в stderr
                 let _ = window_clone2.emit("update-log", l);
             }
         }
@@ -203,16 +223,23 @@ fn main() {
                 }
             }
 
-            println!("Loading data from: {:?}", resource_path);
+            // Опубликованный снимок (scripts/snapshots.py) не переписывается во время
+            // обновления данных, в отличие от самих data/heroes/*.json
+            let data_path = current_snapshot(&resource_path).unwrap_or_else(|| resource_path.clone());
+            println!("Loading data from: {:?}", data_path);
 
-            let heroes_path = resource_path.join("heroes");
-            let roles_path = resource_path.join("roles.json");
-            let synergies_path = resource_path.join("synergies.json");
+            let heroes_path = data_path.join("heroes");
+            let roles_path = data_path.join("roles.json");
+            let synergies_path = data_path.join("synergies.json");
+            let db_path = data_path.join("heroes.db");
+            let tables_path = data_path.join("interaction_tables.json");
 
-            let drafter = match Drafter::new(
+            let drafter = match Drafter::open(
                 heroes_path.to_str().unwrap(),
                 roles_path.to_str().unwrap(),
                 synergies_path.to_str().unwrap(),
+                db_path.to_str().unwrap(),
+                tables_path.to_str().unwrap(),
             ) {
                 Ok(d) => Some(d),
                 Err(e) => {
@@ -1,7 +1,7 @@
 use std::collections::HashMap;
-use crate::model::{Hero, RoleRules, SynergyRules, GamePhase};
-use crate::loader::{load_heroes, load_roles, load_synergies};
-use crate::scoring::score_hero;
+use crate::model::{Hero, InteractionTables, RoleRules, SynergyRules, GamePhase};
+use crate::loader::{bundle_path, db_is_fresh, load_db, load_heroes, load_heroes_bundle, load_interactions, load_roles, load_synergies};
+use crate::scoring::{score_hero, score_hero_tables};
 use crate::analysis;
 
 /// Рекомендация героя с объяснениями
@@ -17,6 +17,8 @@ pub struct Drafter {
     heroes: HashMap<String, Hero>,
     roles: RoleRules,
     synergies: SynergyRules,
+    /// Предвычисленные парные таблицы; без них правила берутся по строковым ключам
+    tables: Option<InteractionTables>,
 }
 
 impl Drafter {
@@ -32,9 +34,64 @@ impl Drafter {
             heroes,
             roles,
             synergies,
+            tables: None,
         })
     }
 
+    /// Создаёт Drafter из скомпилированного heroes.db (scripts/hero_db.py)
+    pub fn from_db(db_path: &str) -> Result<Self, Box<dyn std::error::Error>> {
+        let (heroes, roles, synergies) = load_db(db_path)?;
+        Ok(Drafter { heroes, roles, synergies, tables: None })
+    }
+
+    /// Загружает heroes.db, если он собран из текущих JSON-источников (отпечаток
+    /// в заголовке совпадает), затем так же heroes.bundle.json, иначе сами JSON.
+    /// Таблицы взаимодействий подключаются, если их отпечаток тоже совпадает.
+    pub fn open(heroes_path: &str, roles_path: &str, synergies_path: &str, db_path: &str, tables_path: &str)
+        -> Result<Self, Box<dyn std::error::Error>>
+    {
+        let mut drafter = None;
+        if db_is_fresh(db_path, heroes_path, roles_path, synergies_path) {
+            match Self::from_db(db_path) {
+                Ok(d) => drafter = Some(d),
+                Err(e) => eprintln!("Failed to load {}: {}, falling back to JSON", db_path, e),
+            }
+        }
+        let bundle = bundle_path(heroes_path);
+        let bundle = bundle.to_string_lossy();
+        if drafter.is_none() && db_is_fresh(&bundle, heroes_path, roles_path, synergies_path) {
+            match load_heroes_bundle(&bundle) {
+                Ok(heroes) => drafter = Some(Drafter {
+                    heroes,
+                    roles: load_roles(roles_path)?,
+                    synergies: load_synergies(synergies_path)?,
+                    tables: None,
+                }),
+                Err(e) => eprintln!("Failed to load {}: {}, falling back to JSON", bundle, e),
+            }
+        }
+        let mut drafter = match drafter {
+            Some(d) => d,
+            None => Self::new(heroes_path, roles_path, synergies_path)?,
+        };
+        if db_is_fresh(tables_path, heroes_path, roles_path, synergies_path) {
+            if let Err(e) = drafter.use_interactions(tables_path) {
+                eprintln!("Failed to load {}: {}, using string rules", tables_path, e);
+            }
+        }
+        Ok(drafter)
+    }
+
+    /// Подключает interaction_tables.json; таблицы должны покрывать ровно текущих героев
+    pub fn use_interactions(&mut self, path: &str) -> Result<(), Box<dyn std::error::Error>> {
+        let tables = load_interactions(path)?;
+        if tables.heroes.len() != self.heroes.len() || !self.heroes.keys().all(|h| tables.index.contains_key(h)) {
+            return Err(format!("{}: hero list does not match the loaded heroes", path).into());
+        }
+        self.tables = Some(tables);
+        Ok(())
+    }
+
     /// Вычисляет профиль игровой фазы для команды
     fn calculate_team_phase(&self, team: &[String]) -> GamePhase {
         let mut phase = GamePhase { early: 0, mid: 0, late: 0 };
@@ -67,7 +124,10 @@ impl Drafter {
                 continue;
             }
 
-            let score = score_hero(
+            let tabled = self.tables.as_ref().and_then(|t| {
+                score_hero_tables(hero, &allies, &enemies, &self.heroes, t, &enemy_phase)
+            });
+            let score = tabled.unwrap_or_else(|| score_hero(
                 hero,
                 &allies,
                 &enemies,
@@ -75,7 +135,7 @@ impl Drafter {
                 &self.roles,
                 &self.synergies,
                 &enemy_phase,
-            );
+            ));
 
             let reasons = analysis::explain(hero, &enemies, &self.heroes);
             results.push((hero.name.clone(), score, reasons));
@@ -121,4 +181,67 @@ mod tests {
         let drafter = Drafter::new("data/heroes", "data/roles.json", "data/synergies.json");
         assert!(drafter.is_ok());
     }
+
+    #[test]
+    #[ignore = "needs data/heroes.db: run `python scripts/hero_db.py`, then `cargo test -- --ignored`"]
+    fn test_drafter_from_db_matches_json() {
+        // heroes.db собирается scripts/hero_db.py и в репозиторий не входит
+        assert!(db_is_fresh("data/heroes.db", "data/heroes", "data/roles.json", "data/synergies.json"),
+                "data/heroes.db is missing or stale: run python scripts/hero_db.py");
+        let json = Drafter::new("data/heroes", "data/roles.json", "data/synergies.json").unwrap();
+        let db = Drafter::from_db("data/heroes.db").unwrap();
+        assert_eq!(json.heroes.len(), db.heroes.len());
+        assert_eq!(json.roles.role_synergies, db.roles.role_synergies);
+        assert_eq!(json.synergies.tag_counters, db.synergies.tag_counters);
+
+        let enemies = vec!["Axe".to_string(), "Zeus".to_string()];
+        let scores = |d: &Drafter| -> HashMap<String, i32> {
+            d.recommend(enemies.clone(), vec![], usize::MAX).into_iter().map(|r| (r.hero_name, r.score)).collect()
+        };
+        let (a, b) = (scores(&json), scores(&db));
+        assert_eq!(a, b);
+    }
+
+    #[test]
+    #[ignore = "needs data/heroes.bundle.json: run `python scripts/update_heroes_data.py --bundle`"]
+    fn test_heroes_bundle_matches_json() {
+        // heroes.bundle.json пишет scripts/update_heroes_data.py --bundle
+        let bundle = bundle_path("data/heroes");
+        assert!(db_is_fresh(&bundle.to_string_lossy(), "data/heroes", "data/roles.json", "data/synergies.json"),
+                "data/heroes.bundle.json is missing or stale: run python scripts/update_heroes_data.py --bundle");
+        let files = load_heroes("data/heroes").unwrap();
+        let bundled = load_heroes_bundle(&bundle.to_string_lossy()).unwrap();
+        assert_eq!(files.len(), bundled.len());
+        for (name, hero) in &files {
+            let other = &bundled[name];
+            assert_eq!(hero.roles, other.roles);
+            assert_eq!(hero.tags, other.tags);
+            assert_eq!(hero.explicit_counters, other.explicit_counters);
+        }
+    }
+
+    #[test]
+    #[ignore = "needs data/interaction_tables.json: run `python scripts/interaction_tables.py`"]
+    fn test_interaction_tables_match_string_rules() {
+        // interaction_tables.json собирается scripts/interaction_tables.py
+        assert!(db_is_fresh("data/interaction_tables.json", "data/heroes", "data/roles.json", "data/synergies.json"),
+                "data/interaction_tables.json is missing or stale: run python scripts/interaction_tables.py");
+        let plain = Drafter::new("data/heroes", "data/roles.json", "data/synergies.json").unwrap();
+        let mut tabled = Drafter::new("data/heroes", "data/roles.json", "data/synergies.json").unwrap();
+        tabled.use_interactions("data/interaction_tables.json").unwrap();
+
+        let drafts = [
+            (vec!["Crystal Maiden", "Axe"], vec!["Pudge", "Zeus", "Anti-Mage"]),
+            (vec![], vec!["Lion"]),
+            (vec!["Sven", "Lich", "Lion", "Tiny"], vec![]),
+        ];
+        for (allies, enemies) in drafts {
+            let allies: Vec<String> = allies.into_iter().map(String::from).collect();
+            let enemies: Vec<String> = enemies.into_iter().map(String::from).collect();
+            let scores = |d: &Drafter| -> HashMap<String, i32> {
+                d.recommend(enemies.clone(), allies.clone(), usize::MAX).into_iter().map(|r| (r.hero_name, r.score)).collect()
+            };
+            assert_eq!(scores(&plain), scores(&tabled));
+        }
+    }
 }
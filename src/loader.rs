@@ -1,7 +1,9 @@
 use std::fs;
 use std::collections::HashMap;
 use std::error::Error;
-use crate::model::{Hero, RoleRules, SynergyRules};
+use std::path::{Path, PathBuf};
+use serde::Deserialize;
+use crate::model::{GamePhase, Hero, InteractionTables, RoleRules, SynergyRules};
 
 pub fn load_heroes(path: &str) -> Result<HashMap<String, Hero>, Box<dyn Error>> {
     let mut heroes = HashMap::new();
@@ -23,6 +25,30 @@ pub fn load_heroes(path: &str) -> Result<HashMap<String, Hero>, Box<dyn Error>>
     Ok(heroes)
 }
 
+const BUNDLE_VERSION: u32 = 1;
+
+#[derive(Deserialize)]
+struct HeroBundle {
+    version: u32,
+    heroes: Vec<Hero>,
+}
+
+/// Загружает data/heroes.bundle.json: все герои одним файлом (update_heroes_data.py --bundle)
+pub fn load_heroes_bundle(path: &str) -> Result<HashMap<String, Hero>, Box<dyn Error>> {
+    let data = fs::read(path)?;
+    let bundle: HeroBundle = serde_json::from_slice(&data)
+        .map_err(|e| format!("Failed to parse {}: {}", path, e))?;
+    if bundle.version != BUNDLE_VERSION {
+        return Err(format!("{}: unsupported version {}", path, bundle.version).into());
+    }
+    Ok(bundle.heroes.into_iter().map(|h| (h.name.clone(), h)).collect())
+}
+
+/// Путь к heroes.bundle.json рядом с папкой героев (data/heroes -> data/heroes.bundle.json)
+pub fn bundle_path(heroes_path: &str) -> PathBuf {
+    Path::new(heroes_path).with_file_name("heroes.bundle.json")
+}
+
 pub fn load_roles(path: &str) -> Result<RoleRules, Box<dyn Error>> {
     let data = fs::read_to_string(path)?;
     let rules: RoleRules = serde_json::from_str(&data)?;
@@ -34,3 +60,309 @@ pub fn load_synergies(path: &str) -> Result<SynergyRules, Box<dyn Error>> {
     let rules: SynergyRules = serde_json::from_str(&data)?;
     Ok(rules)
 }
+
+const INTERACTIONS_VERSION: u32 = 1;
+
+/// Загружает data/interaction_tables.json и проверяет размеры таблиц
+pub fn load_interactions(path: &str) -> Result<InteractionTables, Box<dyn Error>> {
+    let content = fs::read_to_string(path)?;
+    let mut tables: InteractionTables = serde_json::from_str(&content)?;
+    if tables.version != INTERACTIONS_VERSION {
+        return Err(format!("{}: unsupported version {}", path, tables.version).into());
+    }
+    let n = tables.heroes.len();
+    if tables.role_pairs.len() != n * n
+        || tables.tag_synergies.len() != n * n
+        || tables.tag_counters.len() != n * n
+        || tables.phase_bias.len() != n
+    {
+        return Err(format!("{}: table sizes do not match {} heroes", path, n).into());
+    }
+    tables.index = tables.heroes.iter().enumerate().map(|(i, name)| (name.clone(), i)).collect();
+    Ok(tables)
+}
+
+// --- Compiled database (data/heroes.db, see scripts/hero_db.py) ---
+
+const DB_MAGIC: &[u8; 8] = b"D2HEROdb";
+const DB_VERSION: u32 = 2;
+const DB_MAX_ROLES: usize = 8;
+const DB_MAX_TAGS: usize = 16;
+const DB_HERO_SIZE: usize = 150;
+const DB_PAIR_SIZE: usize = 8;
+const DB_RULE_SIZE: usize = 13;
+const DB_POSITIONS: [&str; 5] = ["pos_1", "pos_2", "pos_3", "pos_4", "pos_5"];
+const DB_PHASES: [&str; 3] = ["early", "mid", "late"];
+
+struct DbReader<'a> {
+    buf: &'a [u8],
+}
+
+impl<'a> DbReader<'a> {
+    fn bytes(&self, off: usize, len: usize) -> Result<&'a [u8], Box<dyn Error>> {
+        self.buf.get(off..off + len).ok_or_else(|| "heroes.db: truncated file".into())
+    }
+    fn u8(&self, off: usize) -> Result<u8, Box<dyn Error>> {
+        Ok(self.bytes(off, 1)?[0])
+    }
+    fn u16(&self, off: usize) -> Result<u16, Box<dyn Error>> {
+        Ok(u16::from_le_bytes(self.bytes(off, 2)?.try_into()?))
+    }
+    fn u32(&self, off: usize) -> Result<u32, Box<dyn Error>> {
+        Ok(u32::from_le_bytes(self.bytes(off, 4)?.try_into()?))
+    }
+    fn i32(&self, off: usize) -> Result<i32, Box<dyn Error>> {
+        Ok(i32::from_le_bytes(self.bytes(off, 4)?.try_into()?))
+    }
+    fn f32(&self, off: usize) -> Result<f32, Box<dyn Error>> {
+        Ok(f32::from_le_bytes(self.bytes(off, 4)?.try_into()?))
+    }
+}
+
+/// Загружает героев и правила из скомпилированного heroes.db одним чтением файла
+pub fn load_db(path: &str) -> Result<(HashMap<String, Hero>, RoleRules, SynergyRules), Box<dyn Error>> {
+    let data = fs::read(path)?;
+    let r = DbReader { buf: &data };
+
+    if r.bytes(0, 8)? != DB_MAGIC || r.u32(8)? != DB_VERSION {
+        return Err(format!("{}: not a heroes.db v{} file", path, DB_VERSION).into());
+    }
+    let n_strings = r.u32(12)? as usize;
+    let n_heroes = r.u32(16)? as usize;
+    let n_rules = r.u32(24)? as usize;
+    let strings_index_off = r.u32(28)? as usize;
+    let strings_blob_off = r.u32(32)? as usize;
+    let heroes_off = r.u32(36)? as usize;
+    let pairs_off = r.u32(44)? as usize;
+    let rules_off = r.u32(48)? as usize;
+
+    let mut strings = Vec::with_capacity(n_strings);
+    for i in 0..n_strings {
+        let a = r.u32(strings_index_off + 4 * i)? as usize;
+        let b = r.u32(strings_index_off + 4 * (i + 1))? as usize;
+        strings.push(std::str::from_utf8(r.bytes(strings_blob_off + a, b.saturating_sub(a))?)?.to_string());
+    }
+    let string = |id: u32| -> Result<String, Box<dyn Error>> {
+        strings.get(id as usize).cloned().ok_or_else(|| "heroes.db: bad string id".into())
+    };
+    let pairs = |off: usize, n: usize| -> Result<HashMap<String, f32>, Box<dyn Error>> {
+        let mut out = HashMap::with_capacity(n);
+        for k in off..off + n {
+            let at = pairs_off + k * DB_PAIR_SIZE;
+            out.insert(string(r.u32(at)?)?, r.f32(at + 4)?);
+        }
+        Ok(out)
+    };
+
+    let mut heroes = HashMap::with_capacity(n_heroes);
+    for i in 0..n_heroes {
+        let at = heroes_off + i * DB_HERO_SIZE;
+        let roles_at = at + 8;
+        let n_roles_at = roles_at + 4 * DB_MAX_ROLES;
+        let tags_at = n_roles_at + 1;
+        let n_tags_at = tags_at + 4 * DB_MAX_TAGS;
+        let pos_at = n_tags_at + 1;
+        let phase_at = pos_at + 4 * DB_POSITIONS.len();
+        let tail_at = phase_at + 4 * DB_PHASES.len();
+
+        let mut roles = Vec::new();
+        for k in 0..r.u8(n_roles_at)? as usize {
+            roles.push(string(r.u32(roles_at + 4 * k)?)?);
+        }
+        let mut tags = Vec::new();
+        for k in 0..r.u8(n_tags_at)? as usize {
+            tags.push(string(r.u32(tags_at + 4 * k)?)?);
+        }
+        let mut positions = HashMap::new();
+        for (k, pos) in DB_POSITIONS.iter().enumerate() {
+            let v = r.f32(pos_at + 4 * k)?;
+            if !v.is_nan() {
+                positions.insert(pos.to_string(), v);
+            }
+        }
+
+        let hero = Hero {
+            name: string(r.u32(at)?)?,
+            primary_attribute: string(r.u32(at + 4)?)?,
+            roles,
+            tags,
+            positions,
+            game_phase: GamePhase {
+                early: r.i32(phase_at)?,
+                mid: r.i32(phase_at + 4)?,
+                late: r.i32(phase_at + 8)?,
+            },
+            explicit_counters: pairs(r.u32(tail_at)? as usize, r.u16(tail_at + 4)? as usize)?,
+            explicit_synergies: pairs(r.u32(tail_at + 6)? as usize, r.u16(tail_at + 10)? as usize)?,
+        };
+        heroes.insert(hero.name.clone(), hero);
+    }
+
+    let mut roles = RoleRules { role_conflicts: HashMap::new(), role_synergies: HashMap::new() };
+    let mut synergies = SynergyRules {
+        tag_synergies: HashMap::new(),
+        tag_counters: HashMap::new(),
+        phase_bias: HashMap::new(),
+    };
+    for k in 0..n_rules {
+        let at = rules_off + k * DB_RULE_SIZE;
+        let (kind, a, b, weight) = (r.u8(at)?, r.u32(at + 1)?, r.u32(at + 5)?, r.i32(at + 9)?);
+        if kind == 4 {
+            let phase = DB_PHASES.get(b as usize).ok_or("heroes.db: bad phase id")?;
+            synergies.phase_bias.entry(phase.to_string()).or_default().insert(string(a)?, weight);
+            continue;
+        }
+        let key = format!("{}+{}", string(a)?, string(b)?);
+        match kind {
+            0 => { roles.role_synergies.insert(key, weight); }
+            1 => { roles.role_conflicts.insert(key, weight); }
+            2 => { synergies.tag_synergies.insert(key, weight); }
+            3 => { synergies.tag_counters.insert(key, weight); }
+            _ => return Err(format!("heroes.db: unknown rule kind {}", kind).into()),
+        }
+    }
+
+    Ok((heroes, roles, synergies))
+}
+
+// --- Snapshots (scripts/snapshots.py) ---
+
+/// Папка текущего снимка data/snapshots/<имя>: по симлинку current, иначе по файлу
+/// CURRENT. Снимок не меняется после публикации, поэтому чтение из него не застаёт
+/// обновление данных на середине. None, если снимков нет.
+pub fn current_snapshot(data_dir: &Path) -> Option<PathBuf> {
+    let root = data_dir.join("snapshots");
+    let name = match fs::read_link(root.join("current")) {
+        Ok(target) => target.file_name()?.to_string_lossy().into_owned(),
+        Err(_) => fs::read_to_string(root.join("CURRENT")).ok()?.trim().to_string(),
+    };
+    let dir = root.join(&name);
+    if name.is_empty() || !dir.is_dir() {
+        return None;
+    }
+    Some(dir)
+}
+
+// --- Source fingerprint (scripts/hero_db.py source_fingerprint) ---
+
+const FINGERPRINT_LEN: usize = 8;
+/// Смещение отпечатка в заголовке heroes.db (HEADER_FMT "<8s11I8s")
+const DB_FINGERPRINT_OFF: usize = 52;
+const FNV_OFFSET: u64 = 0xcbf2_9ce4_8422_2325;
+const FNV_PRIME: u64 = 0x0000_0100_0000_01b3;
+
+/// FNV-1a/64: не криптография, отпечатку нужно лишь меняться вместе с набором файлов
+fn fnv1a_64(data: &[u8]) -> u64 {
+    data.iter().fold(FNV_OFFSET, |h, &b| (h ^ b as u64).wrapping_mul(FNV_PRIME))
+}
+
+/// Отпечаток исходников, как hero_db.source_fingerprint: имя, размер и mtime (нс)
+/// каждого *.json в папке героев по имени, затем roles.json и synergies.json.
+/// Только stat, без чтения файлов; None, если что-то не читается.
+pub fn source_fingerprint(heroes_path: &str, roles_path: &str, synergies_path: &str) -> Option<[u8; FINGERPRINT_LEN]> {
+    let mut files: Vec<PathBuf> = fs::read_dir(heroes_path).ok()?
+        .flatten()
+        .map(|e| e.path())
+        .filter(|p| p.is_file() && p.file_name().map_or(false, |n| n.to_string_lossy().ends_with(".json")))
+        .collect();
+    files.sort_by(|a, b| a.file_name().cmp(&b.file_name()));
+    files.push(PathBuf::from(roles_path));
+    files.push(PathBuf::from(synergies_path));
+
+    let mut text = String::new();
+    for path in &files {
+        let meta = fs::metadata(path).ok()?;
+        let mtime = meta.modified().ok()?.duration_since(std::time::UNIX_EPOCH).ok()?.as_nanos();
+        let name = path.file_name()?.to_string_lossy();
+        text.push_str(&format!("{}\0{}\0{}\n", name, meta.len(), mtime));
+    }
+    Some(fnv1a_64(text.as_bytes()).to_le_bytes())
+}
+
+#[derive(Deserialize)]
+struct Fingerprinted {
+    fingerprint: Option<String>,
+}
+
+/// Отпечаток, с которым собран артефакт: из заголовка heroes.db или из поля
+/// "fingerprint" (hex) у heroes.bundle.json и interaction_tables.json
+fn artifact_fingerprint(path: &str) -> Option<[u8; FINGERPRINT_LEN]> {
+    use std::io::Read;
+    let mut file = fs::File::open(path).ok()?;
+    let mut head = [0u8; DB_FINGERPRINT_OFF + FINGERPRINT_LEN];
+    if file.read_exact(&mut head).is_ok() && &head[..DB_MAGIC.len()] == DB_MAGIC {
+        return head[DB_FINGERPRINT_OFF..].try_into().ok();
+    }
+    let data = fs::read(path).ok()?;
+    let hex = serde_json::from_slice::<Fingerprinted>(&data).ok()?.fingerprint?;
+    if hex.len() != 2 * FINGERPRINT_LEN || !hex.is_ascii() {
+        return None;
+    }
+    let mut out = [0u8; FINGERPRINT_LEN];
+    for (i, byte) in out.iter_mut().enumerate() {
+        *byte = u8::from_str_radix(&hex[2 * i..2 * i + 2], 16).ok()?;
+    }
+    Some(out)
+}
+
+/// Артефакт (heroes.db, heroes.bundle.json, interaction_tables.json) собран из
+/// текущих исходников: его отпечаток совпадает с source_fingerprint. Сравнение
+/// mtime пропускало удалённые и переименованные файлы героев.
+pub fn db_is_fresh(db_path: &str, heroes_path: &str, roles_path: &str, synergies_path: &str) -> bool {
+    match (artifact_fingerprint(db_path), source_fingerprint(heroes_path, roles_path, synergies_path)) {
+        (Some(built), Some(current)) => built == current,
+        _ => false,
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn hex(bytes: &[u8]) -> String {
+        bytes.iter().map(|b| format!("{:02x}", b)).collect()
+    }
+
+    #[test]
+    fn test_fnv1a_64_reference_values() {
+        // Контрольные значения FNV-1a/64; hero_db.source_fingerprint даёт те же байты (little-endian)
+        assert_eq!(fnv1a_64(b""), 0xcbf29ce484222325);
+        assert_eq!(fnv1a_64(b"a"), 0xaf63dc4c8601ec8c);
+        assert_eq!(fnv1a_64(b"foobar"), 0x85944171f73967e8);
+        assert_eq!(hex(&fnv1a_64(b"a.json\x002\x001700000000000000000\n").to_le_bytes()), "1c761921db7112ad");
+    }
+
+    #[test]
+    fn test_current_snapshot_follows_pointer_file() {
+        let dir = std::env::temp_dir().join(format!("d2d-snapshots-{}", std::process::id()));
+        let root = dir.join("snapshots");
+        fs::create_dir_all(root.join("20260101T000000Z-0011aabb")).unwrap();
+        assert_eq!(current_snapshot(&dir), None);
+        fs::write(root.join("CURRENT"), "20260101T000000Z-0011aabb\n").unwrap();
+        assert_eq!(current_snapshot(&dir), Some(root.join("20260101T000000Z-0011aabb")));
+        // Указатель на удалённый снимок не считается
+        fs::write(root.join("CURRENT"), "20250101T000000Z-deadbeef\n").unwrap();
+        assert_eq!(current_snapshot(&dir), None);
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn test_source_fingerprint_tracks_file_set() {
+        let dir = std::env::temp_dir().join(format!("d2d-fingerprint-{}", std::process::id()));
+        let heroes = dir.join("heroes");
+        fs::create_dir_all(&heroes).unwrap();
+        for path in [heroes.join("a.json"), heroes.join("b.json"), dir.join("roles.json"), dir.join("synergies.json")] {
+            fs::write(path, "{}").unwrap();
+        }
+        let (h, r, s) = (heroes.to_string_lossy(), dir.join("roles.json"), dir.join("synergies.json"));
+        let (r, s) = (r.to_string_lossy(), s.to_string_lossy());
+        let before = source_fingerprint(&h, &r, &s).unwrap();
+        assert_eq!(Some(before), source_fingerprint(&h, &r, &s));
+        fs::write(heroes.join("notes.txt"), "ignored").unwrap();
+        assert_eq!(Some(before), source_fingerprint(&h, &r, &s));
+        // Удалённый герой меняет отпечаток, даже если остальные файлы не новее артефакта
+        fs::remove_file(heroes.join("b.json")).unwrap();
+        assert_ne!(Some(before), source_fingerprint(&h, &r, &s));
+        fs::remove_dir_all(&dir).unwrap();
+    }
+}
@@ -33,3 +33,18 @@ pub struct SynergyRules {
     #[serde(default)]
     pub phase_bias: HashMap<String, HashMap<String, i32>>,
 }
+
+/// Предвычисленные таблицы взаимодействий героев (scripts/interaction_tables.py).
+/// Матрицы плоские, строка — кандидат: `role_pairs[c * n + a]`.
+#[derive(Debug, Deserialize)]
+pub struct InteractionTables {
+    pub version: u32,
+    pub heroes: Vec<String>,
+    pub role_pairs: Vec<i32>,
+    pub tag_synergies: Vec<i32>,
+    pub tag_counters: Vec<i32>,
+    /// Веса phase_bias тегов героя: [early, mid, late]
+    pub phase_bias: Vec<[Vec<i32>; 3]>,
+    #[serde(skip)]
+    pub index: HashMap<String, usize>,
+}
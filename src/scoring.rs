@@ -1,6 +1,13 @@
-﻿use crate::model::{Hero, RoleRules, SynergyRules, GamePhase};
+﻿use crate::model::{Hero, InteractionTables, RoleRules, SynergyRules, GamePhase};
 use std::collections::HashMap;
 
+/// Источник парных правил: строковые ключи из roles.json / synergies.json
+/// или предвычисленные таблицы (scripts/interaction_tables.py) и индекс героя в них
+enum PairRules<'a> {
+    Strings(&'a RoleRules, &'a SynergyRules),
+    Tables(&'a InteractionTables, usize),
+}
+
 fn primary_position(hero: &Hero) -> Option<(&str, f32, f32)> {
     let mut best_key: Option<&str> = None;
     let mut best_val: f32 = -1.0;
@@ -38,6 +45,31 @@ pub fn score_hero(
     roles: &RoleRules,
     synergies: &SynergyRules,
     enemy_team_phase: &GamePhase,
+) -> i32 {
+    score_with(hero, allies, enemies, heroes, &PairRules::Strings(roles, synergies), enemy_team_phase)
+}
+
+/// То же, что score_hero, но парные правила ролей/тегов и phase bias берутся из
+/// предвычисленных таблиц. None, если героя нет в таблицах.
+pub fn score_hero_tables(
+    hero: &Hero,
+    allies: &[String],
+    enemies: &[String],
+    heroes: &HashMap<String, Hero>,
+    tables: &InteractionTables,
+    enemy_team_phase: &GamePhase,
+) -> Option<i32> {
+    let c = *tables.index.get(&hero.name)?;
+    Some(score_with(hero, allies, enemies, heroes, &PairRules::Tables(tables, c), enemy_team_phase))
+}
+
+fn score_with(
+    hero: &Hero,
+    allies: &[String],
+    enemies: &[String],
+    heroes: &HashMap<String, Hero>,
+    rules: &PairRules,
+    enemy_team_phase: &GamePhase,
 ) -> i32 {
     let mut score = 0;
 
@@ -103,24 +135,36 @@ pub fn score_hero(
         score += (hero.game_phase.late as f32 * w_late * 10.0) as i32;
 
         // Phase bias from tags (data-driven)
-        if let Some(m) = synergies.phase_bias.get("early") {
-            for t in &hero.tags {
-                if let Some(v) = m.get(t) {
-                    score += (*v as f32 * w_early).round() as i32;
+        match rules {
+            PairRules::Strings(_, synergies) => {
+                if let Some(m) = synergies.phase_bias.get("early") {
+                    for t in &hero.tags {
+                        if let Some(v) = m.get(t) {
+                            score += (*v as f32 * w_early).round() as i32;
+                        }
+                    }
                 }
-            }
-        }
-        if let Some(m) = synergies.phase_bias.get("mid") {
-            for t in &hero.tags {
-                if let Some(v) = m.get(t) {
-                    score += (*v as f32 * w_mid).round() as i32;
+                if let Some(m) = synergies.phase_bias.get("mid") {
+                    for t in &hero.tags {
+                        if let Some(v) = m.get(t) {
+                            score += (*v as f32 * w_mid).round() as i32;
+                        }
+                    }
+                }
+                if let Some(m) = synergies.phase_bias.get("late") {
+                    for t in &hero.tags {
+                        if let Some(v) = m.get(t) {
+                            score += (*v as f32 * w_late).round() as i32;
+                        }
+                    }
                 }
             }
-        }
-        if let Some(m) = synergies.phase_bias.get("late") {
-            for t in &hero.tags {
-                if let Some(v) = m.get(t) {
-                    score += (*v as f32 * w_late).round() as i32;
+            PairRules::Tables(tables, c) => {
+                // Веса тегов героя по фазам; округляется каждый тег отдельно, как выше
+                for (weights, w) in tables.phase_bias[*c].iter().zip([w_early, w_mid, w_late]) {
+                    for v in weights {
+                        score += (*v as f32 * w).round() as i32;
+                    }
                 }
             }
         }
@@ -153,52 +197,70 @@ pub fn score_hero(
         }
     }
 
-    // Р РћР›Р
-    for ally in allies {
-        if let Some(ally_hero) = heroes.get(ally) {
-            for r1 in &hero.roles {
-                for r2 in &ally_hero.roles {
-                    let key1 = format!("{}+{}", r1, r2);
-                    let key2 = format!("{}+{}", r2, r1);
-
-                    if let Some(v) = roles.role_synergies.get(&key1).or_else(|| roles.role_synergies.get(&key2)) {
-                        score += v;
-                    }
-                    if let Some(v) = roles.role_conflicts.get(&key1).or_else(|| roles.role_conflicts.get(&key2)) {
-                        score += v;
+    match rules {
+        PairRules::Strings(roles, synergies) => {
+            // Р РћР›Р
+            for ally in allies {
+                if let Some(ally_hero) = heroes.get(ally) {
+                    for r1 in &hero.roles {
+                        for r2 in &ally_hero.roles {
+                            let key1 = format!("{}+{}", r1, r2);
+                            let key2 = format!("{}+{}", r2, r1);
+
+                            if let Some(v) = roles.role_synergies.get(&key1).or_else(|| roles.role_synergies.get(&key2)) {
+                                score += v;
+                            }
+                            if let Some(v) = roles.role_conflicts.get(&key1).or_else(|| roles.role_conflicts.get(&key2)) {
+                                score += v;
+                            }
+                        }
                     }
                 }
             }
-        }
-    }
 
-    // РўР•Р“Р (СЃРѕСЋР·)
-    for ally in allies {
-        if let Some(ally_hero) = heroes.get(ally) {
-            for t1 in &hero.tags {
-                for t2 in &ally_hero.tags {
-                    let key1 = format!("{}+{}", t1, t2);
-                    let key2 = format!("{}+{}", t2, t1);
-                    if let Some(v) = synergies.tag_synergies.get(&key1).or_else(|| synergies.tag_synergies.get(&key2)) {
-                        score += v;
+            // РўР•Р“Р (СЃРѕСЋР·)
+            for ally in allies {
+                if let Some(ally_hero) = heroes.get(ally) {
+                    for t1 in &hero.tags {
+                        for t2 in &ally_hero.tags {
+                            let key1 = format!("{}+{}", t1, t2);
+                            let key2 = format!("{}+{}", t2, t1);
+                            if let Some(v) = synergies.tag_synergies.get(&key1).or_else(|| synergies.tag_synergies.get(&key2)) {
+                                score += v;
+                            }
+                        }
                     }
                 }
             }
-        }
-    }
 
-    // РўР•Р“Р (РІСЂР°РіРё)
-    for enemy in enemies {
-        if let Some(enemy_hero) = heroes.get(enemy) {
-            for t1 in &hero.tags {
-                for t2 in &enemy_hero.tags {
-                    let key = format!("{}+{}", t2, t1);
-                    if let Some(v) = synergies.tag_counters.get(&key) {
-                        score += v;
+            // РўР•Р“Р (РІСЂР°РіРё)
+            for enemy in enemies {
+                if let Some(enemy_hero) = heroes.get(enemy) {
+                    for t1 in &hero.tags {
+                        for t2 in &enemy_hero.tags {
+                            let key = format!("{}+{}", t2, t1);
+                            if let Some(v) = synergies.tag_counters.get(&key) {
+                                score += v;
+                            }
+                        }
                     }
                 }
             }
         }
+        PairRules::Tables(tables, c) => {
+            // Роли и теги уже свёрнуты в суммы по паре героев
+            let n = tables.heroes.len();
+            for ally in allies {
+                if let Some(&a) = tables.index.get(ally) {
+                    score += tables.role_pairs[c * n + a] + tables.tag_synergies[c * n + a];
+                }
+            }
+            for enemy in enemies {
+                if let Some(&e) = tables.index.get(enemy) {
+                    score += tables.tag_counters[c * n + e];
+                }
+            }
+        }
     }
 
     // Р¤РђР—Рђ РР“Р Р« (СѓРїСЂРѕС‰С‘РЅРЅРѕ вЂ” late)